@@ -0,0 +1,110 @@
+"""Shared helpers for the pants-baseline benchmarks.
+
+The benchmarks drive a real `pants` binary against a synthetic repository, so
+they need `pants` on PATH and network access for the first tool download.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, Sequence
+
+PLUGIN_SRC = Path(__file__).resolve().parent.parent / "src"
+
+PANTS_TOML = """\
+[GLOBAL]
+pants_version = "{pants_version}"
+pythonpath = ["{plugin_src}"]
+backend_packages = ["pants.backend.python", "pants_baseline"]
+"""
+
+MODULE_TEMPLATE = '''"""Synthetic module {index}."""
+
+from __future__ import annotations
+
+
+def function_{index}(value: int) -> int:
+    """Return a value derived from the input."""
+    total = value
+    for step in range(10):
+        total += step * {index}
+    return total
+
+
+class Thing{index}:
+    """A synthetic class."""
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def compute(self) -> int:
+        return function_{index}(self.value)
+'''
+
+
+def make_repo(
+    root: Path,
+    *,
+    file_count: int,
+    packages: int = 50,
+    pants_version: str = "2.30.1",
+    extra_toml: str = "",
+) -> list[Path]:
+    """Write a synthetic repo of `file_count` Python modules and return their paths."""
+    (root / "pants.toml").write_text(
+        PANTS_TOML.format(pants_version=pants_version, plugin_src=PLUGIN_SRC) + extra_toml
+    )
+    files = []
+    for index in range(file_count):
+        package = root / "src" / f"pkg{index % packages}"
+        package.mkdir(parents=True, exist_ok=True)
+        if not (package / "BUILD").exists():
+            (package / "BUILD").write_text("python_sources()\n")
+        path = package / f"module_{index}.py"
+        path.write_text(MODULE_TEMPLATE.format(index=index))
+        files.append(path)
+    return files
+
+
+def touch_one_file(path: Path) -> None:
+    """Make a content change to a single file so exactly one input digest changes."""
+    with path.open("a") as f:
+        f.write(f"\n# edited at {time.time_ns()}\n")
+
+
+def run_pants(root: Path, args: Sequence[str], *, check: bool = False) -> float:
+    """Run pants in `root` and return the wall time in seconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        ["pants", *args],
+        cwd=root,
+        check=check,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "PANTS_CONCURRENT": "True"},
+    )
+    return time.perf_counter() - start
+
+
+class TempRepo:
+    """A throwaway directory that is removed on exit."""
+
+    def __enter__(self) -> Path:
+        self.path = Path(tempfile.mkdtemp(prefix="baseline-bench-"))
+        return self.path
+
+    def __exit__(self, *exc: object) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def print_table(title: str, header: Sequence[str], rows: Iterator[Sequence[object]]) -> None:
+    """Print a simple fixed-width results table."""
+    print(f"\n{title}")
+    print("  ".join(f"{h:>18}" for h in header))
+    for row in rows:
+        print("  ".join(f"{c:>18.3f}" if isinstance(c, float) else f"{c!s:>18}" for c in row))
@@ -0,0 +1,106 @@
+"""Benchmark the memory held for the output of a very noisy type check.
+
+Generates ty-style output with 100k diagnostics in a log file and compares, under
+tracemalloc, what a rule allocates to report on it:
+
+- buffered: the whole log loaded and decoded into a result string, as
+  `result.stdout.decode()` did.
+- summarized: the whole log loaded, as `get_digest_contents` loads it, then scanned
+  into an `OutputSummary` of `[baseline-python].output_lines` lines.
+- cut: only the head, tail and line count that `summary_script` cuts out of the log
+  in the process are loaded, then turned into the same summary.
+
+"retained" is what a memoized result holds on to afterwards; "peak" includes the
+transient work of producing it, loading the files included. The time `summary_script`
+takes to cut the parts is reported separately, as it is spent in the process.
+
+Unlike the other benchmarks this one does not need `pants`.
+
+Usage:
+    python benchmarks/bench_output_memory.py --diagnostics 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from _harness import PLUGIN_SRC, print_table
+
+sys.path.insert(0, str(PLUGIN_SRC))
+
+from pants_baseline.util_rules.output_summary import (
+    summarize_bytes,
+    summarize_log,
+    summary_parts,
+    summary_script,
+)
+
+LOG = "stdout.log"
+DIAGNOSTIC = (
+    "src/pkg{package}/module_{index}.py:{line}:5: error[invalid-argument-type] Argument to "
+    "function `function_{index}` is incorrect: Expected `int`, found `str`\n"
+)
+
+
+def make_output(count: int) -> bytes:
+    """Return ty-style concise output with `count` diagnostics and a closing total."""
+    lines = (DIAGNOSTIC.format(package=i % 50, index=i, line=i % 400 + 1) for i in range(count))
+    return ("".join(lines) + f"Found {count} diagnostics\n").encode()
+
+
+def measure(build: Callable[[], object]) -> tuple[float, float]:
+    """Return the (retained, peak) MiB allocated by `build`."""
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 2**20, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--diagnostics", type=int, default=100_000)
+    parser.add_argument("--output-lines", type=int, default=200)
+    args = parser.parse_args()
+
+    output = make_output(args.diagnostics)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        (directory / LOG).write_bytes(output)
+        start = time.perf_counter()
+        subprocess.run(
+            ["bash", "-c", summary_script(LOG, max_lines=args.output_lines)],
+            cwd=directory,
+            check=True,
+        )
+        cut_seconds = time.perf_counter() - start
+
+        def cut() -> object:
+            files = {part: (directory / part).read_bytes() for part in summary_parts(LOG)}
+            return summarize_log(files, LOG, max_lines=args.output_lines)
+
+        modes: dict[str, Callable[[], object]] = {
+            "buffered": lambda: (directory / LOG).read_bytes().decode(),
+            "summarized": lambda: summarize_bytes(
+                (directory / LOG).read_bytes(), max_lines=args.output_lines
+            ),
+            "cut": cut,
+        }
+        print_table(
+            f"{args.diagnostics} diagnostics, {len(output) / 2**20:.1f} MiB of output (MiB)",
+            ("mode", "retained", "peak"),
+            iter((mode, *measure(build)) for mode, build in modes.items()),
+        )
+    print(f"\nCutting the parts in the process took {cut_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
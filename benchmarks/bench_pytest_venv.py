@@ -0,0 +1,63 @@
+"""Benchmark building the pytest venv against reusing it from the named cache.
+
+Builds a project with a test per module and times `pants baseline-test` twice with
+the process cache disabled, so every shard runs both times:
+- "cold resolve": an empty named caches directory, so uv fetches an interpreter,
+  resolves and installs pytest and pytest-cov before the first shard runs;
+- "warm venv": the same named caches directory again, so every shard finds the
+  venv built by the first run and only pays for symlinking the cache in.
+
+Usage:
+    python benchmarks/bench_pytest_venv.py --modules 200 --shards 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+
+from _harness import TempRepo, make_repo, print_table, run_pants
+
+BUILD_FILE = 'baseline_python_project(name="app", sources=["src/**/*.py"])\n'
+
+TEST_TEMPLATE = """def test_{index}() -> None:
+    assert sum(range(10)) * {index} == 45 * {index}
+"""
+
+
+def bench(module_count: int, shards: int) -> list[tuple[str, float]]:
+    with TempRepo() as root, tempfile.TemporaryDirectory() as named_caches:
+        make_repo(root, file_count=module_count)
+        (root / "BUILD").write_text(BUILD_FILE)
+        (root / "tests").mkdir()
+        for index in range(module_count):
+            (root / "tests" / f"test_module_{index}.py").write_text(
+                TEST_TEMPLATE.format(index=index)
+            )
+        args = [
+            "--no-pantsd",
+            "--no-local-cache",
+            f"--named-caches-dir={named_caches}",
+            f"--baseline-test-shards={shards}",
+            "baseline-test",
+            "//:app",
+        ]
+        cold = run_pants(root, args)
+        warm = run_pants(root, args)
+    return [("cold resolve", cold), ("warm venv", warm)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+    print_table(
+        f"baseline-test, {args.modules} test files in {args.shards} shards (seconds)",
+        ("venv", "wall time"),
+        iter(bench(args.modules, args.shards)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Benchmark single-partition vs sharded Ruff lint.
+
+Measures a cold `pants lint` run (no pantsd, no local cache) and a warm run
+after editing one file, for `--baseline-ruff-shards=1` (one process) and
+`--baseline-ruff-shards=0` (automatic sharding).
+
+Usage:
+    python benchmarks/bench_ruff_lint_partitioning.py --files 14000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from _harness import TempRepo, make_repo, print_table, run_pants, touch_one_file
+
+
+def bench(file_count: int) -> list[tuple[str, float, float]]:
+    rows = []
+    for mode, shards in (("single", "1"), ("sharded", "0")):
+        with TempRepo() as root:
+            files = make_repo(root, file_count=file_count)
+            args = [f"--baseline-ruff-shards={shards}", "lint", "::"]
+            cold = run_pants(root, ["--no-pantsd", "--no-local-cache", *args])
+            # Prime pantsd and the local cache, then measure a one-file edit.
+            run_pants(root, args)
+            touch_one_file(files[len(files) // 2])
+            warm = run_pants(root, args)
+            rows.append((mode, cold, warm))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=14_000)
+    args = parser.parse_args()
+    print_table(
+        f"Ruff lint, {args.files} files (seconds)",
+        ("mode", "cold", "one-file edit"),
+        iter(bench(args.files)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark source glob expansion with and without exclude patterns.
+
+Builds a project whose `sources` glob is `**/*.py` next to a generated `build/`
+tree of 100k files, then times `pants baseline-test` (which only globs, as the
+project has no tests) with the default `[baseline-python].exclude_patterns`,
+which prune `build/`, and with no exclude patterns, which walk all of it.
+Reports a cold run (no pantsd) and a warm run after editing one source file.
+
+Usage:
+    python benchmarks/bench_source_globbing.py --generated 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from _harness import TempRepo, make_repo, print_table, run_pants, touch_one_file
+
+BUILD_FILE = 'baseline_python_project(name="app", sources=["**/*.py"], test_sources=[])\n'
+
+
+def make_generated_tree(root: Path, file_count: int, per_dir: int = 500) -> None:
+    """Write `file_count` small Python files below `root/build`."""
+    for index in range(file_count):
+        directory = root / "build" / "lib" / f"gen_{index // per_dir}"
+        if index % per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"generated_{index}.py").write_text(f"VALUE = {index}\n")
+
+
+def bench(source_count: int, generated_count: int) -> list[tuple[str, float, float]]:
+    rows = []
+    for mode, patterns in (("excluded", None), ("walked", "[]")):
+        with TempRepo() as root:
+            files = make_repo(root, file_count=source_count)
+            (root / "BUILD").write_text(BUILD_FILE)
+            make_generated_tree(root, generated_count)
+            args = [
+                *([f"--baseline-python-exclude-patterns={patterns}"] if patterns else []),
+                "baseline-test",
+                "//:app",
+            ]
+            cold = run_pants(root, ["--no-pantsd", "--no-local-cache", *args])
+            run_pants(root, args)
+            touch_one_file(files[len(files) // 2])
+            warm = run_pants(root, args)
+            rows.append((mode, cold, warm))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sources", type=int, default=2_000)
+    parser.add_argument("--generated", type=int, default=100_000)
+    args = parser.parse_args()
+    print_table(
+        f"Glob expansion, {args.sources} sources + {args.generated} generated files (seconds)",
+        ("mode", "cold", "one-file edit"),
+        iter(bench(args.sources, args.generated)),
+    )
+
+
+if __name__ == "__main__":
+    main()
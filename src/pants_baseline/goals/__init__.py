@@ -1,9 +1,10 @@
 """Goals for the Python Baseline plugin."""
 
-from pants_baseline.goals import audit, fmt, lint, test, typecheck
+from pants_baseline.goals import audit, baseline, fmt, lint, test, typecheck
 
 __all__ = [
     "audit",
+    "baseline",
     "fmt",
     "lint",
     "test",
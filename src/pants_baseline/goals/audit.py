@@ -1,5 +1,6 @@
 """Audit goal for uv security scanning."""
 
+from datetime import UTC, datetime
 from typing import Iterable
 
 from pants.engine.console import Console
@@ -7,9 +8,14 @@ from pants.engine.goal import Goal, GoalSubsystem
 from pants.engine.rules import Get, collect_rules, goal_rule
 from pants.engine.target import Targets
 
-from pants_baseline.rules.audit_rules import AuditResult, UvAuditRequest
+from pants_baseline.rules.audit_rules import (
+    ProjectAuditRequest,
+    ProjectAudits,
+    render_vulnerabilities,
+)
 from pants_baseline.subsystems.baseline import BaselineSubsystem
 from pants_baseline.subsystems.uv import UvSubsystem
+from pants_baseline.targets import SkipAuditField
 
 
 class BaselineAuditSubsystem(GoalSubsystem):
@@ -33,7 +39,7 @@ async def run_baseline_audit(
     baseline_subsystem: BaselineSubsystem,
     uv_subsystem: UvSubsystem,
 ) -> BaselineAudit:
-    """Run uv security audit on dependencies."""
+    """Audit each project's lock file concurrently against the advisory snapshot."""
     if not baseline_subsystem.enabled:
         console.print_stdout("Python baseline is disabled.")
         return BaselineAudit(exit_code=0)
@@ -42,32 +48,64 @@ async def run_baseline_audit(
         console.print_stdout("Security audit is disabled.")
         return BaselineAudit(exit_code=0)
 
-    console.print_stdout("Running uv security audit...")
-    console.print_stdout(f"  Lock file: {uv_subsystem.lock_file}")
-    if uv_subsystem.audit_ignore_vulns:
-        console.print_stdout(f"  Ignoring: {', '.join(uv_subsystem.audit_ignore_vulns)}")
-    console.print_stdout("")
+    output_format = uv_subsystem.output_format
+    if output_format not in ("text", "json", "github"):
+        raise ValueError(
+            f"--baseline-uv-output-format must be 'text', 'json' or 'github', got {output_format!r}"
+        )
+
+    # Audit the projects in the specs; without any, audit the root lock file
+    project_dirs = [
+        tgt.address.spec_path
+        for tgt in targets
+        if tgt.has_field(SkipAuditField) and not tgt[SkipAuditField].value
+    ]
+    if not project_dirs and not any(tgt.has_field(SkipAuditField) for tgt in targets):
+        project_dirs = [""]
+    if not project_dirs:
+        console.print_stdout("No projects to audit.")
+        return BaselineAudit(exit_code=0)
 
-    audit_request: UvAuditRequest = UvAuditRequest(
-        lock_file=uv_subsystem.lock_file,
-        ignore_vulns=tuple(uv_subsystem.audit_ignore_vulns),
-        output_format=uv_subsystem.output_format,
+    if output_format == "text":
+        console.print_stdout("Running security audit...")
+        if uv_subsystem.audit_ignore_vulns:
+            console.print_stdout(f"  Ignoring: {', '.join(uv_subsystem.audit_ignore_vulns)}")
+        console.print_stdout("")
+
+    # The advisory snapshot is refreshed at most once per (UTC) day
+    audits = await Get(
+        ProjectAudits,
+        ProjectAuditRequest(
+            project_dirs=tuple(sorted(set(project_dirs))),
+            day=datetime.now(UTC).date().isoformat(),
+        ),
     )
-    result = await Get(AuditResult, UvAuditRequest, audit_request)
-
-    if result.stdout:
-        console.print_stdout(result.stdout)
-    if result.stderr:
-        console.print_stderr(result.stderr)
-
-    if result.exit_code == 0:
-        console.print_stdout("\nNo vulnerabilities found.")
-    else:
-        console.print_stderr(
-            f"\nFound {result.vulnerabilities_found} vulnerabilities!"
-        )
 
-    return BaselineAudit(exit_code=result.exit_code)
+    for result in audits.results:
+        if result.stderr:
+            console.print_stderr(result.stderr)
+    rendered = render_vulnerabilities(
+        [
+            (lf, result.vulnerabilities)
+            for lf, result in zip(audits.lock_files, audits.results, strict=True)
+        ],
+        output_format,
+    )
+    if rendered:
+        console.print_stdout(rendered)
+
+    if output_format == "text":
+        console.print_stdout(f"\n{audits.summary}")
+        vulnerable = [result for result in audits.results if result.vulnerabilities]
+        if vulnerable:
+            console.print_stderr(
+                f"Found {sum(r.vulnerabilities_found for r in vulnerable)} vulnerabilities "
+                f"in {len(vulnerable)} lock file(s)!"
+            )
+        elif audits.exit_code == 0:
+            console.print_stdout("No vulnerabilities found.")
+
+    return BaselineAudit(exit_code=audits.exit_code)
 
 
 def rules() -> Iterable:
@@ -0,0 +1,153 @@
+"""Unified goal running every baseline check in one session."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Iterable
+
+from pants.engine.console import Console
+from pants.engine.fs import Workspace
+from pants.engine.goal import Goal, GoalSubsystem
+from pants.engine.internals.selectors import concurrently
+from pants.engine.rules import Get, collect_rules, goal_rule
+from pants.engine.target import FilteredTargets
+from pants.option.option_types import BoolOption, StrListOption
+
+from pants_baseline.rules.baseline_rules import (
+    AuditCheckRequest,
+    BaselineCheckResult,
+    FmtCheckRequest,
+    LintCheckRequest,
+    PytestCheckRequest,
+    TypecheckCheckRequest,
+)
+from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
+from pants_baseline.subsystems.ruff import RuffSubsystem
+from pants_baseline.subsystems.uv import UvSubsystem
+from pants_baseline.targets import BaselineSourcesField
+
+CHECKS = ("lint", "fmt", "audit", "typecheck", "test")
+
+# With --fail-fast the cheap checks run first and the slow ones only if they pass
+FAST_CHECKS = ("lint", "fmt", "audit")
+
+
+class BaselineGoalSubsystem(GoalSubsystem):
+    """Subsystem for the baseline goal."""
+
+    name = "baseline"
+    help = "Run lint, format check, audit, type check and tests concurrently."
+
+    checks = StrListOption(
+        default=list(CHECKS),
+        help=f"Checks to run, any of: {', '.join(CHECKS)}.",
+    )
+    fail_fast = BoolOption(
+        default=False,
+        help=(
+            "Run lint, fmt and audit first, and skip type checking and tests if any of them fail."
+        ),
+    )
+    fix = BoolOption(
+        default=False,
+        help="Write formatting changes to the workspace instead of only reporting them.",
+    )
+
+
+class BaselineGoal(Goal):
+    """Goal to run all baseline checks."""
+
+    subsystem_cls = BaselineGoalSubsystem
+    environment_behavior = Goal.EnvironmentBehavior.LOCAL_ONLY
+
+
+def _format_summary(results: Iterable[BaselineCheckResult], skipped: Iterable[str]) -> str:
+    lines = []
+    for result in results:
+        mark = "✓" if result.exit_code == 0 else "✗"
+        lines.append(f"{mark} {result.name:<10} {result.elapsed:7.2f}s  {result.detail}")
+    lines.extend(f"- {name:<10} {'':>8}  skipped" for name in skipped)
+    return "\n".join(lines)
+
+
+@goal_rule
+async def run_baseline(
+    console: Console,
+    workspace: Workspace,
+    targets: FilteredTargets,
+    goal_subsystem: BaselineGoalSubsystem,
+    baseline_subsystem: BaselineSubsystem,
+    ruff_subsystem: RuffSubsystem,
+    pytest_subsystem: BaselinePytestSubsystem,
+    uv_subsystem: UvSubsystem,
+) -> BaselineGoal:
+    """Run the selected checks concurrently and print one combined summary."""
+    if not baseline_subsystem.enabled:
+        console.print_stdout("Python baseline is disabled.")
+        return BaselineGoal(exit_code=0)
+
+    unknown = sorted(set(goal_subsystem.checks) - set(CHECKS))
+    if unknown:
+        raise ValueError(
+            f"Unknown --baseline-checks {', '.join(unknown)}; expected any of {', '.join(CHECKS)}"
+        )
+
+    projects = tuple(t for t in targets if t.has_field(BaselineSourcesField))
+    if not projects:
+        console.print_stdout("No baseline_python_project targets found.")
+        return BaselineGoal(exit_code=0)
+
+    disabled = {
+        "lint": ruff_subsystem.skip,
+        "fmt": ruff_subsystem.skip,
+        "audit": not uv_subsystem.audit_enabled,
+        "typecheck": False,
+        "test": pytest_subsystem.skip,
+    }
+    selected = [c for c in CHECKS if c in goal_subsystem.checks and not disabled[c]]
+    skipped = [c for c in CHECKS if c in goal_subsystem.checks and disabled[c]]
+
+    day = datetime.now(UTC).date().isoformat()
+    requests = {
+        "lint": lambda: Get(BaselineCheckResult, LintCheckRequest(projects)),
+        "fmt": lambda: Get(BaselineCheckResult, FmtCheckRequest(projects)),
+        "audit": lambda: Get(BaselineCheckResult, AuditCheckRequest(projects, day=day)),
+        "typecheck": lambda: Get(BaselineCheckResult, TypecheckCheckRequest(projects)),
+        "test": lambda: Get(BaselineCheckResult, PytestCheckRequest(projects)),
+    }
+
+    # Checks already in flight cannot be cancelled, so --fail-fast runs in two stages
+    stages = (
+        [[c for c in selected if c in FAST_CHECKS], [c for c in selected if c not in FAST_CHECKS]]
+        if goal_subsystem.fail_fast
+        else [selected]
+    )
+    results: list[BaselineCheckResult] = []
+    for stage in stages:
+        if any(r.exit_code != 0 for r in results):
+            skipped.extend(stage)
+            continue
+        results.extend(await concurrently(requests[name]() for name in stage))
+
+    for result in results:
+        if result.exit_code == 0:
+            continue
+        if result.stdout:
+            console.print_stdout(f"\n== {result.name} ==\n{result.stdout}")
+        if result.stderr:
+            console.print_stderr(result.stderr)
+
+    fmt_result = next((r for r in results if r.name == "fmt"), None)
+    if goal_subsystem.fix and fmt_result and fmt_result.exit_code != 0:
+        workspace.write_digest(fmt_result.output_digest)
+        console.print_stdout("\nWrote formatting changes to the workspace.")
+
+    results.sort(key=lambda r: CHECKS.index(r.name))
+    console.print_stdout(f"\n{_format_summary(results, sorted(skipped, key=CHECKS.index))}")
+    return BaselineGoal(exit_code=max((r.exit_code for r in results), default=0))
+
+
+def rules() -> Iterable:
+    """Return all baseline goal rules."""
+    return collect_rules()
@@ -4,16 +4,17 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from pants.core.goals.fmt import FmtResult
 from pants.engine.console import Console
+from pants.engine.fs import Workspace
 from pants.engine.goal import Goal, GoalSubsystem
 from pants.engine.rules import Get, collect_rules, goal_rule
 from pants.engine.target import FilteredTargets
+from pants.option.option_types import BoolOption
 
-from pants_baseline.rules.fmt_rules import RuffFmtFieldSet, RuffFmtRequest
+from pants_baseline.rules.baseline_rules import BaselineCheckResult, FmtCheckRequest
+from pants_baseline.rules.fmt_rules import RuffFmtFieldSet
 from pants_baseline.subsystems.baseline import BaselineSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
-from pants_baseline.targets import BaselineSourcesField
 
 
 class BaselineFmtSubsystem(GoalSubsystem):
@@ -22,6 +23,11 @@ class BaselineFmtSubsystem(GoalSubsystem):
     name = "baseline-fmt"
     help = "Run Ruff formatting with baseline configuration."
 
+    check = BoolOption(
+        default=False,
+        help="Report the files that would be reformatted, and fail, without writing them.",
+    )
+
 
 class BaselineFmt(Goal):
     """Goal to run Ruff formatting."""
@@ -33,7 +39,9 @@ class BaselineFmt(Goal):
 @goal_rule
 async def run_baseline_fmt(
     console: Console,
+    workspace: Workspace,
     targets: FilteredTargets,
+    fmt_subsystem: BaselineFmtSubsystem,
     baseline_subsystem: BaselineSubsystem,
     ruff_subsystem: RuffSubsystem,
 ) -> BaselineFmt:
@@ -42,25 +50,19 @@ async def run_baseline_fmt(
         console.print_stdout("Python baseline is disabled.")
         return BaselineFmt(exit_code=0)
 
-    # Filter targets that have BaselineSourcesField
-    applicable_targets = [
-        t for t in targets
-        if t.has_field(BaselineSourcesField)
-    ]
+    if ruff_subsystem.skip:
+        console.print_stdout("Ruff is skipped.")
+        return BaselineFmt(exit_code=0)
+
+    # Filter baseline projects that have not opted out
+    projects = tuple(t for t in targets if RuffFmtFieldSet.is_applicable(t))
 
-    if not applicable_targets:
+    if not projects:
         console.print_stdout("No baseline_python_project targets found.")
         return BaselineFmt(exit_code=0)
 
-    # Create field sets for each target
-    field_sets = [
-        RuffFmtFieldSet.create(t)
-        for t in applicable_targets
-    ]
-
-    # Create the fmt request and run it
-    request = RuffFmtRequest(field_sets)
-    result = await Get(FmtResult, RuffFmtRequest, request)
+    # The same check the unified baseline goal runs, one process per Ruff batch
+    result = await Get(BaselineCheckResult, FmtCheckRequest(projects))
 
     # Print results
     if result.stdout:
@@ -68,12 +70,16 @@ async def run_baseline_fmt(
     if result.stderr:
         console.print_stderr(result.stderr)
 
-    files_changed = result.input != result.output
-    if files_changed:
-        console.print_stdout(f"✓ Formatted {len(field_sets)} target(s)")
-    else:
-        console.print_stdout(f"✓ {len(field_sets)} target(s) already formatted")
+    if result.exit_code == 0:
+        console.print_stdout(f"✓ {len(projects)} target(s) already formatted")
+        return BaselineFmt(exit_code=0)
+
+    if fmt_subsystem.check:
+        console.print_stderr(f"✗ {result.detail}")
+        return BaselineFmt(exit_code=result.exit_code)
 
+    workspace.write_digest(result.output_digest)
+    console.print_stdout(f"✓ Formatted {len(projects)} target(s) ({result.detail})")
     return BaselineFmt(exit_code=0)
 
 
@@ -4,16 +4,15 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from pants.core.goals.lint import LintResult
 from pants.engine.console import Console
 from pants.engine.goal import Goal, GoalSubsystem
 from pants.engine.rules import Get, collect_rules, goal_rule
-from pants.engine.target import FieldSet, FilteredTargets
+from pants.engine.target import FilteredTargets
 
-from pants_baseline.rules.lint_rules import RuffLintFieldSet, RuffLintRequest
+from pants_baseline.rules.baseline_rules import BaselineCheckResult, LintCheckRequest
+from pants_baseline.rules.lint_rules import RuffLintFieldSet
 from pants_baseline.subsystems.baseline import BaselineSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
-from pants_baseline.targets import BaselineSourcesField
 
 
 class BaselineLintSubsystem(GoalSubsystem):
@@ -42,25 +41,19 @@ async def run_baseline_lint(
         console.print_stdout("Python baseline is disabled.")
         return BaselineLint(exit_code=0)
 
-    # Filter targets that have BaselineSourcesField
-    applicable_targets = [
-        t for t in targets
-        if t.has_field(BaselineSourcesField)
-    ]
+    if ruff_subsystem.skip:
+        console.print_stdout("Ruff is skipped.")
+        return BaselineLint(exit_code=0)
+
+    # Filter baseline projects that have not opted out
+    projects = tuple(t for t in targets if RuffLintFieldSet.is_applicable(t))
 
-    if not applicable_targets:
+    if not projects:
         console.print_stdout("No baseline_python_project targets found.")
         return BaselineLint(exit_code=0)
 
-    # Create field sets for each target
-    field_sets = [
-        RuffLintFieldSet.create(t)
-        for t in applicable_targets
-    ]
-
-    # Create the lint request and run it
-    request = RuffLintRequest(field_sets)
-    result = await Get(LintResult, RuffLintRequest, request)
+    # The same check the unified baseline goal runs, one process per Ruff batch
+    result = await Get(BaselineCheckResult, LintCheckRequest(projects))
 
     # Print results
     if result.stdout:
@@ -69,7 +62,7 @@ async def run_baseline_lint(
         console.print_stderr(result.stderr)
 
     if result.exit_code == 0:
-        console.print_stdout(f"✓ Linted {len(field_sets)} target(s) successfully")
+        console.print_stdout(f"✓ Linted {len(projects)} target(s) successfully ({result.detail})")
     else:
         console.print_stderr(f"✗ Linting failed with exit code {result.exit_code}")
 
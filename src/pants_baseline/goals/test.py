@@ -2,14 +2,53 @@
 
 from __future__ import annotations
 
+import os
+import time
+from pathlib import Path
 from typing import Iterable
 
+from pants.base.build_environment import get_buildroot
+from pants.core.util_rules.distdir import DistDir
 from pants.engine.console import Console
+from pants.engine.fs import AddPrefix, Digest, DigestEntries, FileEntry, PathGlobs, Workspace
 from pants.engine.goal import Goal, GoalSubsystem
-from pants.engine.rules import collect_rules, goal_rule
-from pants.engine.target import Targets
+from pants.engine.internals.selectors import concurrently
+from pants.engine.rules import Get, collect_rules, goal_rule
+from pants.engine.target import FilteredTargets
+from pants.option.global_options import GlobalOptions
+from pants.option.option_types import BoolOption, IntOption, StrOption
+from pants.util.frozendict import FrozenDict
+from pants.vcs.git import GitWorktreeRequest, MaybeGitWorktree
 
+from pants_baseline.rules.snapshot_rules import (
+    BaselineSnapshotRequest,
+    BaselineSnapshots,
+    BaselineSnapshotsRequest,
+)
+from pants_baseline.rules.test_rules import (
+    CoverageMergeRequest,
+    CoverageReport,
+    ImportGraph,
+    ImportGraphRequest,
+    PytestFieldSet,
+    PytestShardRequest,
+    PytestShardResult,
+)
+from pants_baseline.rules.venv_rules import PytestVenv, PytestVenvRequest
 from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
+from pants_baseline.targets import project_value
+from pants_baseline.util_rules.import_graph import untraced_changes
+from pants_baseline.util_rules.json_store import load_json_store, save_json_store
+from pants_baseline.util_rules.partitions import balance_by_duration
+from pants_baseline.util_rules.test_flakiness import flakiness_entry, record_attempts
+from pants_baseline.util_rules.test_outcomes import (
+    cached_passes,
+    config_globs,
+    outcome_entry,
+    record_outcomes,
+)
+from pants_baseline.util_rules.test_timings import timing_entry
 
 
 class BaselineTestSubsystem(GoalSubsystem):
@@ -18,6 +57,100 @@ class BaselineTestSubsystem(GoalSubsystem):
     name = "baseline-test"
     help = "Run pytest with coverage and baseline configuration."
 
+    shards = StrOption(
+        default="auto",
+        help=(
+            "Number of parallel pytest processes to split the test files into, or 'auto' "
+            "for one per core (`--process-execution-local-parallelism`), capped at the "
+            "number of test files. Shards are balanced using per-file durations recorded "
+            "from previous runs."
+        ),
+    )
+
+    changed_since = StrOption(
+        default=None,
+        help=(
+            "Only run the test files affected by changes since this git ref (e.g. "
+            "`origin/main`): those that changed, that transitively import a changed "
+            "source file, or that sit below a changed `conftest.py`. Affected tests are "
+            "found from an import graph over the project's sources and tests. The "
+            "coverage report is still shown, but thresholds are not enforced on a "
+            "partial run."
+        ),
+    )
+
+    cache_outcomes = BoolOption(
+        default=False,
+        help=(
+            "Skip test files that passed on a previous run against the same inputs: the "
+            "test file, every first-party module it imported at run time (recorded by a "
+            "pytest plugin shipped with pants-baseline), the `conftest.py` and "
+            "`__init__.py` files above them, and the test venv. Skipped files are "
+            "reported as cached passes. Failures are never cached. As with "
+            "`changed_since`, coverage thresholds are not enforced when files are "
+            "skipped. Non-Python files that tests read are not tracked."
+        ),
+    )
+
+    retries = IntOption(
+        default=0,
+        help=(
+            "Rerun the failing tests of a failed shard up to this many times. Only those "
+            "tests run, by pytest node ID, in a sandbox holding just what they import. A "
+            "test that passes on a retry is reported as flaky and does not fail the run. "
+            "Each test's runs, failures and flaky passes are counted in "
+            "`.pants.d/baseline/test_flakiness.json`."
+        ),
+    )
+
+    def shard_count(self, parallelism: int, file_count: int) -> int:
+        """Resolve the `shards` option to a concrete shard count."""
+        if self.shards == "auto":
+            return max(1, min(parallelism, file_count))
+        try:
+            count = int(self.shards)
+        except ValueError:
+            raise ValueError(
+                f"--baseline-test-shards must be 'auto' or a positive integer, got {self.shards!r}"
+            ) from None
+        return max(1, count)
+
+
+# pytest's exit code when tests ran and some of them failed
+_TESTS_FAILED = 1
+
+
+def _describe_thresholds(thresholds: dict[str, int]) -> str:
+    if not thresholds:
+        return "not enforced"
+    low, high = min(thresholds.values()), max(thresholds.values())
+    return f"{low}%" if low == high else f"{low}-{high}%, per project"
+
+
+def _sandbox_files(
+    tests: Iterable[str], snapshots: BaselineSnapshots, import_graph: ImportGraph | None
+) -> tuple[str, ...]:
+    """Return the files a shard running `tests` needs in its sandbox.
+
+    A test none of whose imports resolve to a first-party file may load modules in
+    ways the graph cannot see, so it gets all of its project's sources instead.
+    """
+    sources = snapshots.sources.files
+    if import_graph is None:
+        return tuple(sorted({*sources, *tests}))
+    files = set(import_graph.required(tests, (*sources, *snapshots.tests.files)))
+    projects = {snapshots.owners[test] for test in import_graph.unresolved(tests)}
+    files.update(path for path in sources if snapshots.owners[path] in projects)
+    return tuple(sorted(files))
+
+
+def _node_files(nodes: Iterable[str]) -> tuple[str, ...]:
+    return tuple(sorted({node.split("::")[0] for node in nodes}))
+
+
+def _project_dirs(tests: Iterable[str], snapshots: BaselineSnapshots) -> tuple[str, ...]:
+    return tuple(sorted({snapshots.owners[test].spec_path for test in tests}))
+
 
 class BaselineTest(Goal):
     """Goal to run pytest tests."""
@@ -29,24 +162,309 @@ class BaselineTest(Goal):
 @goal_rule
 async def run_baseline_test(
     console: Console,
-    targets: Targets,
+    workspace: Workspace,
+    distdir: DistDir,
+    targets: FilteredTargets,
     baseline_subsystem: BaselineSubsystem,
+    pytest_subsystem: BaselinePytestSubsystem,
+    test_subsystem: BaselineTestSubsystem,
+    global_options: GlobalOptions,
 ) -> BaselineTest:
-    """Run pytest on all test targets."""
+    """Run pytest on all test targets, sharded across cores."""
     if not baseline_subsystem.enabled:
         console.print_stdout("Python baseline is disabled.")
         return BaselineTest(exit_code=0)
 
+    # Targets with skip_test opt out of PytestFieldSet
+    field_sets = [PytestFieldSet.create(t) for t in targets if PytestFieldSet.is_applicable(t)]
+
+    if not field_sets:
+        console.print_stdout("No baseline_python_project targets found.")
+        return BaselineTest(exit_code=0)
+
+    snapshots = await Get(
+        BaselineSnapshots,
+        BaselineSnapshotsRequest(
+            tuple(BaselineSnapshotRequest(fs.sources, fs.test_sources) for fs in field_sets)
+        ),
+    )
+    test_sources, sources = snapshots.tests, snapshots.sources
+
+    if not test_sources.files:
+        console.print_stdout("No test files found.")
+        return BaselineTest(exit_code=0)
+
+    project_dirs = tuple(sorted({fs.address.spec_path for fs in field_sets}))
+    all_files = (*sources.files, *test_sources.files)
+    test_files = test_sources.files
+    # Each project is held to its own threshold, defaulting to the global one
+    thresholds = {
+        fs.address.spec: project_value(fs.coverage_threshold, baseline_subsystem.coverage_threshold)
+        for fs in field_sets
+    }
+    if test_subsystem.changed_since:
+        worktree = await Get(MaybeGitWorktree, GitWorktreeRequest())
+        if worktree.git_worktree is None:
+            console.print_stderr(
+                "--baseline-test-changed-since requires a git repository; running all tests."
+            )
+        else:
+            changed = worktree.git_worktree.changed_files(
+                from_commit=test_subsystem.changed_since,
+                include_untracked=True,
+                relative_to=get_buildroot(),
+            )
+            untraced = untraced_changes(changed, all_files, project_dirs)
+            if untraced:
+                # Deleted modules, data files and pytest configuration may affect any test
+                console.print_stdout(
+                    f"{len(changed)} file(s) changed since {test_subsystem.changed_since}, "
+                    f"{len(untraced)} not traceable to tests (e.g. {untraced[0]}): "
+                    "running all tests"
+                )
+            else:
+                start = time.perf_counter()
+                import_graph = await Get(
+                    ImportGraph, ImportGraphRequest(snapshots.digest, project_dirs)
+                )
+                elapsed = time.perf_counter() - start
+                test_files = import_graph.affected(changed, test_sources.files)
+                thresholds = {}
+                console.print_stdout(
+                    f"{len(changed)} file(s) changed since {test_subsystem.changed_since}: "
+                    f"running {len(test_files)} of {len(test_sources.files)} test file(s), "
+                    f"skipped {len(test_sources.files) - len(test_files)} "
+                    f"(import graph built in {elapsed:.2f}s)"
+                )
+                if not test_files:
+                    return BaselineTest(exit_code=0)
+
+    # One venv per Python version the projects resolve to, built on first use and
+    # reused from the named cache
+    project_versions = {
+        fs.address: project_value(fs.python_version, baseline_subsystem.python_version)
+        for fs in field_sets
+    }
+    versions = sorted(set(project_versions.values()))
+    resolved_venvs = await concurrently(
+        Get(
+            PytestVenv,
+            PytestVenvRequest(
+                project_dirs=tuple(
+                    sorted({a.spec_path for a, v in project_versions.items() if v == version})
+                ),
+                python_version=version,
+            ),
+        )
+        for version in versions
+    )
+    venvs = dict(zip(versions, resolved_venvs, strict=True))
+    test_versions = {path: project_versions[snapshots.owners[path]] for path in test_sources.files}
+
+    # Test files that passed before, against the same files and venv, are not run again
+    outcomes_path = Path(global_options.pants_workdir, "baseline", "test_outcomes.json")
+    outcomes = (
+        load_json_store(outcomes_path, outcome_entry) if test_subsystem.cache_outcomes else {}
+    )
+    fingerprints: dict[str, str] = {}
+    if test_subsystem.cache_outcomes:
+        # pytest configuration is not a baseline source, but changes what a test runs with
+        config = await Get(Digest, PathGlobs(config_globs(project_dirs)))
+        entries, config_entries = await concurrently(
+            Get(DigestEntries, Digest, snapshots.digest),
+            Get(DigestEntries, Digest, config),
+        )
+        fingerprints = {
+            entry.path: entry.file_digest.fingerprint
+            for entry in (*entries, *config_entries)
+            if isinstance(entry, FileEntry)
+        }
+        cached = {
+            path
+            for path in test_files
+            if cached_passes(outcomes, fingerprints, venvs[test_versions[path]].key, (path,))
+        }
+        if cached:
+            test_files = tuple(path for path in test_files if path not in cached)
+            thresholds = {}
+            console.print_stdout(
+                f"✓ {len(cached)} test file(s) passed before with unchanged inputs (cached)"
+            )
+        if not test_files:
+            return BaselineTest(exit_code=0)
+
+    # Balance shards by the durations recorded on previous runs
+    timings_path = Path(global_options.pants_workdir, "baseline", "test_timings.json")
+    timings = load_json_store(timings_path, timing_entry)
+    shard_count = test_subsystem.shard_count(
+        global_options.process_execution_local_parallelism or os.cpu_count() or 1,
+        len(test_files),
+    )
+    # Each Python version's tests run in their own shards, sized by their share
+    shards: list[tuple[str, ...]] = []
+    shard_venvs: list[PytestVenv] = []
+    for version in versions:
+        files = tuple(path for path in test_files if test_versions[path] == version)
+        if not files:
+            continue
+        count = max(1, round(shard_count * len(files) / len(test_files)))
+        for shard in balance_by_duration(files, timings, count):
+            shards.append(shard)
+            shard_venvs.append(venvs[version])
+
     console.print_stdout("Running pytest with coverage...")
     console.print_stdout(f"  Source roots: {', '.join(baseline_subsystem.src_roots)}")
     console.print_stdout(f"  Test roots: {', '.join(baseline_subsystem.test_roots)}")
-    console.print_stdout(f"  Coverage threshold: {baseline_subsystem.coverage_threshold}%")
+    console.print_stdout(f"  Python: {', '.join(sorted({test_versions[p] for p in test_files}))}")
+    console.print_stdout(f"  Coverage threshold: {_describe_thresholds(thresholds)}")
+    console.print_stdout(f"  Shards: {len(shards)}")
     console.print_stdout("")
 
-    # The actual testing is handled by the TestRequest mechanism
-    # This goal just provides a user-friendly entry point
+    # Each shard's sandbox holds what its tests import, or else all project sources
+    sandbox_graph = (
+        await Get(ImportGraph, ImportGraphRequest(snapshots.digest, project_dirs))
+        if pytest_subsystem.minimal_sandbox
+        else None
+    )
+    shard_inputs = [_sandbox_files(files, snapshots, sandbox_graph) for files in shards]
+
+    results = await concurrently(
+        Get(
+            PytestShardResult,
+            PytestShardRequest(
+                test_files=files,
+                index=i,
+                count=len(shards),
+                input_files=input_files,
+                digest=snapshots.digest,
+                venv=shard_venvs[i],
+                project_dirs=_project_dirs(files, snapshots),
+                record_outcomes=test_subsystem.cache_outcomes,
+            ),
+        )
+        for i, (files, input_files) in enumerate(zip(shards, shard_inputs, strict=True))
+    )
+
+    # Rerun only the failing tests of each failed shard, until they pass or run out of
+    # retries. A shard that crashed or failed outside its tests is not retried.
+    attempts = {node: [passed] for result in results for node, passed in result.tests.items()}
+    exit_codes = [result.exit_code for result in results]
+    retrying = {
+        i: result.failed_tests
+        for i, result in enumerate(results)
+        if result.exit_code == _TESTS_FAILED and result.failed_tests
+    }
+    for attempt in range(1, test_subsystem.retries + 1):
+        if not retrying:
+            break
+        retries = await concurrently(
+            Get(
+                PytestShardResult,
+                PytestShardRequest(
+                    test_files=nodes,
+                    index=i,
+                    count=len(shards),
+                    input_files=_sandbox_files(_node_files(nodes), snapshots, sandbox_graph),
+                    digest=snapshots.digest,
+                    venv=shard_venvs[i],
+                    project_dirs=_project_dirs(_node_files(nodes), snapshots),
+                    attempt=attempt,
+                ),
+            )
+            for i, nodes in retrying.items()
+        )
+        for (i, nodes), retry in zip(list(retrying.items()), retries, strict=True):
+            for node in nodes:
+                attempts[node].append(retry.tests.get(node, False))
+            still_failing = tuple(node for node in nodes if not attempts[node][-1])
+            if retry.exit_code == 0:
+                exit_codes[i] = 0
+                del retrying[i]
+            elif retry.exit_code == _TESTS_FAILED and still_failing:
+                retrying[i] = still_failing
+            else:
+                del retrying[i]
+
+    exit_code = 0
+    for i, result in enumerate(results):
+        if exit_codes[i] == 0:
+            retried = " (passed on retry)" if result.exit_code != 0 else ""
+            console.print_stdout(
+                f"✓ shard {i + 1}/{len(shards)}: {len(shards[i])} test file(s){retried}"
+            )
+        else:
+            exit_code = exit_codes[i]
+            # Full logs go to disk; the console gets the bounded summary
+            log_dir = os.path.join(distdir.relpath, "baseline", "test", f"shard-{i + 1}")
+            workspace.write_digest(await Get(Digest, AddPrefix(result.output.digest, log_dir)))
+            console.print_stdout(result.output.stdout.render(log_dir))
+            if result.output.stderr.line_count:
+                console.print_stderr(result.output.stderr.render(log_dir))
+            owners = sorted({snapshots.owners[path].spec for path in shards[i]})
+            console.print_stderr(
+                f"✗ shard {i + 1}/{len(shards)}: {len(shards[i])} test file(s) "
+                f"from {', '.join(owners)}"
+            )
+        timings.update(result.durations)
+    save_json_store(timings_path, timings)
+
+    if test_subsystem.retries:
+        flakiness_path = Path(global_options.pants_workdir, "baseline", "test_flakiness.json")
+        flakiness = load_json_store(flakiness_path, flakiness_entry)
+        record_attempts(flakiness, attempts)
+        save_json_store(flakiness_path, flakiness)
+        for node, passes in sorted(attempts.items()):
+            if not passes[0] and passes[-1]:
+                stats = flakiness[node]
+                console.print_stderr(
+                    f"⚠ flaky: {node} passed on attempt {len(passes)} "
+                    f"(flaky in {stats['flaky']} of {stats['runs']} runs)"
+                )
+
+    if test_subsystem.cache_outcomes:
+        # Runtime imports miss the conftest.py and __init__.py files above a test
+        import_graph = await Get(ImportGraph, ImportGraphRequest(snapshots.digest, project_dirs))
+        for result, shard_venv in zip(results, shard_venvs, strict=True):
+            record_outcomes(
+                outcomes,
+                {
+                    path: (passed, (*imports, *import_graph.required((path,), all_files)))
+                    for path, (passed, imports) in result.outcomes.items()
+                },
+                fingerprints,
+                shard_venv.key,
+            )
+        save_json_store(outcomes_path, outcomes)
+
+    coverage = await Get(
+        CoverageReport,
+        CoverageMergeRequest(
+            coverage_data=tuple(r.coverage_data for r in results),
+            sources=sources.digest,
+            # Any of the venvs can combine and report the shards' data
+            venv=shard_venvs[0],
+            project_dirs=project_dirs,
+            owners=FrozenDict({path: address.spec for path, address in snapshots.owners.items()}),
+            thresholds=FrozenDict(thresholds),
+        ),
+    )
+    console.print_stdout(coverage.report)
+    for project in coverage.projects:
+        if project.percent is None:
+            mark = "✓" if project.passed else "✗"
+            console.print_stderr(
+                f"{mark} {project.project}: no coverage data against its "
+                f"{project.threshold}% threshold"
+            )
+        elif not project.passed:
+            console.print_stderr(
+                f"✗ {project.project}: coverage {project.percent:.1f}% is below its "
+                f"{project.threshold}% threshold"
+            )
+    if coverage.exit_code != 0 and exit_code == 0:
+        exit_code = coverage.exit_code
 
-    return BaselineTest(exit_code=0)
+    return BaselineTest(exit_code=exit_code)
 
 
 def rules() -> Iterable:
@@ -0,0 +1,5 @@
+"""pytest plugins injected into the sandboxes of tests run by pants-baseline.
+
+These modules run inside the test venv, not inside Pants, so they must only
+import the standard library and pytest.
+"""
@@ -0,0 +1,171 @@
+"""Record each test file's outcome and the first-party files it loaded.
+
+Loaded with `-p baseline_outcomes` when `[baseline-test].cache_outcomes` is on,
+this plugin writes a JSON report to the path in `$BASELINE_OUTCOMES_FILE`:
+
+    {"tests/test_api.py": {"passed": true, "imports": ["src/app/api.py", ...]}}
+
+Imports are captured at run time, so they include what tests load lazily or
+through `importlib`, not just what their import statements name. Every executed
+`import` statement is recorded as an edge from the importing module, whichever
+test first triggered it; a test file's imports are the closure over those edges
+from its own module and from whatever it loaded while being collected or run.
+"""
+
+from __future__ import annotations
+
+import builtins
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+import pytest
+
+OUTCOMES_ENV = "BASELINE_OUTCOMES_FILE"
+
+
+class ImportRecorder:
+    """Record an edge from the importing module to each module it imports."""
+
+    def __init__(self) -> None:
+        self.edges: dict[str, set[str]] = defaultdict(set)
+        self._original = builtins.__import__
+
+    def install(self) -> None:
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        builtins.__import__ = self._original
+
+    def _import(
+        self,
+        name: str,
+        globals: Mapping[str, Any] | None = None,
+        locals: Mapping[str, Any] | None = None,
+        fromlist: Iterable[str] | None = (),
+        level: int = 0,
+    ) -> Any:
+        module = self._original(name, globals, locals, fromlist, level)
+        importer = (globals or {}).get("__name__")
+        if importer:
+            with contextlib.suppress(ImportError, ValueError):
+                self._record(importer, name, globals or {}, fromlist or (), level)
+        return module
+
+    def _record(
+        self,
+        importer: str,
+        name: str,
+        globals: Mapping[str, Any],
+        fromlist: Iterable[str],
+        level: int,
+    ) -> None:
+        if level:
+            name = importlib.util.resolve_name("." * level + name, globals.get("__package__"))
+        targets = [name, *(f"{name}.{item}" for item in fromlist if item != "*")]
+        for target in targets:
+            parts = target.split(".")
+            self.edges[importer].update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+
+def closure(edges: Mapping[str, Iterable[str]], start: Iterable[str]) -> set[str]:
+    """Return every module reachable from `start` over `edges`, `start` included."""
+    reached = set(start)
+    stack = list(reached)
+    while stack:
+        for module in edges.get(stack.pop(), ()):
+            if module not in reached:
+                reached.add(module)
+                stack.append(module)
+    return reached
+
+
+def first_party_files(modules: Iterable[str], loaded: Mapping[str, Any], root: Path) -> list[str]:
+    """Return the files below `root` defining `modules`, relative to `root`."""
+    files = set()
+    for name in modules:
+        path = getattr(loaded.get(name), "__file__", None)
+        if not path:
+            continue
+        try:
+            relative = Path(path).resolve().relative_to(root)
+        except ValueError:
+            continue
+        files.add(relative.as_posix())
+    return sorted(files)
+
+
+class OutcomeRecorder:
+    """The pytest hooks; one instance per session."""
+
+    def __init__(self, config: pytest.Config, output: str) -> None:
+        self.config = config
+        self.output = output
+        self.root = Path.cwd().resolve()
+        self.imports = ImportRecorder()
+        self.passed: dict[str, bool] = {}
+        # Test file -> modules it loaded while collected or run, its own module first
+        self.loaded: dict[str, set[str]] = defaultdict(set)
+
+    def _test_file(self, path: str | os.PathLike[str]) -> str:
+        return Path(self.config.rootpath, path).resolve().relative_to(self.root).as_posix()
+
+    def _tracking(self, path: str | os.PathLike[str]) -> Iterator[None]:
+        before = set(sys.modules)
+        yield
+        self.loaded[self._test_file(path)].update(set(sys.modules) - before)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(self, collector: pytest.Collector) -> Iterator[None]:
+        if isinstance(collector, pytest.Module):
+            yield from self._tracking(collector.path)
+        else:
+            yield
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Iterator[None]:
+        yield from self._tracking(item.path)
+
+    def pytest_collection_modifyitems(self, items: list[pytest.Item]) -> None:
+        for item in items:
+            module = getattr(item, "module", None)
+            if module is not None:
+                self.loaded[self._test_file(item.path)].add(module.__name__)
+
+    def _record_outcome(self, path: str, failed: bool) -> None:
+        self.passed[path] = self.passed.get(path, True) and not failed
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        if report.nodeid and report.failed:
+            self._record_outcome(self._test_file(report.nodeid.split("::")[0]), failed=True)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        self._record_outcome(self._test_file(report.nodeid.split("::")[0]), report.failed)
+
+    def pytest_sessionfinish(self) -> None:
+        self.imports.uninstall()
+        outcomes = {
+            path: {
+                "passed": passed,
+                "imports": first_party_files(
+                    closure(self.imports.edges, self.loaded.get(path, ())), sys.modules, self.root
+                ),
+            }
+            for path, passed in sorted(self.passed.items())
+        }
+        Path(self.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(self.output).write_text(json.dumps(outcomes, indent=0, sort_keys=True))
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    output = os.environ.get(OUTCOMES_ENV)
+    if not output:
+        return
+    recorder = OutcomeRecorder(config, output)
+    recorder.imports.install()
+    config.pluginmanager.register(recorder, "baseline_outcome_recorder")
@@ -3,8 +3,10 @@
 This module is the entry point for the Pants plugin system.
 It registers all rules, targets, and subsystems provided by this plugin.
 
-This plugin integrates with Pants' built-in lint, fmt, and check goals
-rather than providing custom goals.
+Ruff integrates with Pants' built-in lint and fmt goals, ty with `check` and
+pytest with the `test` goal, one result per project. The `baseline-test` goal
+shards pytest across cores instead, and the `baseline` goal runs every check
+concurrently in one session.
 """
 
 from typing import Iterable, Type
@@ -12,9 +14,23 @@ from typing import Iterable, Type
 from pants.engine.rules import Rule
 from pants.option.subsystem import Subsystem
 
-from pants_baseline.rules import fmt_rules, lint_rules
+from pants_baseline.goals import audit, baseline, fmt, lint, test, typecheck
+from pants_baseline.rules import (
+    audit_rules,
+    baseline_rules,
+    fmt_rules,
+    lint_rules,
+    output_rules,
+    snapshot_rules,
+    test_rules,
+    typecheck_rules,
+    venv_rules,
+)
 from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
+from pants_baseline.subsystems.ty import TySubsystem
+from pants_baseline.subsystems.uv import UvSubsystem
 from pants_baseline.targets import BaselinePythonProject
 
 
@@ -26,9 +42,26 @@ def rules() -> Iterable[Rule]:
     rather than using collect_rules() which only collects @rule functions.
     """
     return [
+        # Project files, globbed once and shared by every tool
+        *snapshot_rules.rules(),
+        # Bounded summaries of type checker and test output
+        *output_rules.rules(),
         # Tool rules (integrate with Pants built-in lint/fmt goals)
         *lint_rules.rules(),
         *fmt_rules.rules(),
+        *typecheck_rules.rules(),
+        # Test rules and the sharded baseline-test goal
+        *venv_rules.rules(),
+        *test_rules.rules(),
+        *test.rules(),
+        *audit_rules.rules(),
+        # Checks shared by the single-tool goals and the unified baseline goal
+        *baseline_rules.rules(),
+        *audit.rules(),
+        *lint.rules(),
+        *fmt.rules(),
+        *typecheck.rules(),
+        *baseline.rules(),
     ]
 
 
@@ -42,4 +75,7 @@ def subsystems() -> Iterable[Type[Subsystem]]:
     return [
         BaselineSubsystem,
         RuffSubsystem,
+        TySubsystem,
+        BaselinePytestSubsystem,
+        UvSubsystem,
     ]
@@ -1,11 +1,27 @@
 """Rules for the Python Baseline plugin."""
 
-from pants_baseline.rules import audit_rules, fmt_rules, lint_rules, test_rules, typecheck_rules
+from pants_baseline.rules import (
+    audit_rules,
+    baseline_rules,
+    fmt_rules,
+    lint_rules,
+    output_rules,
+    ruff_rules,
+    snapshot_rules,
+    test_rules,
+    typecheck_rules,
+    venv_rules,
+)
 
 __all__ = [
     "audit_rules",
+    "baseline_rules",
     "fmt_rules",
     "lint_rules",
+    "output_rules",
+    "ruff_rules",
+    "snapshot_rules",
     "test_rules",
     "typecheck_rules",
+    "venv_rules",
 ]
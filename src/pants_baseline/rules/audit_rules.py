@@ -1,102 +1,363 @@
-"""Rules for uv security auditing."""
+"""Rules for security auditing against a local advisory snapshot."""
 
+import json
+import logging
 from dataclasses import dataclass
 from typing import Iterable
 
-from pants.core.util_rules.external_tool import download_external_tool
-from pants.engine.fs import MergeDigests, PathGlobs
+from pants.core.util_rules.system_binaries import SEARCH_PATHS, BinaryPathRequest, find_binary
+from pants.engine.fs import EMPTY_DIGEST, Digest, PathGlobs
 from pants.engine.internals.selectors import concurrently
-from pants.engine.intrinsics import merge_digests, execute_process, path_globs_to_digest
-from pants.engine.platform import Platform
-from pants.engine.process import Process
+from pants.engine.intrinsics import (
+    execute_process,
+    get_digest_contents,
+    path_globs_to_digest,
+    path_globs_to_paths,
+)
+from pants.engine.process import Process, ProcessCacheScope
 from pants.engine.rules import collect_rules, implicitly, rule
 from pants.util.logging import LogLevel
 
 from pants_baseline.subsystems.uv import UvSubsystem
+from pants_baseline.util_rules.advisories import (
+    FALLBACK_DAYS,
+    FETCH_TIMEOUT_SECONDS,
+    SEVERITIES,
+    AdvisoryDatabase,
+    AdvisoryDatabaseError,
+    Vulnerability,
+    download_url,
+    earlier_days,
+    filter_vulnerabilities,
+)
+from pants_baseline.util_rules.lockfile import (
+    LockfileError,
+    candidate_lock_files,
+    locked_packages,
+)
+
+logger = logging.getLogger(__name__)
+
+# Where the download process writes the OSV export
+_EXPORT_PATH = "osv-export"
 
 
 @dataclass(frozen=True)
 class AuditResult:
-    """Result of running uv audit."""
+    """Result of auditing one lock file."""
 
     exit_code: int
-    stdout: str
-    stderr: str
-    vulnerabilities_found: int
+    vulnerabilities: tuple[Vulnerability, ...]
+    packages_audited: int
+    snapshot_date: str
+    stderr: str = ""
+
+    @property
+    def vulnerabilities_found(self) -> int:
+        """The number of distinct vulnerabilities found."""
+        return len(self.vulnerabilities)
+
+
+@dataclass(frozen=True)
+class AdvisorySnapshotRequest:
+    """Request for the advisory snapshot of `url` as of `day` (an ISO date)."""
+
+    url: str
+    day: str
+
+
+@dataclass(frozen=True)
+class AdvisorySnapshot:
+    """The files of an OSV export, as of the day they were fetched."""
+
+    digest: Digest
+    fetched: str
 
 
 @dataclass(frozen=True)
 class UvAuditRequest:
-    """Request to run uv audit."""
+    """Request to audit a lock file against an advisory snapshot."""
 
     lock_file: str
     ignore_vulns: tuple[str, ...]
-    output_format: str
+    min_severity: str
+    snapshot: AdvisorySnapshot
+
+
+@rule(desc="Fetch the advisory database", level=LogLevel.DEBUG)
+async def fetch_advisory_snapshot(request: AdvisorySnapshotRequest) -> AdvisorySnapshot:
+    """Fetch the OSV export, downloading it at most once per day.
+
+    A path in the repository is read like any other source file. Anything else is
+    downloaded by a process whose environment holds the day, so the process cache
+    serves that day's download to every later audit. If today's download fails, the
+    download of one of the previous days is used instead, if it is still cached.
+    """
+    url = download_url(request.url)
+    if url is None:
+        digest = await path_globs_to_digest(PathGlobs([request.url, f"{request.url}/**/*.json"]))
+        if digest == EMPTY_DIGEST:
+            raise AdvisoryDatabaseError(f"No OSV export found at {request.url}")
+        return AdvisorySnapshot(digest=digest, fetched=request.day)
+
+    curl_request = BinaryPathRequest(binary_name="curl", search_path=SEARCH_PATHS)
+    curl_paths = await find_binary(curl_request, **implicitly())
+    curl = curl_paths.first_path_or_raise(curl_request, rationale="download advisories")
+    argv = (
+        curl.path,
+        "--fail",
+        "--silent",
+        "--show-error",
+        "--location",
+        "--connect-timeout",
+        str(FETCH_TIMEOUT_SECONDS),
+        # Give up on a stalled transfer rather than on a slow one
+        "--speed-limit",
+        "1",
+        "--speed-time",
+        str(FETCH_TIMEOUT_SECONDS),
+        "--output",
+        _EXPORT_PATH,
+        url,
+    )
+
+    error = ""
+    for day in (request.day, *earlier_days(request.day, FALLBACK_DAYS)):
+        result = await execute_process(
+            Process(
+                argv=argv,
+                env={"BASELINE_ADVISORY_DAY": day},
+                output_files=(_EXPORT_PATH,),
+                cache_scope=ProcessCacheScope.SUCCESSFUL,
+                description=f"Download advisories from {url} for {day}",
+                level=LogLevel.DEBUG,
+            ),
+            **implicitly(),
+        )
+        if result.exit_code == 0:
+            if day != request.day:
+                logger.warning(f"Failed to refresh advisories from {url}, using {day}: {error}")
+            return AdvisorySnapshot(digest=result.output_digest, fetched=day)
+        error = error or result.stderr.decode(errors="replace").strip()
+    raise AdvisoryDatabaseError(f"Failed to fetch advisories from {url}: {error}")
+
+
+@rule(desc="Load the advisory database", level=LogLevel.DEBUG)
+async def load_advisory_database(snapshot: AdvisorySnapshot) -> AdvisoryDatabase:
+    """Index the advisories of a snapshot, once per snapshot."""
+    contents = await get_digest_contents(snapshot.digest)
+    return AdvisoryDatabase.from_osv((fc.path, fc.content) for fc in contents)
+
+
+@dataclass(frozen=True)
+class LockedPackageRequest:
+    """Request for the vulnerabilities of one locked package version."""
+
+    snapshot: AdvisorySnapshot
+    name: str
+    version: str
+
+
+@dataclass(frozen=True)
+class LockedPackageVulnerabilities:
+    """Every vulnerability in one package version, before any filtering."""
+
+    vulnerabilities: tuple[Vulnerability, ...]
 
 
-@rule(desc="Audit dependencies with uv", level=LogLevel.DEBUG)
+@rule(desc="Match a package against the advisory snapshot", level=LogLevel.TRACE)
+async def match_locked_package(request: LockedPackageRequest) -> LockedPackageVulnerabilities:
+    """Match one package version against the advisory snapshot.
+
+    The engine memoizes the result per snapshot and package version, so after a lock
+    file change only the added or bumped packages are matched, and a package pinned
+    in several lock files is matched once. Ignores and the minimum severity are
+    applied afterwards, so changing them needs no re-match.
+    """
+    database = await load_advisory_database(request.snapshot)
+    return LockedPackageVulnerabilities(
+        database.package_vulnerabilities(request.name, request.version)
+    )
+
+
+@rule(desc="Audit dependencies", level=LogLevel.DEBUG)
 async def run_uv_audit(
     request: UvAuditRequest,
     uv_subsystem: UvSubsystem,
-    platform: Platform,
 ) -> AuditResult:
-    """Run uv audit on dependencies."""
-    # Download uv and get lock files in parallel using new intrinsics
-    downloaded_uv_get = download_external_tool(uv_subsystem.get_request(platform))
-    lock_file_digest_get = path_globs_to_digest(
-        PathGlobs([request.lock_file, "pyproject.toml", "requirements.txt"])
+    """Match the lock file's pinned packages against the advisory snapshot."""
+    lock_file_contents = await get_digest_contents(
+        await path_globs_to_digest(PathGlobs([request.lock_file]))
     )
+    if not lock_file_contents:
+        return AuditResult(
+            exit_code=1 if uv_subsystem.require_lock else 0,
+            vulnerabilities=(),
+            packages_audited=0,
+            snapshot_date="",
+            stderr=f"Lock file not found: {request.lock_file}",
+        )
 
-    downloaded_uv, lock_file_digest = await concurrently(
-        downloaded_uv_get,
-        lock_file_digest_get,
-    )
+    lock_file = lock_file_contents[0]
+    try:
+        packages = locked_packages(lock_file.path, lock_file.content)
+    except LockfileError as e:
+        return AuditResult(
+            exit_code=1,
+            vulnerabilities=(),
+            packages_audited=0,
+            snapshot_date=request.snapshot.fetched,
+            stderr=str(e),
+        )
 
-    # Merge the uv binary with lock files
-    input_digest = await merge_digests(
-        MergeDigests([downloaded_uv.digest, lock_file_digest]),
+    matches = await concurrently(
+        match_locked_package(LockedPackageRequest(request.snapshot, name, version))
+        for name, version in packages
+    )
+    vulnerabilities = filter_vulnerabilities(
+        (v for match in matches for v in match.vulnerabilities),
+        request.ignore_vulns,
+        request.min_severity,
     )
 
-    # Build ignore args
-    ignore_args = []
-    for vuln in request.ignore_vulns:
-        ignore_args.extend(["--ignore", vuln])
-
-    argv = [
-        downloaded_uv.exe,
-        "pip",
-        "audit",
-        f"--output-format={request.output_format}",
-        *ignore_args,
-    ]
-
-    process = Process(
-        argv=argv,
-        input_digest=input_digest,
-        description="Run uv security audit",
-        level=LogLevel.DEBUG,
+    return AuditResult(
+        exit_code=1 if vulnerabilities else 0,
+        vulnerabilities=vulnerabilities,
+        packages_audited=len(packages),
+        snapshot_date=request.snapshot.fetched,
     )
 
-    result = await execute_process(process, **implicitly())
 
-    stdout = result.stdout.decode()
-    stderr = result.stderr.decode()
+@dataclass(frozen=True)
+class ProjectAuditRequest:
+    """Request to audit the lock files of the projects in `project_dirs` on `day`."""
 
-    # Parse vulnerability count from output (simplified)
-    vulnerabilities_found = 0
-    if result.exit_code != 0:
-        # Count lines that look like vulnerability reports
-        for line in stdout.split("\n"):
-            if "vulnerability" in line.lower() or "CVE-" in line or "GHSA-" in line:
-                vulnerabilities_found += 1
+    project_dirs: tuple[str, ...]
+    day: str
 
-    return AuditResult(
-        exit_code=result.exit_code,
-        stdout=stdout,
-        stderr=stderr,
-        vulnerabilities_found=vulnerabilities_found,
+
+@dataclass(frozen=True)
+class ProjectAudits:
+    """The audit of every distinct lock file used by a set of projects."""
+
+    lock_files: tuple[str, ...]
+    results: tuple[AuditResult, ...]
+    snapshot_date: str
+
+    @property
+    def exit_code(self) -> int:
+        """The worst exit code over all lock files."""
+        return max((result.exit_code for result in self.results), default=0)
+
+    @property
+    def summary(self) -> str:
+        """Summarize how much the audit covered."""
+        return (
+            f"Audited {sum(r.packages_audited for r in self.results)} packages in "
+            f"{len(self.lock_files)} lock file(s) "
+            f"(advisory snapshot of {self.snapshot_date})."
+        )
+
+
+@rule(desc="Audit project lock files", level=LogLevel.DEBUG)
+async def audit_projects(
+    request: ProjectAuditRequest,
+    uv_subsystem: UvSubsystem,
+) -> ProjectAudits:
+    """Audit each project's lock file concurrently against one shared snapshot.
+
+    Projects without their own lock file share the nearest one in an enclosing
+    directory, and each distinct lock file is audited once.
+    """
+    min_severity = uv_subsystem.audit_min_severity
+    if min_severity not in SEVERITIES:
+        raise ValueError(
+            f"--baseline-uv-audit-min-severity must be one of {', '.join(SEVERITIES)}, "
+            f"got {min_severity!r}"
+        )
+
+    candidates = {
+        directory: candidate_lock_files(directory, uv_subsystem.lock_file)
+        for directory in request.project_dirs
+    }
+    existing, snapshot = await concurrently(
+        path_globs_to_paths(PathGlobs(sorted({c for cs in candidates.values() for c in cs}))),
+        fetch_advisory_snapshot(
+            AdvisorySnapshotRequest(url=uv_subsystem.advisory_url, day=request.day),
+            **implicitly(),
+        ),
+    )
+    existing_files = set(existing.files)
+    lock_files = sorted(
+        {next((c for c in cs if c in existing_files), cs[0]) for cs in candidates.values()}
     )
 
+    results = await concurrently(
+        run_uv_audit(
+            UvAuditRequest(
+                lock_file=lock_file,
+                ignore_vulns=tuple(uv_subsystem.audit_ignore_vulns),
+                min_severity=min_severity,
+                snapshot=snapshot,
+            ),
+            **implicitly(),
+        )
+        for lock_file in lock_files
+    )
+    return ProjectAudits(
+        lock_files=tuple(lock_files),
+        results=tuple(results),
+        snapshot_date=snapshot.fetched,
+    )
+
+
+def render_vulnerabilities(
+    results: Iterable[tuple[str, Iterable[Vulnerability]]], output_format: str
+) -> str:
+    """Render each lock file's vulnerabilities as tables, JSON, or GitHub annotations."""
+    results = [(lock_file, list(vulnerabilities)) for lock_file, vulnerabilities in results]
+    if output_format == "json":
+        return json.dumps(
+            [
+                {"lock_file": lock_file, **v.to_json()}
+                for lock_file, vulnerabilities in results
+                for v in vulnerabilities
+            ],
+            indent=2,
+        )
+    if output_format == "github":
+        return "\n".join(
+            f"::error file={lock_file},title={v.advisory_id}::"
+            f"{v.package} {v.version} is affected by {v.advisory_id} ({v.severity})"
+            + (f", fixed in {v.fix_version}" if v.fix_version else "")
+            for lock_file, vulnerabilities in results
+            for v in vulnerabilities
+        )
+
+    sections = []
+    for lock_file, vulnerabilities in results:
+        if not vulnerabilities:
+            continue
+        rows = [
+            (
+                f"{v.package} {v.version}",
+                v.advisory_id,
+                v.severity,
+                f"fix: {v.fix_version}" if v.fix_version else "no fix",
+            )
+            for v in vulnerabilities
+        ]
+        widths = [max(len(row[i]) for row in rows) for i in range(3)]
+        lines = [f"{lock_file}:"]
+        for row, vulnerability in zip(rows, vulnerabilities, strict=True):
+            # The last column is not padded
+            cells = [cell.ljust(width) for cell, width in zip(row, widths, strict=False)]
+            lines.append("  " + "  ".join([*cells, row[3]]))
+            if vulnerability.summary:
+                lines.append(f"      {vulnerability.summary}")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
 
 def rules() -> Iterable:
     """Return all audit rules."""
@@ -0,0 +1,261 @@
+"""Rules running each baseline check over a set of projects.
+
+Every check returns a `BaselineCheckResult`, so the unified `baseline` goal can run
+them concurrently in one session and the single-tool goals can share them. Checks
+are built on the same rules as Pants' own lint, fmt, check and test integrations,
+so tool downloads, source snapshots and process results are shared between them.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from pants.core.goals.check import CheckResults
+from pants.engine.fs import EMPTY_DIGEST, Digest, FileEntry, MergeDigests, PathGlobs
+from pants.engine.internals.selectors import concurrently
+from pants.engine.internals.session import RunId
+from pants.engine.intrinsics import (
+    digest_to_snapshot,
+    get_digest_entries,
+    merge_digests,
+    path_globs_to_digest,
+)
+from pants.engine.rules import collect_rules, implicitly, rule
+from pants.engine.target import Target
+from pants.util.logging import LogLevel
+
+from pants_baseline.rules.audit_rules import (
+    ProjectAuditRequest,
+    audit_projects,
+    render_vulnerabilities,
+)
+from pants_baseline.rules.fmt_rules import RuffFmtFieldSet, RuffFmtRequest, run_ruff_fmt
+from pants_baseline.rules.lint_rules import RuffLintFieldSet, RuffLintRequest, run_ruff_lint
+from pants_baseline.rules.ruff_rules import RuffBatchesRequest, partition_ruff_sources
+from pants_baseline.rules.test_rules import PytestFieldSet, PytestTestRequest, run_pytest
+from pants_baseline.rules.typecheck_rules import TyCheckRequest, TyFieldSet, run_ty_check
+from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.targets import SkipAuditField
+
+
+@dataclass(frozen=True)
+class BaselineCheckResult:
+    """Outcome of one baseline check."""
+
+    name: str
+    exit_code: int
+    stdout: str
+    stderr: str
+    detail: str
+    elapsed: float
+    # Files the check would rewrite, e.g. by formatting
+    output_digest: Digest = EMPTY_DIGEST
+
+
+@dataclass(frozen=True)
+class BaselineCheckRequest:
+    """The `baseline_python_project` targets a check runs over."""
+
+    projects: tuple[Target, ...]
+
+
+class LintCheckRequest(BaselineCheckRequest):
+    """Request to lint the projects' sources and tests with Ruff."""
+
+
+class FmtCheckRequest(BaselineCheckRequest):
+    """Request to check that the projects' sources and tests are formatted."""
+
+
+class TypecheckCheckRequest(BaselineCheckRequest):
+    """Request to type check the projects with ty."""
+
+
+class PytestCheckRequest(BaselineCheckRequest):
+    """Request to run each project's tests."""
+
+
+@dataclass(frozen=True)
+class AuditCheckRequest(BaselineCheckRequest):
+    """Request to audit the projects' lock files as of `day`."""
+
+    day: str
+
+
+def _joined(outputs: Iterable[str]) -> str:
+    return "\n".join(output.rstrip() for output in outputs if output.strip())
+
+
+# Each check takes the RunId so that its wall time is measured on every run, while
+# the work it awaits stays memoized.
+
+
+@rule(desc="Baseline lint check", level=LogLevel.DEBUG)
+async def run_lint_check(
+    request: LintCheckRequest, run_id: RunId, baseline_subsystem: BaselineSubsystem
+) -> BaselineCheckResult:
+    """Lint every batch of the projects' files with Ruff."""
+    start = time.perf_counter()
+    field_sets = [
+        RuffLintFieldSet.create(t) for t in request.projects if RuffLintFieldSet.is_applicable(t)
+    ]
+    batches = await partition_ruff_sources(
+        RuffBatchesRequest.for_field_sets(field_sets, baseline_subsystem)
+    )
+    results = await concurrently(
+        run_ruff_lint(
+            RuffLintRequest.Batch(RuffLintRequest.tool_name, batch.files, batch.metadata),
+            **implicitly(),
+        )
+        for batch in batches
+    )
+    return BaselineCheckResult(
+        name="lint",
+        exit_code=max((r.exit_code for r in results), default=0),
+        stdout=_joined(r.stdout for r in results),
+        stderr=_joined(r.stderr for r in results),
+        detail=f"{sum(len(b.files) for b in batches)} files in {len(batches)} batch(es)",
+        elapsed=time.perf_counter() - start,
+    )
+
+
+@rule(desc="Baseline format check", level=LogLevel.DEBUG)
+async def run_fmt_check(
+    request: FmtCheckRequest, run_id: RunId, baseline_subsystem: BaselineSubsystem
+) -> BaselineCheckResult:
+    """Format every batch of the projects' files and report which would change."""
+    start = time.perf_counter()
+    field_sets = [
+        RuffFmtFieldSet.create(t) for t in request.projects if RuffFmtFieldSet.is_applicable(t)
+    ]
+    batches = await partition_ruff_sources(
+        RuffBatchesRequest.for_field_sets(field_sets, baseline_subsystem)
+    )
+    digests = await concurrently(path_globs_to_digest(PathGlobs(b.files)) for b in batches)
+    snapshots = await concurrently(digest_to_snapshot(digest) for digest in digests)
+    results = await concurrently(
+        run_ruff_fmt(
+            RuffFmtRequest.Batch(RuffFmtRequest.tool_name, batch.files, batch.metadata, snapshot),
+            **implicitly(),
+        )
+        for batch, snapshot in zip(batches, snapshots, strict=True)
+    )
+
+    changed_results = [r for r in results if r.did_change]
+    entries = await concurrently(
+        get_digest_entries(digest)
+        for r in changed_results
+        for digest in (r.input.digest, r.output.digest)
+    )
+    changed_files = sorted(
+        entry.path
+        for before, after in zip(entries[::2], entries[1::2], strict=True)
+        # Entries are hashable, so this is linear in the number of files
+        for entry in set(after) - set(before)
+        if isinstance(entry, FileEntry)
+    )
+    output_digest = await merge_digests(MergeDigests(r.output.digest for r in changed_results))
+
+    return BaselineCheckResult(
+        name="fmt",
+        exit_code=1 if changed_files else 0,
+        stdout="\n".join(f"Would reformat: {path}" for path in changed_files),
+        stderr="",
+        detail=f"{len(changed_files)} of {sum(len(b.files) for b in batches)} files unformatted",
+        elapsed=time.perf_counter() - start,
+        output_digest=output_digest,
+    )
+
+
+@rule(desc="Baseline type check", level=LogLevel.DEBUG)
+async def run_typecheck_check(request: TypecheckCheckRequest, run_id: RunId) -> BaselineCheckResult:
+    """Type check the projects with ty."""
+    start = time.perf_counter()
+    field_sets = [TyFieldSet.create(t) for t in request.projects if TyFieldSet.is_applicable(t)]
+    results: CheckResults = await run_ty_check(TyCheckRequest(field_sets), **implicitly())
+    return BaselineCheckResult(
+        name="typecheck",
+        exit_code=results.exit_code(),
+        stdout=_joined(
+            f"{r.partition_description}:\n{r.stdout}" if r.partition_description else r.stdout
+            for r in results.results
+            if r.exit_code != 0
+        ),
+        stderr=_joined(r.stderr for r in results.results),
+        detail=f"{len(field_sets)} project(s) in {len(results.results)} partition(s)",
+        elapsed=time.perf_counter() - start,
+    )
+
+
+@rule(desc="Baseline test check", level=LogLevel.DEBUG)
+async def run_pytest_check(request: PytestCheckRequest, run_id: RunId) -> BaselineCheckResult:
+    """Run each project's tests as its own cached process."""
+    start = time.perf_counter()
+    field_sets = [
+        PytestFieldSet.create(t) for t in request.projects if PytestFieldSet.is_applicable(t)
+    ]
+    results = await concurrently(
+        run_pytest(
+            PytestTestRequest.Batch(PytestTestRequest.tool_name, (field_set,), None),
+            **implicitly(),
+        )
+        for field_set in field_sets
+    )
+    failed = [
+        (fs, r) for fs, r in zip(field_sets, results, strict=True) if r.exit_code not in (0, None)
+    ]
+    return BaselineCheckResult(
+        name="test",
+        exit_code=max((r.exit_code for _, r in failed), default=0),
+        stdout=_joined(f"{fs.address}:\n{r.stdout}" for fs, r in failed),
+        stderr=_joined(r.stderr for _, r in failed),
+        detail=f"{len(field_sets) - len(failed)} of {len(field_sets)} project(s) passed",
+        elapsed=time.perf_counter() - start,
+    )
+
+
+@rule(desc="Baseline audit check", level=LogLevel.DEBUG)
+async def run_audit_check(request: AuditCheckRequest, run_id: RunId) -> BaselineCheckResult:
+    """Audit the lock files of the projects that do not skip auditing."""
+    start = time.perf_counter()
+    project_dirs = sorted(
+        {
+            tgt.address.spec_path
+            for tgt in request.projects
+            if tgt.has_field(SkipAuditField) and not tgt[SkipAuditField].value
+        }
+    )
+    if not project_dirs:
+        return BaselineCheckResult(
+            name="audit",
+            exit_code=0,
+            stdout="",
+            stderr="",
+            detail="no projects to audit",
+            elapsed=time.perf_counter() - start,
+        )
+
+    audits = await audit_projects(
+        ProjectAuditRequest(project_dirs=tuple(project_dirs), day=request.day), **implicitly()
+    )
+    return BaselineCheckResult(
+        name="audit",
+        exit_code=audits.exit_code,
+        stdout=render_vulnerabilities(
+            [
+                (lf, r.vulnerabilities)
+                for lf, r in zip(audits.lock_files, audits.results, strict=True)
+            ],
+            "text",
+        ),
+        stderr=_joined(r.stderr for r in audits.results),
+        detail=audits.summary,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def rules() -> Iterable:
+    """Return all baseline check rules."""
+    return collect_rules()
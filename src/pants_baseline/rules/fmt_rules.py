@@ -1,33 +1,48 @@
 """Rules for Ruff formatting."""
 
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Iterable
 
 from pants.core.goals.fmt import FmtResult, FmtTargetsRequest
-from pants.core.util_rules.external_tool import DownloadedExternalTool, download_external_tool
-from pants.core.util_rules.partitions import PartitionerType
+from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.partitions import Partition, PartitionerType, Partitions
 from pants.engine.fs import Digest, MergeDigests
+from pants.engine.internals.selectors import concurrently
 from pants.engine.intrinsics import merge_digests
 from pants.engine.platform import Platform
 from pants.engine.process import FallibleProcessResult, Process, execute_process_or_raise
 from pants.engine.rules import collect_rules, implicitly, rule
-from pants.engine.target import FieldSet
+from pants.engine.target import Target
 from pants.util.logging import LogLevel
 from pants.util.meta import classproperty
 
-from pants.backend.python.target_types import PythonSourceField
-
+from pants_baseline.rules import ruff_rules
+from pants_baseline.rules.ruff_rules import (
+    RuffAllRequest,
+    RuffBatchesRequest,
+    RuffBatchMetadata,
+    RuffFieldSet,
+    RuffFmtError,
+    partition_ruff_sources,
+    ruff_config_file,
+    run_ruff_all,
+)
 from pants_baseline.subsystems.baseline import BaselineSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
+from pants_baseline.targets import SkipFormatField
+from pants_baseline.util_rules.file_args import file_args
 
 
 @dataclass(frozen=True)
-class RuffFmtFieldSet(FieldSet):
+class RuffFmtFieldSet(RuffFieldSet):
     """Field set for Ruff formatting."""
 
-    required_fields = (PythonSourceField,)
+    skip_fmt: SkipFormatField
 
-    sources: PythonSourceField
+    @classmethod
+    def opt_out(cls, tgt: Target) -> bool:
+        """Allow targets to opt out of formatting, so they are never snapshotted."""
+        return tgt.get(SkipFormatField).value
 
 
 class RuffFmtRequest(FmtTargetsRequest):
@@ -35,7 +50,7 @@ class RuffFmtRequest(FmtTargetsRequest):
 
     field_set_type = RuffFmtFieldSet
     tool_subsystem = RuffSubsystem
-    partitioner_type = PartitionerType.DEFAULT_SINGLE_PARTITION
+    partitioner_type = PartitionerType.CUSTOM
 
     @classproperty
     def tool_name(cls) -> str:
@@ -46,9 +61,25 @@ class RuffFmtRequest(FmtTargetsRequest):
         return "baseline-ruff-fmt"
 
 
+@rule(desc="Partition Ruff format into shards", level=LogLevel.DEBUG)
+async def partition_ruff_fmt(
+    request: RuffFmtRequest.PartitionRequest[RuffFmtFieldSet],
+    ruff_subsystem: RuffSubsystem,
+    baseline_subsystem: BaselineSubsystem,
+) -> Partitions[str, RuffBatchMetadata]:
+    """Split the files to format into the same stable shards as lint."""
+    if ruff_subsystem.skip or not baseline_subsystem.enabled:
+        return Partitions()
+
+    batches = await partition_ruff_sources(
+        RuffBatchesRequest.for_field_sets(request.field_sets, baseline_subsystem)
+    )
+    return Partitions(Partition(batch.files, batch.metadata) for batch in batches)
+
+
 @rule(desc="Format with Ruff", level=LogLevel.DEBUG)
 async def run_ruff_fmt(
-    request: RuffFmtRequest.Batch[RuffFmtFieldSet, Any],
+    request: RuffFmtRequest.Batch[str, RuffBatchMetadata],
     ruff_subsystem: RuffSubsystem,
     baseline_subsystem: BaselineSubsystem,
     platform: Platform,
@@ -64,24 +95,45 @@ async def run_ruff_fmt(
     if not snapshot.files:
         return FmtResult.skip(request, formatter_name="baseline-ruff-fmt")
 
-    # Download ruff
-    downloaded_ruff: DownloadedExternalTool = await download_external_tool(
-        ruff_subsystem.get_request(platform)
+    if ruff_subsystem.combined:
+        # Same request as the linter builds for this shard, so one process serves both
+        combined = await run_ruff_all(
+            RuffAllRequest(snapshot, request.partition_metadata.settings), **implicitly()
+        )
+        # Lint findings do not fail fmt, but a fix or format step that failed does
+        if combined.fmt_exit_code != 0:
+            raise RuffFmtError(
+                f"Ruff fix and format failed with exit code {combined.fmt_exit_code} on "
+                f"{len(snapshot.files)} files:\n{combined.stderr}"
+            )
+        return FmtResult(
+            input=snapshot,
+            output=combined.output,
+            stdout=combined.stdout,
+            stderr=combined.stderr,
+            tool_name=request.tool_name,
+        )
+
+    # Download ruff and render this batch's config in parallel
+    downloaded_ruff, config = await concurrently(
+        download_external_tool(ruff_subsystem.get_request(platform)),
+        ruff_config_file(request.partition_metadata.settings, **implicitly()),
     )
 
-    # Merge the ruff binary with the source files
+    # Merge the ruff binary and config with the source files
     input_digest: Digest = await merge_digests(
-        MergeDigests([downloaded_ruff.digest, snapshot.digest]),
+        MergeDigests([downloaded_ruff.digest, config.digest, snapshot.digest]),
     )
 
-    # Build Ruff format command
-    # Note: quote-style and indent-style are config file options only in ruff 0.9+
+    # Build Ruff format command; quote and indent style come from the config file
+    # Huge batches are passed as directory roots; the sandbox holds only this batch's files
+    targets = file_args(snapshot.files)
     argv = [
         downloaded_ruff.exe,
         "format",
-        f"--target-version=py{baseline_subsystem.python_version.replace('.', '')}",
-        f"--line-length={baseline_subsystem.line_length}",
-        *snapshot.files,
+        *config.args,
+        *ruff_subsystem.cache_args("format", config.fingerprint),
+        *targets.args,
     ]
 
     result: FallibleProcessResult = await execute_process_or_raise(
@@ -90,6 +142,7 @@ async def run_ruff_fmt(
                 argv=argv,
                 input_digest=input_digest,
                 output_files=snapshot.files,
+                append_only_caches=ruff_subsystem.append_only_caches,
                 description=f"Run Ruff format on {len(snapshot.files)} files",
                 level=LogLevel.DEBUG,
             )
@@ -104,5 +157,6 @@ def rules() -> Iterable:
     """Return all format rules."""
     return [
         *collect_rules(),
+        *ruff_rules.rules(),
         *RuffFmtRequest.rules(),
     ]
@@ -1,34 +1,52 @@
 """Rules for Ruff linting."""
 
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Iterable
 
 from pants.core.goals.lint import LintResult, LintTargetsRequest
-from pants.core.util_rules.external_tool import DownloadedExternalTool, download_external_tool
-from pants.core.util_rules.partitions import PartitionerType
-from pants.core.util_rules.source_files import SourceFiles, SourceFilesRequest, determine_source_files
-from pants.engine.fs import Digest, MergeDigests
-from pants.engine.intrinsics import execute_process, merge_digests
+from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.partitions import Partition, PartitionerType, Partitions
+from pants.engine.fs import Digest, MergeDigests, PathGlobs
+from pants.engine.internals.selectors import concurrently
+from pants.engine.intrinsics import (
+    digest_to_snapshot,
+    execute_process,
+    merge_digests,
+    path_globs_to_digest,
+)
 from pants.engine.platform import Platform
 from pants.engine.process import Process
 from pants.engine.rules import collect_rules, implicitly, rule
-from pants.engine.target import FieldSet
+from pants.engine.target import Target
 from pants.util.logging import LogLevel
 from pants.util.meta import classproperty
 
-from pants.backend.python.target_types import PythonSourceField
-
+from pants_baseline.rules import ruff_rules
+from pants_baseline.rules.ruff_rules import (
+    RuffAllRequest,
+    RuffBatchesRequest,
+    RuffBatchMetadata,
+    RuffFieldSet,
+    partition_ruff_sources,
+    ruff_config_file,
+    run_ruff_all,
+)
 from pants_baseline.subsystems.baseline import BaselineSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
+from pants_baseline.targets import SkipLintField
+from pants_baseline.util_rules.file_args import file_args
 
 
 @dataclass(frozen=True)
-class RuffLintFieldSet(FieldSet):
+class RuffLintFieldSet(RuffFieldSet):
     """Field set for Ruff linting."""
 
-    required_fields = (PythonSourceField,)
+    skip_lint: SkipLintField
 
-    sources: PythonSourceField
+    @classmethod
+    def opt_out(cls, tgt: Target) -> bool:
+        """Allow targets to opt out of linting, so they are never snapshotted."""
+        return tgt.get(SkipLintField).value
 
 
 class RuffLintRequest(LintTargetsRequest):
@@ -36,7 +54,7 @@ class RuffLintRequest(LintTargetsRequest):
 
     field_set_type = RuffLintFieldSet
     tool_subsystem = RuffSubsystem
-    partitioner_type = PartitionerType.DEFAULT_SINGLE_PARTITION
+    partitioner_type = PartitionerType.CUSTOM
 
     @classproperty
     def tool_name(cls) -> str:
@@ -47,58 +65,66 @@ class RuffLintRequest(LintTargetsRequest):
         return "baseline-ruff"
 
 
-@rule(desc="Lint with Ruff", level=LogLevel.DEBUG)
-async def run_ruff_lint(
-    request: RuffLintRequest.Batch[RuffLintFieldSet, Any],
+@rule(desc="Partition Ruff lint into shards", level=LogLevel.DEBUG)
+async def partition_ruff_lint(
+    request: RuffLintRequest.PartitionRequest[RuffLintFieldSet],
     ruff_subsystem: RuffSubsystem,
     baseline_subsystem: BaselineSubsystem,
-    platform: Platform,
-) -> LintResult:
-    """Run Ruff linter on Python files."""
-    if ruff_subsystem.skip:
-        return LintResult.create(request, exit_code=0, stdout="", stderr="", strip_chroot_path=True)
+) -> Partitions[str, RuffBatchMetadata]:
+    """Split the files to lint into stable shards that run and cache independently."""
+    if ruff_subsystem.skip or not baseline_subsystem.enabled:
+        return Partitions()
 
-    if not baseline_subsystem.enabled:
-        return LintResult.create(request, exit_code=0, stdout="", stderr="", strip_chroot_path=True)
-
-    field_sets = list(request.elements)
+    batches = await partition_ruff_sources(
+        RuffBatchesRequest.for_field_sets(request.field_sets, baseline_subsystem)
+    )
+    return Partitions(Partition(batch.files, batch.metadata) for batch in batches)
 
-    if not field_sets:
-        return LintResult.create(request, exit_code=0, stdout="No targets to lint", stderr="", strip_chroot_path=True)
 
-    # Download ruff and get source files
-    downloaded_ruff: DownloadedExternalTool = await download_external_tool(
-        ruff_subsystem.get_request(platform)
-    )
-    sources: SourceFiles = await determine_source_files(
-        SourceFilesRequest(
-            sources_fields=[fs.sources for fs in field_sets],
-            for_sources_types=(PythonSourceField,),
+@rule(desc="Lint with Ruff", level=LogLevel.DEBUG)
+async def run_ruff_lint(
+    request: RuffLintRequest.Batch[str, RuffBatchMetadata],
+    ruff_subsystem: RuffSubsystem,
+    platform: Platform,
+) -> LintResult:
+    """Run Ruff linter on one shard of Python files."""
+    files = tuple(request.elements)
+
+    if ruff_subsystem.combined:
+        # Same request as the formatter builds for this shard, so one process serves both
+        snapshot = await digest_to_snapshot(await path_globs_to_digest(PathGlobs(files)))
+        combined = await run_ruff_all(
+            RuffAllRequest(snapshot, request.partition_metadata.settings), **implicitly()
+        )
+        return LintResult(
+            exit_code=combined.exit_code,
+            stdout=combined.stdout,
+            stderr=combined.stderr,
+            linter_name=request.tool_name,
+            partition_description=request.partition_metadata.description,
         )
-    )
 
-    if not sources.files:
-        return LintResult.create(request, exit_code=0, stdout="No files to lint", stderr="", strip_chroot_path=True)
+    # Download ruff, snapshot this shard's files and render its config in parallel
+    downloaded_ruff, sources_digest, config = await concurrently(
+        download_external_tool(ruff_subsystem.get_request(platform)),
+        path_globs_to_digest(PathGlobs(files)),
+        ruff_config_file(request.partition_metadata.settings, **implicitly()),
+    )
 
-    # Merge the ruff binary with the source files
+    # Merge the ruff binary and config with the source files
     input_digest: Digest = await merge_digests(
-        MergeDigests([downloaded_ruff.digest, sources.snapshot.digest]),
+        MergeDigests([downloaded_ruff.digest, config.digest, sources_digest]),
     )
 
-    # Build Ruff command
-    select_args = [f"--select={','.join(ruff_subsystem.select)}"] if ruff_subsystem.select else []
-    ignore_args = [f"--ignore={','.join(ruff_subsystem.ignore)}"] if ruff_subsystem.ignore else []
-
-    # Build Ruff check command
-    # Note: line-length is a config file option only in ruff 0.9+
+    # Huge shards are passed as directory roots; the sandbox holds only this shard's files
+    targets = file_args(files)
     argv = [
         downloaded_ruff.exe,
         "check",
-        f"--target-version=py{baseline_subsystem.python_version.replace('.', '')}",
-        *select_args,
-        *ignore_args,
+        *config.args,
+        *ruff_subsystem.cache_args("check", config.fingerprint),
         "--output-format=concise",
-        *sources.files,
+        *targets.args,
     ]
 
     # execute_process returns FallibleProcessResult which LintResult.create accepts directly
@@ -106,7 +132,8 @@ async def run_ruff_lint(
         Process(
             argv=argv,
             input_digest=input_digest,
-            description=f"Run Ruff lint on {len(sources.files)} files",
+            append_only_caches=ruff_subsystem.append_only_caches,
+            description=f"Run Ruff lint on {len(files)} files",
             level=LogLevel.DEBUG,
         ),
         **implicitly(),
@@ -120,5 +147,6 @@ def rules() -> Iterable:
     """Return all lint rules."""
     return [
         *collect_rules(),
+        *ruff_rules.rules(),
         *RuffLintRequest.rules(),
     ]
@@ -0,0 +1,120 @@
+"""Rules keeping tool output as digests and summarizing it.
+
+Type checkers and test runners write their output to log files in the sandbox
+instead of to pipes, so it is captured as part of the process's output digest
+rather than as bytes on the process result. The same process then cuts the head,
+tail and line count out of each log. The rules API can only load a file from the
+store as a whole, so `summarize_process_output` reads just those parts into bounded
+`OutputSummary`s; rules never load the full logs, and the memoized results hold the
+summaries and the logs' digests, never the full text.
+"""
+
+from __future__ import annotations
+
+import shlex
+from dataclasses import dataclass
+from typing import Iterable
+
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import (
+    EMPTY_FILE_DIGEST,
+    Digest,
+    DigestSubset,
+    FileDigest,
+    FileEntry,
+    PathGlobs,
+)
+from pants.engine.internals.selectors import concurrently
+from pants.engine.intrinsics import digest_subset_to_digest, get_digest_contents, get_digest_entries
+from pants.engine.rules import collect_rules, rule
+from pants.util.logging import LogLevel
+
+from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.util_rules.output_summary import (
+    OutputSummary,
+    summarize_log,
+    summary_parts,
+    summary_script,
+)
+
+STDOUT_LOG = ".baseline/stdout.log"
+STDERR_LOG = ".baseline/stderr.log"
+OUTPUT_LOGS = (STDOUT_LOG, STDERR_LOG)
+# The summarized parts of the logs
+_SUMMARY_PARTS = tuple(part for log in OUTPUT_LOGS for part in summary_parts(log))
+# Everything `logged_argv` writes
+OUTPUT_FILES = (*OUTPUT_LOGS, *_SUMMARY_PARTS)
+
+
+def logged_argv(bash: BashBinary, argv: Iterable[str], *, max_lines: int) -> tuple[str, ...]:
+    """Wrap `argv` to write its stdout and stderr to `OUTPUT_LOGS`, keeping its exit code.
+
+    The logs' parts that a summary of `max_lines` keeps are written next to them.
+    The process must list `OUTPUT_FILES` among its output files.
+    """
+    summaries = "; ".join(summary_script(log, max_lines=max_lines) for log in OUTPUT_LOGS)
+    return (
+        bash.path,
+        "-c",
+        f"mkdir -p .baseline && {{ {shlex.join(argv)} >{STDOUT_LOG} 2>{STDERR_LOG}; "
+        f"status=$?; {summaries}; exit $status; }}",
+    )
+
+
+@dataclass(frozen=True)
+class ProcessOutputRequest:
+    """Request to summarize the logs in a process's output digest."""
+
+    output_digest: Digest
+
+
+@dataclass(frozen=True)
+class ProcessOutput:
+    """Bounded summaries of a process's output, and digests of the full logs."""
+
+    stdout: OutputSummary
+    stderr: OutputSummary
+    stdout_digest: FileDigest
+    stderr_digest: FileDigest
+    # Both logs, at `OUTPUT_LOGS`
+    digest: Digest
+
+
+@rule(desc="Summarize process output", level=LogLevel.DEBUG)
+async def summarize_process_output(
+    request: ProcessOutputRequest,
+    baseline_subsystem: BaselineSubsystem,
+) -> ProcessOutput:
+    """Summarize each log in at most `[baseline-python].output_lines` lines.
+
+    Only the parts `logged_argv` cut out of the logs are read, unless the option asks
+    for every line.
+    """
+    max_lines = baseline_subsystem.output_lines
+    logs = await digest_subset_to_digest(
+        DigestSubset(request.output_digest, PathGlobs(OUTPUT_LOGS))
+    )
+    summarized = (
+        logs
+        if max_lines <= 0
+        else await digest_subset_to_digest(
+            DigestSubset(request.output_digest, PathGlobs(_SUMMARY_PARTS))
+        )
+    )
+    entries, contents = await concurrently(
+        get_digest_entries(logs), get_digest_contents(summarized)
+    )
+    file_digests = {e.path: e.file_digest for e in entries if isinstance(e, FileEntry)}
+    files = {fc.path: fc.content for fc in contents}
+    return ProcessOutput(
+        stdout=summarize_log(files, STDOUT_LOG, max_lines=max_lines),
+        stderr=summarize_log(files, STDERR_LOG, max_lines=max_lines),
+        stdout_digest=file_digests.get(STDOUT_LOG, EMPTY_FILE_DIGEST),
+        stderr_digest=file_digests.get(STDERR_LOG, EMPTY_FILE_DIGEST),
+        digest=logs,
+    )
+
+
+def rules() -> Iterable:
+    """Return all process output rules."""
+    return collect_rules()
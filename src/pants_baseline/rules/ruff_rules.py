@@ -0,0 +1,375 @@
+"""Ruff rules shared by the lint and format integrations."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.collection import Collection
+from pants.engine.fs import (
+    CreateDigest,
+    Digest,
+    DigestSubset,
+    FileContent,
+    FileEntry,
+    MergeDigests,
+    PathGlobs,
+    Snapshot,
+)
+from pants.engine.internals.selectors import concurrently
+from pants.engine.intrinsics import (
+    create_digest,
+    digest_subset_to_digest,
+    digest_to_snapshot,
+    execute_process,
+    get_digest_contents,
+    get_digest_entries,
+    merge_digests,
+)
+from pants.engine.platform import Platform
+from pants.engine.process import Process
+from pants.engine.rules import collect_rules, implicitly, rule
+from pants.engine.target import FieldSet, SourcesField
+from pants.option.global_options import GlobalOptions
+from pants.util.logging import LogLevel
+
+from pants_baseline.rules.snapshot_rules import BaselineSourcesRequest, glob_baseline_sources
+from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.ruff import RuffSubsystem
+from pants_baseline.targets import (
+    BaselineSourcesField,
+    BaselineTestSourcesField,
+    LineLengthField,
+    PythonVersionField,
+    project_value,
+)
+from pants_baseline.util_rules.file_args import file_args
+from pants_baseline.util_rules.globs import unanchored_patterns
+from pants_baseline.util_rules.partitions import ShardMetadata, compute_shard_count, shard_paths
+from pants_baseline.util_rules.ruff_all import (
+    FMT_EXIT_CODE_PATH,
+    parse_fmt_exit_code,
+    ruff_all_script,
+)
+from pants_baseline.util_rules.tool_config import RUFF_CONFIG_PATH, fingerprint, ruff_config
+
+
+@dataclass(frozen=True)
+class RuffFieldSet(FieldSet):
+    """The fields of a `baseline_python_project` that Ruff lints and formats."""
+
+    required_fields = (BaselineSourcesField,)
+
+    sources: BaselineSourcesField
+    test_sources: BaselineTestSourcesField
+    python_version: PythonVersionField
+    line_length: LineLengthField
+
+
+@dataclass(frozen=True)
+class RuffSettings:
+    """The Ruff configuration of a project; projects with equal settings share processes."""
+
+    python_version: str
+    line_length: int
+
+    @classmethod
+    def for_project(
+        cls,
+        python_version: PythonVersionField,
+        line_length: LineLengthField,
+        baseline_subsystem: BaselineSubsystem,
+    ) -> RuffSettings:
+        """Return a project's settings, falling back to the global options."""
+        return cls(
+            project_value(python_version, baseline_subsystem.python_version),
+            project_value(line_length, baseline_subsystem.line_length),
+        )
+
+    @property
+    def description(self) -> str:
+        """Describe the settings for per-partition output."""
+        return f"py{self.python_version}, line length {self.line_length}"
+
+
+@dataclass(frozen=True)
+class RuffBatchMetadata:
+    """Partition metadata for one Ruff process: its settings and its shard."""
+
+    settings: RuffSettings
+    shard: ShardMetadata
+    # Whether other batches run with other settings
+    grouped: bool = False
+
+    @property
+    def description(self) -> str | None:
+        """Describe the batch for Pants' per-partition output."""
+        parts = [self.settings.description] if self.grouped else []
+        if self.shard.description:
+            parts.append(self.shard.description)
+        return ", ".join(parts) or None
+
+
+@dataclass(frozen=True)
+class RuffConfigFile:
+    """A generated `ruff.toml` for one set of settings, to merge into the sandbox."""
+
+    digest: Digest
+    # Stable hash of the file's content, e.g. for keying Ruff's own cache
+    fingerprint: str
+
+    @property
+    def args(self) -> tuple[str, ...]:
+        """Point Ruff at the generated file."""
+        return (f"--config={RUFF_CONFIG_PATH}",)
+
+
+@rule(desc="Generate Ruff configuration", level=LogLevel.DEBUG)
+async def ruff_config_file(
+    settings: RuffSettings,
+    ruff_subsystem: RuffSubsystem,
+    baseline_subsystem: BaselineSubsystem,
+) -> RuffConfigFile:
+    """Render the options into a canonical `ruff.toml`.
+
+    Options that Ruff only reads from configuration files, such as the quote style
+    and the per-file ignores, take effect this way. The file's digest is part of
+    every Ruff process's cache key in place of a long, order-sensitive argv.
+    """
+    content = ruff_config(
+        python_version=settings.python_version,
+        line_length=settings.line_length,
+        select=ruff_subsystem.select,
+        ignore=ruff_subsystem.ignore,
+        quote_style=ruff_subsystem.quote_style,
+        indent_style=ruff_subsystem.indent_style,
+        test_roots=baseline_subsystem.test_roots,
+        skip_tests_rules=ruff_subsystem.skip_tests_rules,
+        skip_init_rules=ruff_subsystem.skip_init_rules,
+        exclude=unanchored_patterns(baseline_subsystem.exclude_patterns),
+    )
+    digest = await create_digest(CreateDigest([FileContent(RUFF_CONFIG_PATH, content.encode())]))
+    return RuffConfigFile(digest=digest, fingerprint=fingerprint(content))
+
+
+@dataclass(frozen=True)
+class RuffShardsRequest:
+    """Request to split the sources of Ruff field sets or baseline projects into shards."""
+
+    sources_fields: tuple[SourcesField, ...]
+
+
+class RuffShards(Collection[tuple[str, ...]]):
+    """Stable shards of file paths, each run as its own Ruff process."""
+
+
+@rule(desc="Shard Ruff inputs", level=LogLevel.DEBUG)
+async def shard_ruff_sources(
+    request: RuffShardsRequest,
+    ruff_subsystem: RuffSubsystem,
+    global_options: GlobalOptions,
+) -> RuffShards:
+    """Split sources into stable shards sized by file count, bytes and parallelism.
+
+    Lint and format share this rule so that both see identical batches, which lets
+    the combined pass below run once per batch for `pants fmt lint`.
+    """
+    sources = await glob_baseline_sources(
+        BaselineSourcesRequest(request.sources_fields), **implicitly()
+    )
+    if not sources.files:
+        return RuffShards()
+
+    shard_count = ruff_subsystem.shards
+    if shard_count <= 0:
+        entries = await get_digest_entries(sources.digest)
+        shard_count = compute_shard_count(
+            file_count=len(sources.files),
+            total_bytes=sum(
+                entry.file_digest.serialized_bytes_length
+                for entry in entries
+                if isinstance(entry, FileEntry)
+            ),
+            parallelism=global_options.process_execution_local_parallelism,
+        )
+
+    return RuffShards(shard_paths(sources.files, shard_count))
+
+
+@dataclass(frozen=True)
+class RuffBatchesRequest:
+    """Request to shard sources fields, keeping fields with different settings apart."""
+
+    fields: tuple[tuple[RuffSettings, SourcesField], ...]
+
+    @classmethod
+    def for_field_sets(
+        cls, field_sets: Iterable[RuffFieldSet], baseline_subsystem: BaselineSubsystem
+    ) -> RuffBatchesRequest:
+        """Request batches over the sources and tests of each project."""
+        fields = []
+        for fs in field_sets:
+            settings = RuffSettings.for_project(
+                fs.python_version, fs.line_length, baseline_subsystem
+            )
+            fields.extend(((settings, fs.sources), (settings, fs.test_sources)))
+        return cls(tuple(fields))
+
+
+@dataclass(frozen=True)
+class RuffBatch:
+    """The files of one Ruff process and the settings it runs with."""
+
+    files: tuple[str, ...]
+    metadata: RuffBatchMetadata
+
+
+class RuffBatches(Collection[RuffBatch]):
+    """Ruff processes to run: one or more shards per group of equal settings."""
+
+
+@rule(desc="Group Ruff inputs by configuration", level=LogLevel.DEBUG)
+async def partition_ruff_sources(request: RuffBatchesRequest) -> RuffBatches:
+    """Group sources by their settings and shard each group on its own.
+
+    Homogeneous projects form a single group and shard exactly as before, while
+    projects with different settings get separate processes that run in parallel.
+    """
+    groups: dict[RuffSettings, list[SourcesField]] = {}
+    for settings, field in request.fields:
+        groups.setdefault(settings, []).append(field)
+    ordered = sorted(groups, key=lambda s: (s.python_version, s.line_length))
+
+    all_shards = await concurrently(
+        shard_ruff_sources(RuffShardsRequest(tuple(groups[settings])), **implicitly())
+        for settings in ordered
+    )
+    return RuffBatches(
+        RuffBatch(
+            files,
+            RuffBatchMetadata(
+                settings, ShardMetadata(index=i, count=len(shards)), grouped=len(ordered) > 1
+            ),
+        )
+        for settings, shards in zip(ordered, all_shards, strict=True)
+        for i, files in enumerate(shards)
+    )
+
+
+class RuffFmtError(Exception):
+    """Raised when the fix or format step of the combined Ruff pass fails."""
+
+
+@dataclass(frozen=True)
+class RuffAllRequest:
+    """Request to fix, format and lint a batch of files in a single sandbox."""
+
+    snapshot: Snapshot
+    settings: RuffSettings
+
+
+@dataclass(frozen=True)
+class RuffAllResult:
+    """Result of the combined Ruff pass: rewritten files plus remaining diagnostics.
+
+    `exit_code` is `ruff check`'s, for lint; `fmt_exit_code` is that of the fix and
+    format steps, for fmt.
+    """
+
+    output: Snapshot
+    exit_code: int
+    fmt_exit_code: int
+    stdout: str
+    stderr: str
+
+
+@rule(desc="Fix, format and lint with Ruff", level=LogLevel.DEBUG)
+async def run_ruff_all(
+    request: RuffAllRequest,
+    ruff_subsystem: RuffSubsystem,
+    bash: BashBinary,
+    platform: Platform,
+) -> RuffAllResult:
+    """Run `ruff check`, then `ruff check --fix-only` and `ruff format`, in one sandbox.
+
+    The request carries nothing but the batch snapshot and its settings, so the lint
+    and format integrations build identical requests for the same batch and the engine runs
+    the process once for both. The diagnostics and exit code come from the files as
+    given, before any fix, so lint never reports clean for files whose fixable
+    violations were only fixed in the sandbox.
+    """
+    snapshot = request.snapshot
+
+    downloaded_ruff, config = await concurrently(
+        download_external_tool(ruff_subsystem.get_request(platform)),
+        ruff_config_file(request.settings, **implicitly()),
+    )
+    input_digest = await merge_digests(
+        MergeDigests([downloaded_ruff.digest, config.digest, snapshot.digest]),
+    )
+
+    targets = file_args(snapshot.files)
+    check_argv = [
+        downloaded_ruff.exe,
+        "check",
+        *config.args,
+        *ruff_subsystem.cache_args("check", config.fingerprint),
+        "--output-format=concise",
+        *targets.args,
+    ]
+    fix_argv = (
+        [
+            downloaded_ruff.exe,
+            "check",
+            *config.args,
+            *ruff_subsystem.cache_args("check", config.fingerprint),
+            "--fix-only",
+            *(["--unsafe-fixes"] if ruff_subsystem.unsafe_fixes else []),
+            *targets.args,
+        ]
+        if ruff_subsystem.fix
+        else None
+    )
+    format_argv = [
+        downloaded_ruff.exe,
+        "format",
+        *config.args,
+        *ruff_subsystem.cache_args("format", config.fingerprint),
+        *targets.args,
+    ]
+
+    result = await execute_process(
+        Process(
+            argv=[bash.path, "-c", ruff_all_script(check_argv, fix_argv, format_argv)],
+            input_digest=input_digest,
+            output_files=(*snapshot.files, FMT_EXIT_CODE_PATH),
+            append_only_caches=ruff_subsystem.append_only_caches,
+            description=f"Run Ruff fix, format and lint on {len(snapshot.files)} files",
+            level=LogLevel.DEBUG,
+        ),
+        **implicitly(),
+    )
+
+    files, status = await concurrently(
+        digest_subset_to_digest(DigestSubset(result.output_digest, PathGlobs(snapshot.files))),
+        digest_subset_to_digest(
+            DigestSubset(result.output_digest, PathGlobs([FMT_EXIT_CODE_PATH]))
+        ),
+    )
+    output, status_contents = await concurrently(
+        digest_to_snapshot(files), get_digest_contents(status)
+    )
+    return RuffAllResult(
+        output=output,
+        exit_code=result.exit_code,
+        fmt_exit_code=parse_fmt_exit_code(b"".join(fc.content for fc in status_contents)),
+        stdout=result.stdout.decode(),
+        stderr=result.stderr.decode(),
+    )
+
+
+def rules() -> Iterable:
+    """Return the shared Ruff rules."""
+    return collect_rules()
@@ -0,0 +1,154 @@
+"""Rules resolving baseline project files once for every tool.
+
+Lint, format, type checking and tests all need the same project files. Each
+project's sources and tests are globbed by one memoized rule into a
+`BaselineSnapshot`, so a session running several tools walks each tree once.
+`[baseline-python].exclude_patterns` are added to every glob as ignores, which
+prunes directories such as `.venv` before they are traversed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from pants.engine.addresses import Address
+from pants.engine.fs import EMPTY_SNAPSHOT, Digest, MergeDigests, PathGlobs, Snapshot
+from pants.engine.internals.selectors import concurrently
+from pants.engine.intrinsics import digest_to_snapshot, merge_digests, path_globs_to_digest
+from pants.engine.rules import collect_rules, implicitly, rule
+from pants.engine.target import SourcesField
+from pants.option.global_options import UnmatchedBuildFileGlobs
+from pants.util.frozendict import FrozenDict
+from pants.util.logging import LogLevel
+
+from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.util_rules.globs import ignore_globs
+
+
+@dataclass(frozen=True)
+class BaselineSourcesRequest:
+    """Request to glob the files of some sources fields, skipping excluded paths."""
+
+    sources_fields: tuple[SourcesField, ...]
+
+
+@dataclass(frozen=True)
+class BaselineSnapshotRequest:
+    """Request for the files of one project: its sources and, optionally, its tests."""
+
+    sources: SourcesField
+    test_sources: SourcesField | None = None
+
+
+@dataclass(frozen=True)
+class BaselineSnapshot:
+    """The files of one project, globbed once and shared by every tool."""
+
+    address: Address
+    sources: Snapshot
+    tests: Snapshot
+    # Sources and tests together
+    digest: Digest
+
+    @property
+    def files(self) -> tuple[str, ...]:
+        """Every source and test file of the project."""
+        return (*self.sources.files, *self.tests.files)
+
+
+@dataclass(frozen=True)
+class BaselineSnapshotsRequest:
+    """Request for the files of several projects."""
+
+    requests: tuple[BaselineSnapshotRequest, ...]
+
+
+@dataclass(frozen=True)
+class BaselineSnapshots:
+    """The files of several projects, merged, and which project owns each file."""
+
+    snapshots: tuple[BaselineSnapshot, ...]
+    sources: Snapshot
+    tests: Snapshot
+    digest: Digest
+    owners: FrozenDict[str, Address]
+
+
+def _pruned_globs(
+    field: SourcesField, exclude_patterns: Iterable[str], unmatched: UnmatchedBuildFileGlobs
+) -> PathGlobs:
+    path_globs = field.path_globs(unmatched)
+    if not path_globs.globs:
+        return path_globs
+    return PathGlobs(
+        (*path_globs.globs, *ignore_globs(exclude_patterns, field.address.spec_path)),
+        glob_match_error_behavior=path_globs.glob_match_error_behavior,
+        conjunction=path_globs.conjunction,
+        description_of_origin=path_globs.description_of_origin,
+    )
+
+
+@rule(desc="Glob baseline sources", level=LogLevel.DEBUG)
+async def glob_baseline_sources(
+    request: BaselineSourcesRequest,
+    baseline_subsystem: BaselineSubsystem,
+    unmatched_build_file_globs: UnmatchedBuildFileGlobs,
+) -> Snapshot:
+    """Glob each field's files, pruning excluded directories during the walk."""
+    if not request.sources_fields:
+        return EMPTY_SNAPSHOT
+    # One glob per field, so each is memoized on its own and shared between requests
+    digests = await concurrently(
+        path_globs_to_digest(
+            _pruned_globs(field, baseline_subsystem.exclude_patterns, unmatched_build_file_globs)
+        )
+        for field in request.sources_fields
+    )
+    return await digest_to_snapshot(await merge_digests(MergeDigests(digests)))
+
+
+@rule(desc="Snapshot a baseline project", level=LogLevel.DEBUG)
+async def baseline_snapshot(request: BaselineSnapshotRequest) -> BaselineSnapshot:
+    """Glob one project's sources and tests."""
+    sources, tests = await concurrently(
+        glob_baseline_sources(BaselineSourcesRequest((request.sources,)), **implicitly()),
+        glob_baseline_sources(
+            BaselineSourcesRequest(
+                (request.test_sources,) if request.test_sources is not None else ()
+            ),
+            **implicitly(),
+        ),
+    )
+    digest = await merge_digests(MergeDigests([sources.digest, tests.digest]))
+    return BaselineSnapshot(
+        address=request.sources.address, sources=sources, tests=tests, digest=digest
+    )
+
+
+@rule(desc="Snapshot baseline projects", level=LogLevel.DEBUG)
+async def baseline_snapshots(request: BaselineSnapshotsRequest) -> BaselineSnapshots:
+    """Snapshot each project and merge the results."""
+    snapshots = await concurrently(baseline_snapshot(r) for r in request.requests)
+    source_digest, test_digest, digest = await concurrently(
+        merge_digests(MergeDigests(s.sources.digest for s in snapshots)),
+        merge_digests(MergeDigests(s.tests.digest for s in snapshots)),
+        merge_digests(MergeDigests(s.digest for s in snapshots)),
+    )
+    sources, tests = await concurrently(
+        digest_to_snapshot(source_digest), digest_to_snapshot(test_digest)
+    )
+    return BaselineSnapshots(
+        snapshots=tuple(snapshots),
+        sources=sources,
+        tests=tests,
+        digest=digest,
+        owners=FrozenDict(
+            {path: snapshot.address for snapshot in snapshots for path in snapshot.files}
+        ),
+    )
+
+
+def rules() -> Iterable:
+    """Return all snapshot rules."""
+    return collect_rules()
@@ -1,25 +1,74 @@
 """Rules for pytest testing with coverage."""
 
-from dataclasses import dataclass
-from typing import Iterable
+import functools
+import posixpath
+from dataclasses import dataclass, field
+from importlib import resources
+from typing import Any, Iterable
 
-from pants.core.goals.test import TestRequest, TestResult
-from pants.core.util_rules.source_files import SourceFiles, SourceFilesRequest
+from pants.core.goals.test import TestRequest, TestResult, TestSubsystem
+from pants.core.util_rules.partitions import PartitionerType
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import (
+    EMPTY_DIGEST,
+    CreateDigest,
+    Digest,
+    DigestSubset,
+    FileContent,
+    MergeDigests,
+    PathGlobs,
+)
 from pants.engine.internals.selectors import concurrently
-from pants.engine.intrinsics import execute_process
-from pants.engine.process import Process
+from pants.engine.intrinsics import (
+    create_digest,
+    digest_subset_to_digest,
+    execute_process,
+    get_digest_contents,
+    merge_digests,
+    path_globs_to_digest,
+)
+from pants.engine.process import Process, ProcessCacheScope
 from pants.engine.rules import collect_rules, implicitly, rule
-from pants.engine.target import FieldSet
-from pants.engine.unions import UnionRule
+from pants.engine.target import FieldSet, Target
+from pants.util.frozendict import FrozenDict
 from pants.util.logging import LogLevel
+from pants.util.meta import classproperty
 
+from pants_baseline import pytest_plugins
+from pants_baseline.rules.output_rules import (
+    OUTPUT_FILES,
+    ProcessOutput,
+    ProcessOutputRequest,
+    logged_argv,
+    summarize_process_output,
+)
+from pants_baseline.rules.snapshot_rules import BaselineSnapshotRequest, baseline_snapshot
+from pants_baseline.rules.venv_rules import PytestVenv, PytestVenvRequest, resolve_pytest_venv
 from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
 from pants_baseline.targets import (
     BaselineSourcesField,
     BaselineTestSourcesField,
     CoverageThresholdField,
+    PythonVersionField,
     SkipTestField,
+    project_value,
+)
+from pants_baseline.util_rules.coverage import (
+    COVERAGERC_PATH,
+    CoverageTotals,
+    coverage_by_owner,
+    coveragerc,
 )
+from pants_baseline.util_rules.import_graph import (
+    affected_files,
+    build_import_graph,
+    project_roots,
+    required_files,
+)
+from pants_baseline.util_rules.test_flakiness import parse_junit_results
+from pants_baseline.util_rules.test_outcomes import OUTCOMES_ENV, config_globs, parse_outcomes
+from pants_baseline.util_rules.test_timings import parse_junit_durations
 
 
 @dataclass(frozen=True)
@@ -31,114 +80,522 @@ class PytestFieldSet(FieldSet):
     sources: BaselineSourcesField
     test_sources: BaselineTestSourcesField
     coverage_threshold: CoverageThresholdField
+    python_version: PythonVersionField
     skip_test: SkipTestField
 
+    @classmethod
+    def opt_out(cls, tgt: Target) -> bool:
+        """Allow targets to opt out of testing."""
+        return tgt.get(SkipTestField).value
+
 
 class PytestTestRequest(TestRequest):
-    """Request to run pytest tests."""
+    """Request to run pytest tests, one partition per `baseline_python_project`."""
 
     field_set_type = PytestFieldSet
-    tool_name = "pytest"
+    tool_subsystem = BaselinePytestSubsystem
+    partitioner_type = PartitionerType.DEFAULT_ONE_PARTITION_PER_INPUT
+    supports_debug = False
+
+    @classproperty
+    def tool_name(cls) -> str:
+        return "baseline-pytest"
+
+    @classproperty
+    def tool_id(cls) -> str:
+        return "baseline-pytest"
 
 
 @rule(desc="Test with pytest", level=LogLevel.DEBUG)
 async def run_pytest(
-    request: PytestTestRequest,
+    batch: PytestTestRequest.Batch[PytestFieldSet, Any],
     baseline_subsystem: BaselineSubsystem,
+    test_subsystem: TestSubsystem,
+    bash: BashBinary,
 ) -> TestResult:
-    """Run pytest on test files with coverage."""
-    if not baseline_subsystem.enabled:
-        return TestResult(
-            exit_code=0,
-            stdout="",
-            stderr="",
-            stdout_digest=None,
-            stderr_digest=None,
-            address=None,
-            output_setting=None,
-        )
-
-    # Filter out skipped targets
-    field_sets = [fs for fs in request.field_sets if not fs.skip_test.value]
+    """Run pytest with coverage on one target's tests and sources."""
+    field_set = batch.single_element
 
-    if not field_sets:
-        return TestResult(
-            exit_code=0,
-            stdout="No targets to test",
-            stderr="",
-            stdout_digest=None,
-            stderr_digest=None,
-            address=None,
-            output_setting=None,
-        )
-
-    # Get test and source files in parallel using new intrinsics
-    test_source_files_request = SourceFilesRequest(
-        sources_fields=[fs.test_sources for fs in field_sets],
-        for_sources_types=(BaselineTestSourcesField,),
-    )
-    source_files_request = SourceFilesRequest(
-        sources_fields=[fs.sources for fs in field_sets],
-        for_sources_types=(BaselineSourcesField,),
+    # Only this target's own files go into the sandbox, so its process cache entry
+    # is unaffected by edits to any other project.
+    snapshot = await baseline_snapshot(
+        BaselineSnapshotRequest(field_set.sources, field_set.test_sources)
     )
 
-    test_sources, sources = await concurrently(
-        implicitly(test_source_files_request, SourceFiles),
-        implicitly(source_files_request, SourceFiles),
-    )
-
-    if not test_sources.files:
+    if not baseline_subsystem.enabled or not snapshot.tests.files:
         return TestResult(
-            exit_code=0,
-            stdout="No test files found",
+            exit_code=None,
+            stdout="",
             stderr="",
             stdout_digest=None,
             stderr_digest=None,
-            address=None,
-            output_setting=None,
+            address=field_set.address,
+            output_setting=test_subsystem.output,
         )
 
-    # Get coverage threshold from first field set (or use default)
-    coverage_threshold = (
-        field_sets[0].coverage_threshold.value
-        if field_sets
-        else baseline_subsystem.coverage_threshold
+    # Build pytest command with coverage of this project's source roots
+    project_dirs = (field_set.address.spec_path,)
+    coverage_threshold = project_value(
+        field_set.coverage_threshold, baseline_subsystem.coverage_threshold
     )
 
-    # Build pytest command with coverage
-    src_root = ",".join(baseline_subsystem.src_roots)
-
-    argv = [
-        "pytest",
+    args = [
         "-v",
         "--strict-markers",
         "--strict-config",
         "-ra",
         "--tb=short",
-        f"--cov={src_root}",
+        *(f"--cov={root}" for root in project_roots(project_dirs, baseline_subsystem.src_roots)),
         "--cov-report=term-missing",
         f"--cov-fail-under={coverage_threshold}",
         "--cov-branch",
-        *test_sources.files,
+        *snapshot.tests.files,
     ]
 
+    venv = await resolve_pytest_venv(
+        PytestVenvRequest(
+            project_dirs=project_dirs,
+            python_version=project_value(
+                field_set.python_version, baseline_subsystem.python_version
+            ),
+        ),
+        **implicitly(),
+    )
+    config = await path_globs_to_digest(PathGlobs(config_globs(project_dirs)))
+    input_digest = await merge_digests(MergeDigests([venv.digest, snapshot.digest, config]))
+    pythonpath = project_roots(
+        project_dirs, (*baseline_subsystem.src_roots, *baseline_subsystem.test_roots)
+    )
+
     process = Process(
-        argv=argv,
-        input_digest=test_sources.snapshot.digest,
-        description=f"Run pytest on {len(test_sources.files)} test files",
+        argv=logged_argv(
+            bash,
+            venv.argv(bash, "pytest", args),
+            max_lines=baseline_subsystem.output_lines,
+        ),
+        input_digest=input_digest,
+        env={"PYTHONPATH": ":".join(pythonpath)},
+        output_files=OUTPUT_FILES,
+        append_only_caches=venv.append_only_caches,
+        description=f"Run pytest on {len(snapshot.tests.files)} test files in {field_set.address}",
         level=LogLevel.DEBUG,
     )
 
     result = await execute_process(process, **implicitly())
+    output = await summarize_process_output(
+        ProcessOutputRequest(result.output_digest), **implicitly()
+    )
 
     return TestResult(
         exit_code=result.exit_code,
-        stdout=result.stdout.decode(),
-        stderr=result.stderr.decode(),
-        stdout_digest=None,
-        stderr_digest=None,
-        address=None,
-        output_setting=None,
+        stdout=output.stdout.render(),
+        stderr=output.stderr.render(),
+        stdout_digest=output.stdout_digest,
+        stderr_digest=output.stderr_digest,
+        address=field_set.address,
+        output_setting=test_subsystem.output,
+    )
+
+
+@dataclass(frozen=True)
+class PytestShardRequest:
+    """Request to run one shard of test files as its own cacheable process."""
+
+    test_files: tuple[str, ...]
+    index: int
+    count: int
+    # Every file the sandbox holds, the tests included, picked out of `digest`
+    input_files: tuple[str, ...]
+    digest: Digest
+    venv: PytestVenv
+    # The directories of the projects the tests belong to, whose source and test roots
+    # are importable and whose pytest configuration applies
+    project_dirs: tuple[str, ...]
+    # Whether to record each test file's outcome and imports for the outcome cache
+    record_outcomes: bool = False
+    # 0 for the shard's own run; a retry of its failing tests, which `test_files`
+    # then names by node ID, counts up from 1
+    attempt: int = 0
+
+    @property
+    def description(self) -> str:
+        """Describe the shard for console output."""
+        retry = f", retry {self.attempt}" if self.attempt else ""
+        return f"shard {self.index + 1}/{self.count}{retry}"
+
+
+_OUTCOMES_PLUGIN_PATH = ".baseline/plugins/baseline_outcomes.py"
+
+
+@functools.cache
+def _outcomes_plugin_source() -> bytes:
+    return resources.files(pytest_plugins).joinpath("baseline_outcomes.py").read_bytes()
+
+
+@dataclass(frozen=True)
+class PytestShardResult:
+    """Result of one pytest shard, with its coverage data and per-file durations."""
+
+    exit_code: int
+    output: ProcessOutput
+    coverage_data: Digest
+    durations: FrozenDict[str, float]
+    # Test file -> (passed, first-party files it imported), if outcomes were recorded
+    outcomes: FrozenDict[str, tuple[bool, tuple[str, ...]]] = field(default_factory=FrozenDict)
+    # pytest node ID -> whether the test passed
+    tests: FrozenDict[str, bool] = field(default_factory=FrozenDict)
+
+    @property
+    def failed_tests(self) -> tuple[str, ...]:
+        """The node IDs of the tests that failed."""
+        return tuple(node for node, passed in self.tests.items() if not passed)
+
+
+@rule(desc="Test a shard with pytest", level=LogLevel.DEBUG)
+async def run_pytest_shard(
+    request: PytestShardRequest,
+    baseline_subsystem: BaselineSubsystem,
+    bash: BashBinary,
+) -> PytestShardResult:
+    """Run pytest on one shard, recording coverage data and JUnit timings as outputs."""
+    # pytest configuration is not a baseline source, but the tests run with it
+    files_digest, config_digest, coverage_config = await concurrently(
+        digest_subset_to_digest(DigestSubset(request.digest, PathGlobs(request.input_files))),
+        path_globs_to_digest(PathGlobs(config_globs(request.project_dirs))),
+        create_digest(
+            CreateDigest(
+                [
+                    FileContent(
+                        COVERAGERC_PATH,
+                        coveragerc(
+                            project_roots(request.project_dirs, baseline_subsystem.src_roots)
+                        ),
+                    )
+                ]
+            )
+        ),
+    )
+    digests = [request.venv.digest, files_digest, config_digest, coverage_config]
+    pythonpath = list(
+        project_roots(
+            request.project_dirs,
+            (*baseline_subsystem.src_roots, *baseline_subsystem.test_roots),
+        )
+    )
+    env = {"COVERAGE_FILE": f".coverage.shard-{request.index}"}
+    if request.attempt:
+        # Retries of the same tests must not share a process, in this run or the cache
+        env["BASELINE_TEST_ATTEMPT"] = str(request.attempt)
+    outcomes_file = f".baseline/outcomes.shard-{request.index}.json"
+    plugin_args: list[str] = []
+    if request.record_outcomes:
+        digests.append(
+            await create_digest(
+                CreateDigest([FileContent(_OUTCOMES_PLUGIN_PATH, _outcomes_plugin_source())])
+            )
+        )
+        pythonpath.append(posixpath.dirname(_OUTCOMES_PLUGIN_PATH))
+        env[OUTCOMES_ENV] = outcomes_file
+        plugin_args = ["-p", "baseline_outcomes"]
+    env["PYTHONPATH"] = ":".join(pythonpath)
+    input_digest = await merge_digests(MergeDigests(digests))
+
+    # Coverage is only collected here; thresholds are enforced once on the merged data
+    coverage_file = env["COVERAGE_FILE"]
+    junit_file = f"junit.shard-{request.index}.xml"
+
+    args = [
+        "-v",
+        "--strict-markers",
+        "--strict-config",
+        "-ra",
+        "--tb=short",
+        # The generated configuration names the sources and records relative paths,
+        # so the data can be combined outside this sandbox
+        "--cov",
+        f"--cov-config={COVERAGERC_PATH}",
+        "--cov-report=",
+        f"--junitxml={junit_file}",
+        "-o",
+        "junit_family=xunit1",
+        *plugin_args,
+        *request.test_files,
+    ]
+
+    result = await execute_process(
+        Process(
+            argv=logged_argv(
+                bash,
+                request.venv.argv(bash, "pytest", args),
+                max_lines=baseline_subsystem.output_lines,
+            ),
+            input_digest=input_digest,
+            env=env,
+            output_files=(coverage_file, junit_file, outcomes_file, *OUTPUT_FILES),
+            append_only_caches=request.venv.append_only_caches,
+            cache_scope=(
+                ProcessCacheScope.PER_SESSION if request.attempt else ProcessCacheScope.SUCCESSFUL
+            ),
+            description=(
+                f"Run pytest on {len(request.test_files)} tests ({request.description})"
+                if request.attempt
+                else f"Run pytest on {len(request.test_files)} test files ({request.description})"
+            ),
+            level=LogLevel.DEBUG,
+        ),
+        **implicitly(),
+    )
+
+    output, coverage_data, report_contents = await concurrently(
+        summarize_process_output(ProcessOutputRequest(result.output_digest), **implicitly()),
+        digest_subset_to_digest(DigestSubset(result.output_digest, PathGlobs([coverage_file]))),
+        get_digest_contents(
+            await digest_subset_to_digest(
+                DigestSubset(result.output_digest, PathGlobs([junit_file, outcomes_file]))
+            )
+        ),
+    )
+    durations = {}
+    outcomes = {}
+    tests = {}
+    for file_content in report_contents:
+        if file_content.path == junit_file:
+            durations.update(parse_junit_durations(file_content.content))
+            tests.update(parse_junit_results(file_content.content))
+        else:
+            outcomes.update(parse_outcomes(file_content.content))
+
+    return PytestShardResult(
+        exit_code=result.exit_code,
+        output=output,
+        coverage_data=coverage_data,
+        durations=FrozenDict(durations),
+        outcomes=FrozenDict(outcomes),
+        tests=FrozenDict(tests),
+    )
+
+
+@dataclass(frozen=True)
+class ImportGraphRequest:
+    """Request to build the import graph over a digest of source and test files."""
+
+    digest: Digest
+    # The directories of the projects whose files are in `digest`; each project's
+    # source and test roots are relative to its directory
+    project_dirs: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ImportGraph:
+    """First-party import edges, from each file to the files it imports."""
+
+    imports: FrozenDict[str, tuple[str, ...]]
+
+    def affected(self, changed: Iterable[str], candidates: Iterable[str]) -> tuple[str, ...]:
+        """Return the `candidates` affected by a change to any of the `changed` files."""
+        return affected_files(self.imports, changed, candidates)
+
+    def required(self, tests: Iterable[str], files: Iterable[str]) -> tuple[str, ...]:
+        """Return the `tests` and the files among `files` they need in their sandbox."""
+        return required_files(self.imports, tests, files)
+
+    def unresolved(self, tests: Iterable[str]) -> tuple[str, ...]:
+        """Return the `tests` none of whose imports resolve to a first-party file."""
+        return tuple(test for test in tests if not self.imports.get(test))
+
+
+@rule(desc="Build the import graph", level=LogLevel.DEBUG)
+async def build_test_import_graph(
+    request: ImportGraphRequest,
+    baseline_subsystem: BaselineSubsystem,
+) -> ImportGraph:
+    """Parse the imports of every Python file; memoized per digest by the engine."""
+    contents = await get_digest_contents(request.digest)
+    graph = build_import_graph(
+        {fc.path: fc.content for fc in contents if fc.path.endswith(".py")},
+        project_roots(
+            request.project_dirs,
+            (*baseline_subsystem.src_roots, *baseline_subsystem.test_roots),
+        ),
+    )
+    return ImportGraph(FrozenDict(graph))
+
+
+_NOOP_SCRIPT = ".baseline/noop.py"
+_COVERAGE_JSON = ".baseline/coverage.json"
+
+# coverage.py's exit code for coverage below `--fail-under`
+_BELOW_THRESHOLD = 2
+
+
+@dataclass(frozen=True)
+class CoverageMergeRequest:
+    """Request to combine per-shard coverage data and enforce per-project thresholds."""
+
+    coverage_data: tuple[Digest, ...]
+    sources: Digest
+    venv: PytestVenv
+    # The directories of the projects whose source roots are measured
+    project_dirs: tuple[str, ...]
+    # The project owning each source file, and each project's threshold; projects
+    # without a threshold are reported but not enforced
+    owners: FrozenDict[str, str]
+    thresholds: FrozenDict[str, int]
+
+
+@dataclass(frozen=True)
+class ProjectCoverage:
+    """A project's share of the merged coverage, against its threshold."""
+
+    project: str
+    # None if the project has no coverage data
+    percent: float | None
+    threshold: int
+
+    @property
+    def passed(self) -> bool:
+        """Whether the project meets its threshold; without data only a 0% one is met."""
+        if self.percent is None:
+            return self.threshold <= 0
+        return self.percent >= self.threshold
+
+
+@dataclass(frozen=True)
+class CoverageReport:
+    """The merged coverage report."""
+
+    exit_code: int
+    report: str
+    coverage_data: Digest
+    projects: tuple[ProjectCoverage, ...] = ()
+
+    @property
+    def failed(self) -> tuple[ProjectCoverage, ...]:
+        """The projects below their threshold."""
+        return tuple(p for p in self.projects if not p.passed)
+
+
+@rule(desc="Merge coverage data", level=LogLevel.DEBUG)
+async def merge_coverage(
+    request: CoverageMergeRequest,
+    baseline_subsystem: BaselineSubsystem,
+    bash: BashBinary,
+) -> CoverageReport:
+    """Combine shard coverage data files, then report on the merged data once.
+
+    Shard sandboxes only hold the sources their tests import, so sources no test
+    imports are added as unexecuted by measuring an empty script over every source.
+    The term-missing report and a JSON report, from which each project's coverage is
+    checked against its own threshold, are rendered concurrently from the merged data.
+    Each step is a cached process, so an unchanged set of shard data reuses them all.
+    Every step reads the configuration the shards measured with, so the data's paths
+    are relative and resolve against the sources in each sandbox.
+    """
+    venv = request.venv
+    rcfile = f"--rcfile={COVERAGERC_PATH}"
+    config = await create_digest(
+        CreateDigest(
+            [
+                FileContent(_NOOP_SCRIPT, b""),
+                FileContent(
+                    COVERAGERC_PATH,
+                    coveragerc(project_roots(request.project_dirs, baseline_subsystem.src_roots)),
+                ),
+            ]
+        )
+    )
+    unexecuted = await execute_process(
+        Process(
+            argv=venv.argv(bash, "coverage", ["run", rcfile, _NOOP_SCRIPT]),
+            input_digest=await merge_digests(MergeDigests([venv.digest, config, request.sources])),
+            env={"COVERAGE_FILE": ".coverage.unexecuted"},
+            output_files=(".coverage.unexecuted",),
+            append_only_caches=venv.append_only_caches,
+            description="Find sources without coverage",
+            level=LogLevel.DEBUG,
+        ),
+        **implicitly(),
+    )
+    input_digest = await merge_digests(
+        MergeDigests(
+            [
+                venv.digest,
+                config,
+                request.sources,
+                unexecuted.output_digest,
+                *request.coverage_data,
+            ]
+        )
+    )
+
+    combined = await execute_process(
+        Process(
+            argv=venv.argv(bash, "coverage", ["combine", rcfile]),
+            input_digest=input_digest,
+            output_files=(".coverage",),
+            append_only_caches=venv.append_only_caches,
+            description=f"Combine coverage data from {len(request.coverage_data)} shards",
+            level=LogLevel.DEBUG,
+        ),
+        **implicitly(),
+    )
+    if combined.exit_code != 0:
+        return CoverageReport(
+            exit_code=combined.exit_code,
+            report=combined.stderr.decode() or combined.stdout.decode(),
+            coverage_data=EMPTY_DIGEST,
+        )
+
+    # The reports read the measured sources to list missing lines
+    report_digest = await merge_digests(
+        MergeDigests([venv.digest, config, combined.output_digest, request.sources])
+    )
+    report, json_report = await concurrently(
+        execute_process(
+            Process(
+                argv=venv.argv(bash, "coverage", ["report", rcfile, "-m"]),
+                input_digest=report_digest,
+                append_only_caches=venv.append_only_caches,
+                description="Report merged coverage",
+                level=LogLevel.DEBUG,
+            ),
+            **implicitly(),
+        ),
+        execute_process(
+            Process(
+                argv=venv.argv(bash, "coverage", ["json", rcfile, "-o", _COVERAGE_JSON]),
+                input_digest=report_digest,
+                output_files=(_COVERAGE_JSON,),
+                append_only_caches=venv.append_only_caches,
+                description="Report merged coverage per file",
+                level=LogLevel.DEBUG,
+            ),
+            **implicitly(),
+        ),
+    )
+    if report.exit_code != 0 or json_report.exit_code != 0:
+        failed = report if report.exit_code != 0 else json_report
+        return CoverageReport(
+            exit_code=failed.exit_code,
+            report=failed.stderr.decode() or failed.stdout.decode(),
+            coverage_data=combined.output_digest,
+        )
+
+    json_contents = await get_digest_contents(json_report.output_digest)
+    totals = coverage_by_owner(json_contents[0].content, request.owners)
+    projects = tuple(
+        ProjectCoverage(
+            project=project,
+            percent=totals.get(project, CoverageTotals()).percent,
+            threshold=threshold,
+        )
+        for project, threshold in sorted(request.thresholds.items())
+    )
+    return CoverageReport(
+        exit_code=_BELOW_THRESHOLD if any(not p.passed for p in projects) else 0,
+        report=report.stdout.decode(),
+        coverage_data=combined.output_digest,
+        projects=projects,
     )
 
 
@@ -146,5 +603,5 @@ def rules() -> Iterable:
     """Return all test rules."""
     return [
         *collect_rules(),
-        UnionRule(TestRequest, PytestTestRequest),
+        *PytestTestRequest.rules(),
     ]
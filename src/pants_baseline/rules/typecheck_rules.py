@@ -1,24 +1,63 @@
 """Rules for ty type checking."""
 
+import logging
 from dataclasses import dataclass
+from pathlib import PurePath
 from typing import Iterable
 
+from pants.backend.python.target_types import PythonSourceField
 from pants.core.goals.check import CheckRequest, CheckResult, CheckResults
 from pants.core.util_rules.external_tool import download_external_tool
-from pants.core.util_rules.source_files import SourceFiles, SourceFilesRequest
-from pants.engine.fs import MergeDigests
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import EMPTY_DIGEST, CreateDigest, Digest, FileContent, MergeDigests, PathGlobs
+from pants.engine.internals.graph import transitive_targets
 from pants.engine.internals.selectors import concurrently
-from pants.engine.intrinsics import merge_digests, execute_process
+from pants.engine.intrinsics import (
+    create_digest,
+    execute_process,
+    merge_digests,
+    path_globs_to_digest,
+)
 from pants.engine.platform import Platform
 from pants.engine.process import Process
 from pants.engine.rules import collect_rules, implicitly, rule
-from pants.engine.target import FieldSet, Target
+from pants.engine.target import FieldSet, SourcesField, Target, TransitiveTargetsRequest
 from pants.engine.unions import UnionRule
+from pants.source.source_root import SourceRootsRequest, get_source_roots
 from pants.util.logging import LogLevel
 
+from pants_baseline.rules.output_rules import (
+    OUTPUT_FILES,
+    ProcessOutputRequest,
+    logged_argv,
+    summarize_process_output,
+)
+from pants_baseline.rules.snapshot_rules import (
+    BaselineSnapshotRequest,
+    BaselineSnapshotsRequest,
+    BaselineSourcesRequest,
+    baseline_snapshots,
+    glob_baseline_sources,
+)
 from pants_baseline.subsystems.baseline import BaselineSubsystem
-from pants_baseline.subsystems.ty import TySubsystem
-from pants_baseline.targets import BaselineSourcesField, SkipTypecheckField
+from pants_baseline.subsystems.ty import TyPartitionMode, TySubsystem
+from pants_baseline.targets import (
+    BaselineSourcesField,
+    BaselineTestSourcesField,
+    PythonVersionField,
+    SkipTypecheckField,
+    StrictModeField,
+    project_value,
+)
+from pants_baseline.util_rules.file_args import file_args
+from pants_baseline.util_rules.import_graph import project_roots
+from pants_baseline.util_rules.partitions import connected_components
+from pants_baseline.util_rules.tool_config import TY_CONFIG_PATH, ty_config
+
+logger = logging.getLogger(__name__)
+
+# Where the full output of a partition ends up, for elided output
+_REPORT = "the ty report under the dist directory"
 
 
 @dataclass(frozen=True)
@@ -28,6 +67,10 @@ class TyFieldSet(FieldSet):
     required_fields = (BaselineSourcesField,)
 
     sources: BaselineSourcesField
+    # Not checked, but part of the project snapshot shared with the other tools
+    test_sources: BaselineTestSourcesField
+    python_version: PythonVersionField
+    strict: StrictModeField
     skip_typecheck: SkipTypecheckField
 
     @classmethod
@@ -43,14 +86,161 @@ class TyCheckRequest(CheckRequest):
     tool_name = "ty"
 
 
+@dataclass(frozen=True)
+class TyPartition:
+    """One ty invocation: the projects to check plus the sources they depend on."""
+
+    field_sets: tuple[TyFieldSet, ...]
+    dependency_sources: tuple[SourcesField, ...]
+    description: str | None
+    python_version: str
+    strict: bool
+    # The source roots of the projects and their dependencies, for resolving imports
+    search_paths: tuple[str, ...] = ()
+
+
+def _first_party_sources(tgt: Target) -> SourcesField | None:
+    """Return the Python sources field of a first-party dependency, if it has one."""
+    if tgt.has_field(BaselineSourcesField):
+        return tgt[BaselineSourcesField]
+    if tgt.has_field(PythonSourceField):
+        return tgt[PythonSourceField]
+    return None
+
+
+@dataclass(frozen=True)
+class TyConfigRequest:
+    """Request for the ty configuration of partitions with equal settings."""
+
+    python_version: str
+    extra_paths: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class TyConfigFile:
+    """A generated `ty.toml` to merge into the sandbox root."""
+
+    digest: Digest
+
+
+@rule(desc="Generate ty configuration", level=LogLevel.DEBUG)
+async def ty_config_file(request: TyConfigRequest, ty_subsystem: TySubsystem) -> TyConfigFile:
+    """Render the options into a canonical `ty.toml`, which ty reads from its project root."""
+    content = ty_config(
+        python_version=request.python_version,
+        extra_paths=[
+            *request.extra_paths,
+            *([ty_subsystem.stub_path] if ty_subsystem.stub_path else []),
+        ],
+        report_missing_imports=ty_subsystem.report_missing_imports,
+    )
+    digest = await create_digest(CreateDigest([FileContent(TY_CONFIG_PATH, content.encode())]))
+    return TyConfigFile(digest)
+
+
+@rule(desc="Type check a partition with ty", level=LogLevel.DEBUG)
+async def run_ty_partition(
+    partition: TyPartition,
+    ty_subsystem: TySubsystem,
+    baseline_subsystem: BaselineSubsystem,
+    bash: BashBinary,
+    platform: Platform,
+) -> CheckResult:
+    """Run ty on one partition, with its dependency closure available for imports."""
+    # Download ty and get source files in parallel
+    downloaded_ty, snapshots, dependency_sources = await concurrently(
+        download_external_tool(ty_subsystem.get_request(platform)),
+        baseline_snapshots(
+            BaselineSnapshotsRequest(
+                tuple(
+                    BaselineSnapshotRequest(fs.sources, fs.test_sources)
+                    for fs in partition.field_sets
+                )
+            )
+        ),
+        glob_baseline_sources(BaselineSourcesRequest(partition.dependency_sources), **implicitly()),
+    )
+    sources = snapshots.sources
+
+    if not sources.files:
+        return CheckResult(
+            exit_code=0,
+            stdout="No files to type check",
+            stderr="",
+            partition_description=partition.description,
+        )
+
+    # Merge the ty binary and config with the checked sources and their dependencies' sources
+    config = await ty_config_file(
+        TyConfigRequest(partition.python_version, partition.search_paths), **implicitly()
+    )
+    # The stubs `extra-paths` points at must be in the sandbox too
+    stub_path = ty_subsystem.stub_path.strip("/")
+    stubs = (
+        await path_globs_to_digest(PathGlobs([f"{stub_path}/**/*.pyi"]))
+        if stub_path
+        else EMPTY_DIGEST
+    )
+    input_digest = await merge_digests(
+        MergeDigests(
+            [
+                downloaded_ty.digest,
+                config.digest,
+                sources.digest,
+                dependency_sources.digest,
+                stubs,
+            ]
+        ),
+    )
+
+    # Build ty command
+    strict_arg = ["--strict"] if partition.strict else []
+    output_format_arg = [f"--output-format={ty_subsystem.output_format}"]
+
+    # Only the partition's own files are checked; dependencies are there to resolve imports.
+    # Huge file lists are passed as directory roots instead, which also checks any
+    # dependency sources that share those roots.
+    argv = [
+        downloaded_ty.exe,
+        "check",
+        *strict_arg,
+        *output_format_arg,
+        *file_args(sources.files).args,
+    ]
+
+    # Diagnostics go to log files, kept as a report, and only a summary is retained
+    process = Process(
+        argv=logged_argv(bash, argv, max_lines=baseline_subsystem.output_lines),
+        input_digest=input_digest,
+        output_files=OUTPUT_FILES,
+        description=f"Run ty type check on {len(sources.files)} files",
+        level=LogLevel.DEBUG,
+    )
+
+    result = await execute_process(process, **implicitly())
+    output = await summarize_process_output(
+        ProcessOutputRequest(result.output_digest), **implicitly()
+    )
+
+    return CheckResult(
+        exit_code=result.exit_code,
+        stdout=output.stdout.render(_REPORT),
+        stderr=output.stderr.render(_REPORT),
+        partition_description=partition.description,
+        report=output.digest,
+    )
+
+
 @rule(desc="Type check with ty", level=LogLevel.DEBUG)
 async def run_ty_check(
     request: TyCheckRequest,
     ty_subsystem: TySubsystem,
     baseline_subsystem: BaselineSubsystem,
-    platform: Platform,
 ) -> CheckResults:
-    """Run ty type checker on Python files."""
+    """Run ty type checker on Python files, one partition per target or component."""
+    for warning in ty_subsystem.deprecation_warnings:
+        logger.warning(warning)
+
     if not baseline_subsystem.enabled:
         return CheckResults(
             results=[
@@ -80,70 +270,104 @@ async def run_ty_check(
             checker_name="ty",
         )
 
-    # Download ty and get source files in parallel using new intrinsics
-    downloaded_ty_get = download_external_tool(ty_subsystem.get_request(platform))
-    sources_get = SourceFilesRequest(
-        sources_fields=[fs.sources for fs in field_sets],
-        for_sources_types=(BaselineSourcesField,),
-    )
-
-    downloaded_ty, sources = await concurrently(
-        downloaded_ty_get,
-        implicitly(sources_get, SourceFiles),
+    # Resolve every project's transitive first-party dependencies in parallel
+    all_transitive = await concurrently(
+        transitive_targets(TransitiveTargetsRequest([fs.address]), **implicitly())
+        for fs in field_sets
     )
+    dependencies = {
+        fs.address: transitive.dependencies
+        for fs, transitive in zip(field_sets, all_transitive, strict=True)
+    }
+    by_address = {fs.address: fs for fs in field_sets}
 
-    if not sources.files:
-        return CheckResults(
-            results=[
-                CheckResult(
-                    exit_code=0,
-                    stdout="No files to type check",
-                    stderr="",
-                    partition_description=None,
-                )
-            ],
-            checker_name="ty",
+    if ty_subsystem.partition is TyPartitionMode.single:
+        groups = [tuple(by_address)]
+    elif ty_subsystem.partition is TyPartitionMode.component:
+        groups = list(
+            connected_components(
+                {address: [dep.address for dep in deps] for address, deps in dependencies.items()}
+            )
         )
+    else:
+        groups = [(address,) for address in by_address]
 
-    # Merge the ty binary with the source files
-    input_digest = await merge_digests(
-        MergeDigests([downloaded_ty.digest, sources.snapshot.digest]),
-    )
-
-    # Build ty command
-    strict_arg = ["--strict"] if ty_subsystem.strict else []
-    output_format_arg = [f"--output-format={ty_subsystem.output_format}"]
-
-    argv = [
-        downloaded_ty.exe,
-        "check",
-        f"--python-version={baseline_subsystem.python_version}",
-        *strict_arg,
-        *output_format_arg,
-        *sources.files,
+    # Projects are only checked together if they share settings; a group with mixed
+    # settings splits, and its members see each other as dependencies instead.
+    settings = {
+        fs.address: (
+            project_value(fs.python_version, baseline_subsystem.python_version),
+            project_value(fs.strict, ty_subsystem.strict),
+        )
+        for fs in field_sets
+    }
+    mixed = len(set(settings.values())) > 1
+    groups = [
+        tuple(address for address in group if settings[address] == key)
+        for group in groups
+        for key in dict.fromkeys(settings[address] for address in group)
     ]
 
-    process = Process(
-        argv=argv,
-        input_digest=input_digest,
-        description=f"Run ty type check on {len(sources.files)} files",
-        level=LogLevel.DEBUG,
+    # python_source dependencies resolve imports from Pants' own source roots
+    source_dirs = sorted(
+        {
+            dep.address.spec_path
+            for deps in dependencies.values()
+            for dep in deps
+            if not dep.has_field(BaselineSourcesField) and dep.has_field(PythonSourceField)
+        }
+    )
+    source_roots = await get_source_roots(
+        SourceRootsRequest(files=(), dirs=tuple(PurePath(d) for d in source_dirs))
     )
 
-    result = await execute_process(process, **implicitly())
-
-    return CheckResults(
-        results=[
-            CheckResult(
-                exit_code=result.exit_code,
-                stdout=result.stdout.decode(),
-                stderr=result.stderr.decode(),
-                partition_description=None,
+    partitions = []
+    for group in groups:
+        # Dependency sources shared by several members are only included once
+        dependency_sources = {
+            dep.address: sources
+            for address in group
+            for dep in dependencies[address]
+            if dep.address not in group and (sources := _first_party_sources(dep)) is not None
+        }
+        # Sources merged into the sandbox are only importable from their roots
+        search_paths = set(
+            project_roots([address.spec_path for address in group], baseline_subsystem.src_roots)
+        )
+        for address in group:
+            for dep in dependencies[address]:
+                if dep.has_field(BaselineSourcesField):
+                    search_paths.update(
+                        project_roots([dep.address.spec_path], baseline_subsystem.src_roots)
+                    )
+                elif root := source_roots.path_to_root.get(PurePath(dep.address.spec_path)):
+                    search_paths.add(root.path)
+        python_version, strict = settings[group[0]]
+        if len(groups) == 1:
+            description = None
+        elif len(group) == 1:
+            description = group[0].spec
+        else:
+            description = f"{group[0].spec} and {len(group) - 1} connected target(s)"
+        if description and mixed:
+            description += f" (py{python_version}{', strict' if strict else ''})"
+        partitions.append(
+            TyPartition(
+                field_sets=tuple(by_address[address] for address in group),
+                dependency_sources=tuple(dependency_sources.values()),
+                description=description,
+                python_version=python_version,
+                strict=strict,
+                search_paths=tuple(sorted(search_paths)),
             )
-        ],
-        checker_name="ty",
+        )
+
+    results = await concurrently(
+        run_ty_partition(partition, **implicitly()) for partition in partitions
     )
 
+    return CheckResults(results=results, checker_name="ty")
+
 
 def rules() -> Iterable:
     """Return all type check rules."""
@@ -0,0 +1,126 @@
+"""Rules resolving the cached venv pytest runs in.
+
+Tests used to run a bare `pytest` from the host's PATH. They now run in a venv
+that uv builds from `[baseline-pytest].requirements` plus the projects' locked
+packages, with a uv-managed interpreter. The venv lives in a named cache under a
+key derived from its requirements, so it is built on the first run and reused by
+every later process, while the process inputs, and so its cache key, only carry
+uv and the requirements file.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from pants.core.util_rules.external_tool import download_external_tool
+from pants.core.util_rules.system_binaries import BashBinary
+from pants.engine.fs import CreateDigest, Digest, FileContent, MergeDigests, PathGlobs
+from pants.engine.internals.selectors import concurrently
+from pants.engine.intrinsics import (
+    create_digest,
+    get_digest_contents,
+    merge_digests,
+    path_globs_to_digest,
+    path_globs_to_paths,
+)
+from pants.engine.platform import Platform
+from pants.engine.rules import collect_rules, rule
+from pants.util.frozendict import FrozenDict
+from pants.util.logging import LogLevel
+
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
+from pants_baseline.subsystems.uv import UvSubsystem
+from pants_baseline.util_rules.lockfile import candidate_lock_files, locked_packages
+from pants_baseline.util_rules.venv import (
+    REQUIREMENTS_PATH,
+    VENV_CACHE_NAME,
+    VENV_CACHE_PATH,
+    bootstrap_script,
+    venv_key,
+    venv_requirements,
+)
+
+
+@dataclass(frozen=True)
+class PytestVenvRequest:
+    """Request for the venv to test the projects in `project_dirs` with."""
+
+    project_dirs: tuple[str, ...]
+    python_version: str
+
+
+@dataclass(frozen=True)
+class PytestVenv:
+    """A cached venv: uv and the requirements to build it, and how to run in it."""
+
+    # uv and the requirements file, to merge into the sandbox
+    digest: Digest
+    key: str
+    script: str
+
+    @property
+    def append_only_caches(self) -> FrozenDict[str, str]:
+        """The named cache holding the venvs, uv's cache and managed interpreters."""
+        return FrozenDict({VENV_CACHE_NAME: VENV_CACHE_PATH})
+
+    def argv(self, bash: BashBinary, module: str, args: Iterable[str]) -> tuple[str, ...]:
+        """Return the argv running `python -m module *args` in the venv, building it first."""
+        return (bash.path, "-c", self.script, "baseline-pytest", module, *args)
+
+
+@rule(desc="Resolve the pytest venv", level=LogLevel.DEBUG)
+async def resolve_pytest_venv(
+    request: PytestVenvRequest,
+    pytest_subsystem: BaselinePytestSubsystem,
+    uv_subsystem: UvSubsystem,
+    platform: Platform,
+) -> PytestVenv:
+    """Pin the venv's requirements and key; the venv itself is built by the first process.
+
+    Projects use their nearest lock file, as for auditing, and the pins of every
+    lock file involved are installed together.
+    """
+    lock_files: list[str] = []
+    if pytest_subsystem.install_locked:
+        candidates = [
+            candidate_lock_files(directory, uv_subsystem.lock_file)
+            for directory in request.project_dirs
+        ]
+        existing = await path_globs_to_paths(
+            PathGlobs(sorted({c for cs in candidates for c in cs}))
+        )
+        existing_files = set(existing.files)
+        # Each project's nearest existing lock file; projects without one add nothing
+        lock_files = sorted(
+            {
+                nearest
+                for cs in candidates
+                if (nearest := next((c for c in cs if c in existing_files), None))
+            }
+        )
+
+    downloaded_uv, lock_contents = await concurrently(
+        download_external_tool(uv_subsystem.get_request(platform)),
+        get_digest_contents(await path_globs_to_digest(PathGlobs(lock_files))),
+    )
+    requirements = venv_requirements(
+        pytest_subsystem.requirements,
+        (pin for fc in lock_contents for pin in locked_packages(fc.path, fc.content)),
+    )
+    key = venv_key(requirements, request.python_version, uv_subsystem.version)
+
+    requirements_digest = await create_digest(
+        CreateDigest([FileContent(REQUIREMENTS_PATH, requirements.encode())])
+    )
+    digest = await merge_digests(MergeDigests([downloaded_uv.digest, requirements_digest]))
+    return PytestVenv(
+        digest=digest,
+        key=key,
+        script=bootstrap_script(downloaded_uv.exe, key, request.python_version),
+    )
+
+
+def rules() -> Iterable:
+    """Return all pytest venv rules."""
+    return collect_rules()
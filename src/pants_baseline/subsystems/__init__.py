@@ -1,11 +1,13 @@
 """Subsystems for Python Baseline plugin configuration."""
 
 from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
 from pants_baseline.subsystems.ty import TySubsystem
 from pants_baseline.subsystems.uv import UvSubsystem
 
 __all__ = [
+    "BaselinePytestSubsystem",
     "BaselineSubsystem",
     "RuffSubsystem",
     "TySubsystem",
@@ -54,7 +54,22 @@ class BaselineSubsystem(Subsystem):
             ".ruff_cache",
             "migrations",
         ],
-        help="Patterns to exclude from all baseline checks.",
+        help=(
+            "Patterns to exclude from all baseline checks, with .gitignore semantics: a "
+            "bare name such as `.venv` matches at any depth, and a pattern containing `/` "
+            "is relative to the project's directory. Matching directories are pruned "
+            "while globbing sources, and Ruff excludes the same names."
+        ),
+    )
+
+    output_lines = IntOption(
+        default=200,
+        help=(
+            "Maximum number of lines of type checker and test output to show per process: "
+            "the first and last halves are kept and the rest is elided. Full output is "
+            "kept as a file in the store and written to the dist directory. 0 shows "
+            "everything."
+        ),
     )
 
     # Coverage threshold
@@ -0,0 +1,51 @@
+"""pytest subsystem for test configuration."""
+
+from __future__ import annotations
+
+from pants.option.option_types import BoolOption, SkipOption, StrListOption
+from pants.option.subsystem import Subsystem
+
+
+class BaselinePytestSubsystem(Subsystem):
+    """Configuration for running pytest through Pants' `test` goal.
+
+    Each `baseline_python_project` is tested in its own process, so Pants can
+    cache and report results per target. pytest runs in a venv that uv builds
+    once per set of requirements and keeps in a named cache.
+    """
+
+    options_scope = "baseline-pytest"
+    name = "pytest"
+    help = "pytest configuration for baseline plugin."
+
+    # Skip option required by Pants for test tool subsystems
+    skip = SkipOption("test")
+
+    requirements = StrListOption(
+        default=["pytest>=8.0", "pytest-cov>=5.0"],
+        help=(
+            "Requirements installed into the venv tests run in, alongside the packages "
+            "pinned in the projects' lock files (`[baseline-uv].lock_file`). A package the "
+            "lock file pins is installed at its pinned version instead."
+        ),
+    )
+
+    minimal_sandbox = BoolOption(
+        default=True,
+        help=(
+            "Give each `baseline-test` shard only its test files, the `conftest.py` and "
+            "`__init__.py` files above them, and the first-party modules they "
+            "transitively import, found from an import graph. Editing a module then only "
+            "re-runs the shards that import it. Disable this if tests load modules in "
+            "ways the import graph cannot see, such as `importlib` with computed names."
+        ),
+    )
+
+    install_locked = BoolOption(
+        default=True,
+        help=(
+            "Install the packages pinned in the projects' lock files into the test venv. "
+            "The venv is keyed by the resulting requirements, so it is rebuilt only when "
+            "a lock file or `requirements` change."
+        ),
+    )
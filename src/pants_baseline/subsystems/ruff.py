@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import hashlib
+
 from pants.core.util_rules.external_tool import ExternalTool
 from pants.engine.platform import Platform
 from pants.engine.rules import collect_rules
 from pants.engine.unions import UnionRule
-from pants.option.option_types import BoolOption, SkipOption, StrListOption, StrOption
+from pants.option.option_types import BoolOption, IntOption, SkipOption, StrListOption, StrOption
 from pants.core.goals.generate_lockfiles import ExportableTool
+from pants.util.frozendict import FrozenDict
+
+_NAMED_CACHE = "baseline_ruff"
+_NAMED_CACHE_PATH = ".cache/baseline_ruff"
 
 
 class RuffSubsystem(ExternalTool):
@@ -105,6 +111,40 @@ class RuffSubsystem(ExternalTool):
         help="Allow unsafe fixes that may change code behavior.",
     )
 
+    # Partitioning
+    shards = IntOption(
+        default=0,
+        help=(
+            "Number of parallel shards to split Ruff lint and format runs into. 0 sizes "
+            "the shards automatically from the file count, total source size and "
+            "`--process-execution-local-parallelism`; 1 runs a single process."
+        ),
+    )
+
+    combined = BoolOption(
+        default=False,
+        help=(
+            "Fix, format and lint each shard in a single sandbox. `fmt` applies fixes "
+            "(per `fix` and `unsafe_fixes`) along with formatting, and `lint` reports the "
+            "diagnostics in the files as they are, fixable or not. When both goals see the "
+            "same files, as in `pants lint ::` or `pants fmt lint ::` on clean sources, one "
+            "process serves both."
+        ),
+    )
+
+    # Caching
+    named_cache = BoolOption(
+        default=False,
+        advanced=True,
+        help=(
+            "Persist Ruff's own per-file cache across sandboxes in a Pants named cache, "
+            "keyed by Ruff version and effective configuration. Ruff keys its entries on "
+            "the project root path and file modification times, so this only pays off in "
+            "environments with stable sandbox paths. When disabled Ruff runs with "
+            "`--no-cache` so no throwaway cache is written into each sandbox."
+        ),
+    )
+
     # Per-file ignores (common patterns)
     skip_tests_rules = StrListOption(
         default=[
@@ -123,6 +163,20 @@ class RuffSubsystem(ExternalTool):
         help="Rules to skip in __init__.py files.",
     )
 
+    @property
+    def append_only_caches(self) -> FrozenDict[str, str]:
+        """Return the named caches to mount into Ruff processes."""
+        if not self.named_cache:
+            return FrozenDict()
+        return FrozenDict({_NAMED_CACHE: _NAMED_CACHE_PATH})
+
+    def cache_args(self, *config_args: str) -> tuple[str, ...]:
+        """Return Ruff's cache arguments for a run with the given configuration args."""
+        if not self.named_cache:
+            return ("--no-cache",)
+        key = hashlib.sha256("\0".join((self.version, *config_args)).encode()).hexdigest()
+        return (f"--cache-dir={_NAMED_CACHE_PATH}/{self.version}-{key[:16]}",)
+
 
 def rules():
     """Return rules for the Ruff subsystem."""
@@ -2,12 +2,32 @@
 
 from __future__ import annotations
 
+from enum import Enum
+
 from pants.core.goals.generate_lockfiles import ExportableTool
 from pants.core.util_rules.external_tool import ExternalTool
 from pants.engine.platform import Platform
 from pants.engine.rules import collect_rules
 from pants.engine.unions import UnionRule
-from pants.option.option_types import BoolOption, StrListOption, StrOption
+from pants.option.option_types import BoolOption, EnumOption, StrListOption, StrOption
+
+# Options ty has no use for, and what to use instead
+_DEPRECATED_OPTIONS = {
+    "report_unused_imports": "ty does not check for unused imports; Ruff reports them (F401).",
+    "report_unused_variables": (
+        "ty does not check for unused variables; Ruff reports them (F841)."
+    ),
+    "include": "each `baseline_python_project`'s `sources` decide what is type checked.",
+    "exclude": "use `[baseline].exclude_patterns`, which applies to every check.",
+}
+
+
+class TyPartitionMode(Enum):
+    """How type checking is split into ty processes."""
+
+    target = "target"
+    component = "component"
+    single = "single"
 
 
 class TySubsystem(ExternalTool):
@@ -58,6 +78,18 @@ class TySubsystem(ExternalTool):
         help="Enable strict type checking mode.",
     )
 
+    # Partitioning
+    partition = EnumOption(
+        default=TyPartitionMode.target,
+        help=(
+            "How to split type checking into processes: 'target' runs one ty process per "
+            "`baseline_python_project`, 'component' one per connected component of the "
+            "dependency graph between them, and 'single' checks everything at once. Each "
+            "partition sees only its own sources plus its transitive first-party "
+            "dependencies, so unchanged partitions are served from the process cache."
+        ),
+    )
+
     # Error reporting
     report_missing_imports = BoolOption(
         default=True,
@@ -66,18 +98,18 @@ class TySubsystem(ExternalTool):
 
     report_unused_imports = BoolOption(
         default=True,
-        help="Report errors for unused imports.",
+        help=f"Deprecated and ignored: {_DEPRECATED_OPTIONS['report_unused_imports']}",
     )
 
     report_unused_variables = BoolOption(
         default=True,
-        help="Report errors for unused variables.",
+        help=f"Deprecated and ignored: {_DEPRECATED_OPTIONS['report_unused_variables']}",
     )
 
     # Include/exclude paths
     include = StrListOption(
         default=["src", "tests"],
-        help="Directories to include in type checking.",
+        help=f"Deprecated and ignored: {_DEPRECATED_OPTIONS['include']}",
     )
 
     exclude = StrListOption(
@@ -88,7 +120,7 @@ class TySubsystem(ExternalTool):
             "dist",
             "build",
         ],
-        help="Patterns to exclude from type checking.",
+        help=f"Deprecated and ignored: {_DEPRECATED_OPTIONS['exclude']}",
     )
 
     # Type stub handling
@@ -103,6 +135,15 @@ class TySubsystem(ExternalTool):
         help="Output format for type errors ('text', 'json', 'github').",
     )
 
+    @property
+    def deprecation_warnings(self) -> tuple[str, ...]:
+        """Return a warning for each deprecated option that is explicitly set."""
+        return tuple(
+            f"[{self.options_scope}].{name} is deprecated and ignored: {hint}"
+            for name, hint in _DEPRECATED_OPTIONS.items()
+            if not self.options.is_default(name)
+        )
+
 
 def rules():
     """Return rules for the ty subsystem."""
@@ -61,6 +61,28 @@ class UvSubsystem(ExternalTool):
         help="Vulnerability IDs to ignore (e.g., 'GHSA-xxxx-xxxx-xxxx').",
     )
 
+    audit_min_severity = StrOption(
+        default="unknown",
+        help=(
+            "Only report and fail on vulnerabilities at or above this severity: 'unknown' "
+            "(report everything, including advisories without a severity), 'low', "
+            "'medium', 'high' or 'critical'."
+        ),
+    )
+
+    advisory_url = StrOption(
+        default="https://osv-vulnerabilities.storage.googleapis.com/PyPI/all.zip",
+        advanced=True,
+        help=(
+            "Where to fetch the OSV advisory database from: a URL of an OSV export, a "
+            "path in the repository to an OSV zip, a directory of OSV JSON records or a "
+            "single JSON file, or an absolute path or `file://` URL of an OSV zip or JSON "
+            "file for offline use. URLs and absolute paths are downloaded with `curl` at "
+            "most once a day, and the download is kept in Pants' process cache; if a "
+            "refresh fails, a cached download from one of the previous days is used."
+        ),
+    )
+
     audit_fail_on_warning = BoolOption(
         default=False,
         help="Fail the audit if any warnings are found (not just errors).",
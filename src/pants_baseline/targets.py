@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from pants.engine.target import (
     COMMON_TARGET_FIELDS,
     BoolField,
+    Dependencies,
+    Field,
     IntField,
     MultipleSourcesField,
     StringField,
     Target,
+    TriBoolField,
 )
 
 
@@ -17,7 +22,10 @@ class BaselineSourcesField(MultipleSourcesField):
 
     default = ("src/**/*.py",)
     expected_file_extensions = (".py", ".pyi")
-    help = "Python source files to include in baseline checks."
+    help = (
+        "Python source files to include in baseline checks. Paths matching "
+        "`[baseline-python].exclude_patterns` are skipped."
+    )
 
 
 class BaselineTestSourcesField(MultipleSourcesField):
@@ -26,39 +34,57 @@ class BaselineTestSourcesField(MultipleSourcesField):
     alias = "test_sources"
     default = ("tests/**/*.py",)
     expected_file_extensions = (".py", ".pyi")
-    help = "Test files to include in baseline checks."
+    help = (
+        "Test files to include in baseline checks. Paths matching "
+        "`[baseline-python].exclude_patterns` are skipped."
+    )
+
+
+class BaselineDependenciesField(Dependencies):
+    """First-party dependencies of the baseline Python project."""
+
+    help = (
+        "Addresses of other `baseline_python_project` or `python_source(s)` targets "
+        "this project imports. Their sources are made available to type checking."
+    )
 
 
 class PythonVersionField(StringField):
     """Target Python version for the project."""
 
     alias = "python_version"
-    default = "3.11"
-    help = "Target Python version (e.g., '3.11', '3.12')."
+    default = None
+    help = (
+        "Target Python version (e.g., '3.11', '3.12'). Defaults to "
+        "`[baseline-python].python_version`."
+    )
 
 
 class LineLengthField(IntField):
     """Maximum line length for formatting."""
 
     alias = "line_length"
-    default = 120
-    help = "Maximum line length for code formatting."
+    default = None
+    help = "Maximum line length for code formatting. Defaults to `[baseline-python].line_length`."
 
 
-class StrictModeField(BoolField):
+class StrictModeField(TriBoolField):
     """Enable strict mode for all checks."""
 
     alias = "strict"
-    default = True
-    help = "Enable strict mode for type checking and linting."
+    default = None
+    help = "Enable strict mode for type checking. Defaults to `[baseline-ty].strict`."
 
 
 class CoverageThresholdField(IntField):
     """Minimum coverage percentage required."""
 
     alias = "coverage_threshold"
-    default = 80
-    help = "Minimum code coverage percentage required."
+    default = None
+    help = (
+        "Minimum code coverage percentage required. Defaults to "
+        "`[baseline-python].coverage_threshold`."
+    )
 
 
 class SkipLintField(BoolField):
@@ -127,6 +153,7 @@ class BaselinePythonProject(Target):
         *COMMON_TARGET_FIELDS,
         BaselineSourcesField,
         BaselineTestSourcesField,
+        BaselineDependenciesField,
         PythonVersionField,
         LineLengthField,
         StrictModeField,
@@ -137,3 +164,12 @@ class BaselinePythonProject(Target):
         SkipTestField,
         SkipAuditField,
     )
+
+
+def project_value(field: Field, fallback: Any) -> Any:
+    """Return a project's setting, or `fallback` if the project does not set it.
+
+    Project settings default to unset, so a project follows the global option unless
+    it sets its own value, even one equal to the option's.
+    """
+    return fallback if field.value is None else field.value
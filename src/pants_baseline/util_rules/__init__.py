@@ -0,0 +1 @@
+"""Shared helper rules and utilities for the Python Baseline plugin."""
@@ -0,0 +1,360 @@
+"""The PyPI advisory database and a matcher over it.
+
+Advisories come from an OSV export (by default the PyPI bulk export, a zip of one
+JSON record per advisory). The audit rules fetch the export, at most once a day,
+and hand its files to this module, which indexes the advisories by package name.
+Nothing here touches the network or the filesystem.
+
+The source may also be a path in the repository to an OSV zip, a directory of OSV
+JSON records or a single JSON file, or an absolute path or `file://` URL of an OSV
+zip or JSON file, which lets audits run fully offline.
+"""
+
+from __future__ import annotations
+
+import datetime
+import io
+import json
+import math
+import urllib.parse
+import zipfile
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Iterable, Iterator
+
+from packaging.version import InvalidVersion, Version
+
+from pants_baseline.util_rules.lockfile import canonical_name
+
+FETCH_TIMEOUT_SECONDS = 120
+# How many earlier days' downloads to fall back to when today's fails
+FALLBACK_DAYS = 3
+
+# Severity labels from least to most severe.
+SEVERITIES = ("unknown", "low", "medium", "high", "critical")
+_LABEL_ALIASES = {"moderate": "medium", "important": "high"}
+# Preferred advisory ID prefixes when several advisories describe the same issue.
+_ID_PREFERENCE = ("GHSA-", "PYSEC-", "CVE-")
+
+# CVSS v3 base metric weights.
+_CVSS3_WEIGHTS = {
+    "AV": {"N": 0.85, "A": 0.62, "L": 0.55, "P": 0.2},
+    "AC": {"L": 0.77, "H": 0.44},
+    "UI": {"N": 0.85, "R": 0.62},
+    "C": {"H": 0.56, "L": 0.22, "N": 0.0},
+    "I": {"H": 0.56, "L": 0.22, "N": 0.0},
+    "A": {"H": 0.56, "L": 0.22, "N": 0.0},
+}
+_CVSS3_PRIVILEGES = {"U": {"N": 0.85, "L": 0.62, "H": 0.27}, "C": {"N": 0.85, "L": 0.68, "H": 0.5}}
+
+
+class AdvisoryDatabaseError(Exception):
+    """Raised when no advisory database can be fetched or read."""
+
+
+def _roundup(value: float) -> float:
+    """Round up to one decimal place as specified by CVSS v3.1."""
+    scaled = round(value * 100_000)
+    if scaled % 10_000 == 0:
+        return scaled / 100_000
+    return (math.floor(scaled / 10_000) + 1) / 10
+
+
+def cvss3_base_score(vector: str) -> float | None:
+    """Compute the base score of a CVSS v3 vector, or None if it cannot be parsed."""
+    prefix, _, metrics = vector.partition("/")
+    if not prefix.startswith("CVSS:3"):
+        return None
+    values = dict(part.split(":", 1) for part in metrics.split("/") if ":" in part)
+    try:
+        scope = values["S"]
+        weights = {metric: _CVSS3_WEIGHTS[metric][values[metric]] for metric in _CVSS3_WEIGHTS}
+        privileges = _CVSS3_PRIVILEGES[scope][values["PR"]]
+    except KeyError:
+        return None
+
+    iss = 1 - (1 - weights["C"]) * (1 - weights["I"]) * (1 - weights["A"])
+    impact = 6.42 * iss if scope == "U" else 7.52 * (iss - 0.029) - 3.25 * (iss - 0.02) ** 15
+    if impact <= 0:
+        return 0.0
+    exploitability = 8.22 * weights["AV"] * weights["AC"] * privileges * weights["UI"]
+    if scope == "U":
+        return _roundup(min(impact + exploitability, 10))
+    return _roundup(min(1.08 * (impact + exploitability), 10))
+
+
+def severity_label(raw: str) -> str:
+    """Normalize a severity label or CVSS v3 vector to one of `SEVERITIES`."""
+    label = raw.strip().lower()
+    label = _LABEL_ALIASES.get(label, label)
+    if label in SEVERITIES:
+        return label
+    score = cvss3_base_score(raw.strip())
+    if score is None or score == 0:
+        return "unknown"
+    if score < 4:
+        return "low"
+    if score < 7:
+        return "medium"
+    if score < 9:
+        return "high"
+    return "critical"
+
+
+@dataclass(frozen=True)
+class Advisory:
+    """One advisory affecting one package."""
+
+    id: str
+    aliases: tuple[str, ...]
+    summary: str
+    severity: str
+    versions: frozenset[str]
+    # (introduced, fixed, last_affected) intervals over PEP 440 versions.
+    ranges: tuple[tuple[str | None, str | None, str | None], ...]
+    fixed: tuple[str, ...]
+
+    def affects(self, version: str) -> bool:
+        """Whether `version` is affected, by explicit listing or by a version range."""
+        if version in self.versions:
+            return True
+        try:
+            parsed = Version(version)
+        except InvalidVersion:
+            return False
+        for introduced, fixed, last_affected in self.ranges:
+            try:
+                if introduced not in (None, "0") and parsed < Version(introduced):
+                    continue
+                if fixed is not None and parsed >= Version(fixed):
+                    continue
+                if last_affected is not None and parsed > Version(last_affected):
+                    continue
+            except InvalidVersion:
+                continue
+            return True
+        return False
+
+
+@dataclass(frozen=True)
+class Vulnerability:
+    """One known vulnerability in one locked package version."""
+
+    package: str
+    version: str
+    advisory_id: str
+    severity: str
+    fix_version: str | None
+    aliases: tuple[str, ...] = ()
+    summary: str = ""
+
+    def to_json(self) -> dict[str, Any]:
+        """Return a JSON-serializable dict of this vulnerability."""
+        return {
+            "package": self.package,
+            "version": self.version,
+            "id": self.advisory_id,
+            "severity": self.severity,
+            "fix_version": self.fix_version,
+            "aliases": list(self.aliases),
+            "summary": self.summary,
+        }
+
+
+def _ranges(events: list[dict[str, str]]) -> Iterator[tuple[str | None, str | None, str | None]]:
+    """Turn an OSV event list into (introduced, fixed, last_affected) intervals."""
+    introduced = None
+    open_interval = False
+    for event in events:
+        if "introduced" in event:
+            introduced, open_interval = event["introduced"], True
+        elif "fixed" in event and open_interval:
+            yield introduced, event["fixed"], None
+            open_interval = False
+        elif "last_affected" in event and open_interval:
+            yield introduced, None, event["last_affected"]
+            open_interval = False
+    if open_interval:
+        yield introduced, None, None
+
+
+def _severity(record: dict[str, Any]) -> str:
+    """Return the advisory's severity label, or derive one from its CVSS v3 vector."""
+    label = (record.get("database_specific") or {}).get("severity")
+    if isinstance(label, str) and severity_label(label) != "unknown":
+        return severity_label(label)
+    for entry in record.get("severity") or []:
+        if entry.get("type") == "CVSS_V3" and entry.get("score"):
+            return severity_label(str(entry["score"]))
+    return "unknown"
+
+
+def parse_osv_record(record: dict[str, Any]) -> Iterator[tuple[str, Advisory]]:
+    """Yield (canonical package name, advisory) for each PyPI package an OSV record affects."""
+    if record.get("withdrawn"):
+        return
+    for affected in record.get("affected") or []:
+        package = affected.get("package") or {}
+        if package.get("ecosystem") != "PyPI" or not package.get("name"):
+            continue
+        ranges = tuple(
+            interval
+            for r in affected.get("ranges") or []
+            if r.get("type") in ("ECOSYSTEM", "SEMVER")
+            for interval in _ranges(r.get("events") or [])
+        )
+        yield (
+            canonical_name(package["name"]),
+            Advisory(
+                id=record["id"],
+                aliases=tuple(record.get("aliases") or ()),
+                summary=record.get("summary") or record.get("details", "").split("\n", 1)[0],
+                severity=_severity(record),
+                versions=frozenset(affected.get("versions") or ()),
+                ranges=ranges,
+                fixed=tuple(sorted({r[1] for r in ranges if r[1]})),
+            ),
+        )
+
+
+def iter_osv_records(files: Iterable[tuple[str, bytes]]) -> Iterator[dict[str, Any]]:
+    """Stream OSV records from (path, content) pairs of zip exports and JSON files."""
+    for path, content in files:
+        try:
+            if zipfile.is_zipfile(io.BytesIO(content)):
+                with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                    for name in archive.namelist():
+                        if name.endswith(".json"):
+                            yield json.loads(archive.read(name))
+            else:
+                data = json.loads(content)
+                yield from data if isinstance(data, list) else [data]
+        except (ValueError, zipfile.BadZipFile) as e:
+            raise AdvisoryDatabaseError(f"Failed to read OSV records from {path}: {e}") from e
+
+
+def download_url(source: str) -> str | None:
+    """Return the URL to download `source` from, or None for a path in the repository."""
+    if urllib.parse.urlparse(source).scheme:
+        return source
+    if PurePosixPath(source).is_absolute():
+        return PurePosixPath(source).as_uri()
+    return None
+
+
+def earlier_days(day: str, count: int) -> tuple[str, ...]:
+    """Return the `count` ISO dates before `day`, newest first."""
+    date = datetime.date.fromisoformat(day)
+    return tuple((date - datetime.timedelta(days=i)).isoformat() for i in range(1, count + 1))
+
+
+class AdvisoryDatabase:
+    """Advisories indexed by canonical package name."""
+
+    def __init__(self, advisories: dict[str, tuple[Advisory, ...]]) -> None:
+        self._advisories = advisories
+
+    @classmethod
+    def from_osv(cls, files: Iterable[tuple[str, bytes]]) -> AdvisoryDatabase:
+        """Index the advisories in the (path, content) pairs of an OSV export."""
+        advisories: dict[str, list[Advisory]] = {}
+        for record in iter_osv_records(files):
+            for name, advisory in parse_osv_record(record):
+                advisories.setdefault(name, []).append(advisory)
+        return cls({name: tuple(a) for name, a in advisories.items()})
+
+    def __len__(self) -> int:
+        return sum(len(a) for a in self._advisories.values())
+
+    def advisories_for(self, name: str, version: str) -> tuple[Advisory, ...]:
+        """Return the advisories affecting one package version."""
+        return tuple(
+            a for a in self._advisories.get(canonical_name(name), ()) if a.affects(version)
+        )
+
+    def package_vulnerabilities(self, name: str, version: str) -> tuple[Vulnerability, ...]:
+        """Return every vulnerability in one package version, before any filtering.
+
+        Advisories that share an ID or alias (e.g. a PYSEC advisory and the GHSA
+        advisory it mirrors) are merged into one vulnerability.
+        """
+        groups = _alias_groups(list(self.advisories_for(name, version)))
+        return tuple(sorted((_merge(name, version, g) for g in groups), key=_sort_key))
+
+
+def filter_vulnerabilities(
+    vulnerabilities: Iterable[Vulnerability],
+    ignore: Iterable[str] = (),
+    min_severity: str = "unknown",
+) -> tuple[Vulnerability, ...]:
+    """Drop ignored vulnerabilities (by ID or alias) and those below `min_severity`."""
+    ignored = set(ignore)
+    threshold = SEVERITIES.index(min_severity)
+    return tuple(
+        sorted(
+            {
+                v
+                for v in vulnerabilities
+                if v.advisory_id not in ignored
+                and ignored.isdisjoint(v.aliases)
+                and SEVERITIES.index(v.severity) >= threshold
+            },
+            key=_sort_key,
+        )
+    )
+
+
+def _sort_key(vulnerability: Vulnerability) -> tuple[str, str, str]:
+    return vulnerability.package, vulnerability.version, vulnerability.advisory_id
+
+
+def _alias_groups(advisories: list[Advisory]) -> list[list[Advisory]]:
+    """Group advisories that are linked through shared IDs or aliases."""
+    groups: list[tuple[set[str], list[Advisory]]] = []
+    for advisory in advisories:
+        keys = {advisory.id, *advisory.aliases}
+        linked = [g for g in groups if not g[0].isdisjoint(keys)]
+        for g in linked:
+            groups.remove(g)
+            keys |= g[0]
+        groups.append((keys, [a for g in linked for a in g[1]] + [advisory]))
+    return [members for _, members in groups]
+
+
+def _preferred_id(advisory_id: str) -> tuple[int, str]:
+    rank = next(
+        (i for i, prefix in enumerate(_ID_PREFERENCE) if advisory_id.startswith(prefix)),
+        len(_ID_PREFERENCE),
+    )
+    return rank, advisory_id
+
+
+def _fix_version(version: str, fixed: Iterable[str]) -> str | None:
+    """Return the lowest fixed version above `version`."""
+    try:
+        current = Version(version)
+    except InvalidVersion:
+        return None
+    candidates = []
+    for candidate in fixed:
+        try:
+            if Version(candidate) > current:
+                candidates.append(Version(candidate))
+        except InvalidVersion:
+            continue
+    return str(min(candidates)) if candidates else None
+
+
+def _merge(name: str, version: str, advisories: list[Advisory]) -> Vulnerability:
+    """Merge advisories describing the same issue into one vulnerability."""
+    ids = {key for a in advisories for key in (a.id, *a.aliases)}
+    advisory_id = min((a.id for a in advisories), key=_preferred_id)
+    return Vulnerability(
+        package=name,
+        version=version,
+        advisory_id=advisory_id,
+        severity=max((a.severity for a in advisories), key=SEVERITIES.index),
+        fix_version=_fix_version(version, (f for a in advisories for f in a.fixed)),
+        aliases=tuple(sorted(ids - {advisory_id})),
+        summary=next((a.summary for a in advisories if a.summary), ""),
+    )
@@ -0,0 +1,67 @@
+"""Per-project coverage totals from a merged coverage.py JSON report.
+
+Shards mix files from many projects, so thresholds cannot be enforced per shard.
+After the shards' data is combined, one `coverage json` report is split by the
+project owning each file and every project is held to its own threshold.
+
+Shards, the combine step and the reports each run in their own sandbox, so they
+share a generated configuration that records paths relative to the sandbox, which
+are the repository's paths.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+# Where the generated configuration is placed in every coverage sandbox
+COVERAGERC_PATH = ".baseline/coveragerc"
+
+
+def coveragerc(source_dirs: Iterable[str]) -> bytes:
+    """Return a coverage.py configuration measuring branches in `source_dirs`."""
+    lines = [
+        "[run]",
+        "branch = True",
+        "relative_files = True",
+        "source =",
+        *(f"    {directory}" for directory in source_dirs),
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+@dataclass(frozen=True)
+class CoverageTotals:
+    """Covered and coverable lines and branches, counted as coverage.py does."""
+
+    covered: int = 0
+    total: int = 0
+
+    @property
+    def percent(self) -> float | None:
+        """The covered percentage, or None if there was nothing to cover."""
+        return 100.0 * self.covered / self.total if self.total else None
+
+    def __add__(self, other: CoverageTotals) -> CoverageTotals:
+        return CoverageTotals(self.covered + other.covered, self.total + other.total)
+
+
+def coverage_by_owner(report_json: bytes, owners: Mapping[str, str]) -> dict[str, CoverageTotals]:
+    """Sum a `coverage json` report's per-file totals by the owner of each file.
+
+    Files without an owner, such as ones outside every project, are skipped.
+    """
+    files = json.loads(report_json).get("files", {})
+    totals: dict[str, CoverageTotals] = {}
+    for path, data in files.items():
+        owner = owners.get(path)
+        if owner is None:
+            continue
+        summary = data.get("summary", {})
+        file_totals = CoverageTotals(
+            covered=summary.get("covered_lines", 0) + summary.get("covered_branches", 0),
+            total=summary.get("num_statements", 0) + summary.get("num_branches", 0),
+        )
+        totals[owner] = totals.get(owner, CoverageTotals()) + file_totals
+    return totals
@@ -0,0 +1,37 @@
+"""Passing arbitrarily large file lists to tools without hitting ARG_MAX."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+# Stay well below the smallest common ARG_MAX (1 MiB on macOS, shared with the
+# environment) so that long partitions never fail with "Argument list too long".
+MAX_FILE_ARGS_BYTES = 128 * 1024
+
+
+@dataclass(frozen=True)
+class FileArgs:
+    """Command-line arguments naming the files a tool should process."""
+
+    args: tuple[str, ...]
+    by_directory: bool
+
+
+def covering_roots(files: Sequence[str]) -> tuple[str, ...]:
+    """Return the top-level directories (and top-level files) that contain `files`."""
+    return tuple(sorted({f.split("/", 1)[0] for f in files}))
+
+
+def file_args(files: Sequence[str], *, max_bytes: int = MAX_FILE_ARGS_BYTES) -> FileArgs:
+    """Return the arguments to pass for `files`.
+
+    Files are passed individually when they fit in `max_bytes` of argv. Otherwise
+    the top-level roots are passed instead and the tool discovers the files itself,
+    which is exact because every sandbox contains only the files of its partition.
+    Tools that apply default excludes during discovery must disable them when
+    `by_directory` is set.
+    """
+    if sum(len(f) + 1 for f in files) <= max_bytes:
+        return FileArgs(args=tuple(files), by_directory=False)
+    return FileArgs(args=covering_roots(files), by_directory=True)
@@ -0,0 +1,35 @@
+"""Translate `[baseline-python].exclude_patterns` into Pants ignore globs."""
+
+from __future__ import annotations
+
+import posixpath
+from typing import Iterable
+
+
+def ignore_globs(patterns: Iterable[str], spec_path: str = "") -> tuple[str, ...]:
+    """Return `!`-prefixed globs excluding `patterns` from a project in `spec_path`.
+
+    Pants applies `!` globs with .gitignore semantics while walking, so an excluded
+    directory is pruned rather than traversed and filtered. As in .gitignore, a bare
+    name such as `.venv` or `*.pyc` matches at any depth, while a pattern containing
+    `/` is anchored, here to the project directory.
+    """
+    globs = []
+    for pattern in patterns:
+        pattern = pattern.strip().removeprefix("!").rstrip("/")
+        if not pattern:
+            continue
+        if "/" in pattern:
+            pattern = posixpath.join(spec_path, pattern.lstrip("/"))
+        globs.append(f"!{pattern}")
+    return tuple(dict.fromkeys(globs))
+
+
+def unanchored_patterns(patterns: Iterable[str]) -> tuple[str, ...]:
+    """Return the patterns that match at any depth, for tools that walk on their own.
+
+    Tools run over many projects at once, so anchored patterns, which are relative
+    to each project's directory, are left to `ignore_globs` alone.
+    """
+    names = (pattern.strip().removeprefix("!").rstrip("/") for pattern in patterns)
+    return tuple(dict.fromkeys(name for name in names if name and "/" not in name))
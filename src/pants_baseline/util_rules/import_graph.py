@@ -0,0 +1,221 @@
+"""A first-party import graph for test selection and minimal test sandboxes.
+
+Each Python file is mapped to a module name relative to the source and test roots
+of its project, its `import` statements are read with an AST pass, and imports are
+resolved to the first-party files that define those modules. Third-party imports
+are dropped.
+
+Selection is conservative: a test is affected when it transitively imports a changed
+file, when it changed itself, or when a `conftest.py` above it changed. Changes the
+graph cannot trace, such as deleted modules, data files or pytest configuration,
+select every test. Sandboxes are the mirror image: a test needs what it transitively
+imports and the `conftest.py` and `__init__.py` files above it and above everything
+it imports.
+"""
+
+from __future__ import annotations
+
+import ast
+import posixpath
+from collections import deque
+from typing import Iterable, Mapping, Sequence
+
+# Files pytest reads its configuration from, in a project or any directory above it
+PYTEST_CONFIG_FILES = ("pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg")
+
+
+def project_roots(project_dirs: Iterable[str], roots: Iterable[str]) -> tuple[str, ...]:
+    """Return each of the `roots`, which are relative to a project, under each project."""
+    return tuple(
+        sorted(
+            {
+                posixpath.normpath(posixpath.join(directory, root.strip("/")))
+                for directory in project_dirs
+                for root in roots
+            }
+        )
+    )
+
+
+def module_name(path: str, roots: Sequence[str]) -> str:
+    """Return the dotted module name of `path` under the longest matching root."""
+    relative = path
+    for root in sorted((r.strip("/") for r in roots), key=len, reverse=True):
+        if not root or root == ".":
+            continue
+        if path.startswith(f"{root}/"):
+            relative = path[len(root) + 1 :]
+            break
+    parts = relative[: -len(".py")].split("/") if relative.endswith(".py") else relative.split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def imported_modules(source: bytes, module: str, is_package: bool) -> set[str]:
+    """Return every absolute module name a file may load through its imports.
+
+    `import a.b.c` loads `a`, `a.b` and `a.b.c`; `from a import b` loads `a` and, if
+    `b` is a submodule, `a.b`. Relative imports are resolved against `module`.
+    Modules named in a `pytest_plugins` assignment are loaded by pytest and count
+    too. Files that fail to parse import nothing.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package = module.split(".") if is_package else module.split(".")[:-1]
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                if node.level - 1 > len(package):
+                    continue
+                base = package[: len(package) - (node.level - 1)]
+                if node.module:
+                    base = [*base, *node.module.split(".")]
+                prefix = ".".join(base)
+            else:
+                prefix = node.module or ""
+            if prefix:
+                names.add(prefix)
+            names.update(
+                f"{prefix}.{alias.name}" if prefix else alias.name
+                for alias in node.names
+                if alias.name != "*"
+            )
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "pytest_plugins" for t in node.targets
+        ):
+            value = node.value
+            values = value.elts if isinstance(value, (ast.List, ast.Tuple)) else [value]
+            names.update(
+                v.value for v in values if isinstance(v, ast.Constant) and isinstance(v.value, str)
+            )
+
+    # Importing a submodule first imports each of its parent packages
+    loaded = set()
+    for name in names:
+        parts = name.split(".")
+        loaded.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return loaded
+
+
+def build_import_graph(
+    sources: Mapping[str, bytes], roots: Sequence[str]
+) -> dict[str, tuple[str, ...]]:
+    """Map each file in `sources` (path to content) to the first-party files it imports.
+
+    A module defined by more than one file, e.g. in two projects, resolves to all of them.
+    """
+    files_by_module: dict[str, list[str]] = {}
+    for path in sorted(sources):
+        files_by_module.setdefault(module_name(path, roots), []).append(path)
+    graph = {}
+    for path, content in sources.items():
+        modules = imported_modules(
+            content,
+            module_name(path, roots),
+            is_package=posixpath.basename(path) == "__init__.py",
+        )
+        graph[path] = tuple(
+            sorted({file for m in modules for file in files_by_module.get(m, ()) if file != path})
+        )
+    return graph
+
+
+def affected_files(
+    graph: Mapping[str, Sequence[str]], changed: Iterable[str], candidates: Iterable[str]
+) -> tuple[str, ...]:
+    """Return the `candidates` that depend on, or are, one of the `changed` files."""
+    changed_files = set(changed)
+    importers: dict[str, list[str]] = {}
+    for path, deps in graph.items():
+        for dep in deps:
+            importers.setdefault(dep, []).append(path)
+
+    reached = set(changed_files)
+    queue = deque(changed_files)
+    while queue:
+        for importer in importers.get(queue.popleft(), ()):
+            if importer not in reached:
+                reached.add(importer)
+                queue.append(importer)
+
+    conftest_dirs = [
+        posixpath.dirname(path)
+        for path in changed_files
+        if posixpath.basename(path) == "conftest.py"
+    ]
+    return tuple(
+        path
+        for path in candidates
+        if path in reached or any(not d or path.startswith(f"{d}/") for d in conftest_dirs)
+    )
+
+
+def untraced_changes(
+    changed: Iterable[str], files: Iterable[str], project_dirs: Iterable[str]
+) -> tuple[str, ...]:
+    """Return the `changed` paths that may affect the projects' tests outside the graph.
+
+    Those are paths in a project that are not among its Python `files`, such as data
+    files and deleted or moved modules, and pytest configuration files or
+    `conftest.py` files in a directory above a project.
+    """
+    known = set(files)
+    dirs = [posixpath.normpath(d) if d else "" for d in project_dirs]
+    untraced = []
+    for path in changed:
+        directory, name = posixpath.split(path)
+        in_project = any(not d or path.startswith(f"{d}/") for d in dirs)
+        above_project = name in (*PYTEST_CONFIG_FILES, "conftest.py") and any(
+            not directory or d == directory or d.startswith(f"{directory}/") for d in dirs
+        )
+        if (in_project or above_project) and path not in known:
+            untraced.append(path)
+    return tuple(untraced)
+
+
+def _package_files(path: str, files: set[str]) -> Iterable[str]:
+    """Yield the `conftest.py` and `__init__.py` files among `files` above `path`."""
+    directory = posixpath.dirname(path)
+    while True:
+        for name in ("conftest.py", "__init__.py"):
+            candidate = posixpath.join(directory, name)
+            if candidate in files:
+                yield candidate
+        if not directory:
+            return
+        directory = posixpath.dirname(directory)
+
+
+def required_files(
+    graph: Mapping[str, Sequence[str]], tests: Iterable[str], files: Iterable[str]
+) -> tuple[str, ...]:
+    """Return the `tests` and every file among `files` they need to run, sorted.
+
+    That is everything they transitively import, plus the `conftest.py` and
+    `__init__.py` files above any of those, and in turn everything those import.
+    """
+    available = set(files)
+    reached: set[str] = set()
+    queue: deque[str] = deque()
+
+    def reach(path: str) -> None:
+        if path not in reached:
+            reached.add(path)
+            queue.append(path)
+
+    for test in tests:
+        reach(test)
+    while queue:
+        path = queue.popleft()
+        for dep in graph.get(path, ()):
+            reach(dep)
+        for package_file in _package_files(path, available):
+            reach(package_file)
+    return tuple(sorted(reached))
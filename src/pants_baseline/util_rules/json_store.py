@@ -0,0 +1,55 @@
+"""JSON object stores kept in the Pants workdir between runs.
+
+Each store maps a string key, such as a test file, to a small JSON value. Stores
+are caches: a missing, unreadable or corrupt store loads as empty, and entries
+that do not match their feature's schema are dropped. Writes go to a temporary file
+that replaces the store in one step, so a concurrent reader never sees half a store.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Mapping, TypeVar
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+def load_json_store(path: Path, validate: Callable[[Any], V | None]) -> dict[str, V]:
+    """Load a store, keeping the entries for which `validate` returns a value."""
+    try:
+        data = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable store at {path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        logger.warning(f"Ignoring store at {path}: not a JSON object")
+        return {}
+    store = {}
+    for key, value in data.items():
+        entry = validate(value)
+        if entry is not None:
+            store[str(key)] = entry
+    return store
+
+
+def save_json_store(path: Path, store: Mapping[str, Any]) -> None:
+    """Atomically write a store, with its keys sorted."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(dict(sorted(store.items())), f, indent=0)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
@@ -0,0 +1,53 @@
+"""Locate lock files and read the pinned (name, version) packages out of them."""
+
+from __future__ import annotations
+
+import re
+import tomllib
+
+_PIN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*===?\s*([^\s;#\\]+)")
+
+
+class LockfileError(Exception):
+    """Raised when a lock file cannot be parsed."""
+
+
+def canonical_name(name: str) -> str:
+    """Normalize a distribution name as in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def locked_packages(path: str, content: bytes) -> tuple[tuple[str, str], ...]:
+    """Return the sorted, de-duplicated (canonical name, version) pins in a lock file.
+
+    `uv.lock` and other TOML lock files with `[[package]]` tables are read as TOML;
+    anything else is read as a pip requirements file, where only `==` pins count.
+    Packages without a version, such as editable or workspace members, are skipped.
+    """
+    text = content.decode("utf-8", errors="replace")
+    pins: set[tuple[str, str]] = set()
+    if path.endswith((".lock", ".toml")):
+        try:
+            data = tomllib.loads(text)
+        except tomllib.TOMLDecodeError as e:
+            raise LockfileError(f"Failed to parse {path}: {e}") from e
+        for package in data.get("package", []):
+            name, version = package.get("name"), package.get("version")
+            source = package.get("source", {})
+            if name and version and not {"editable", "virtual"} & source.keys():
+                pins.add((canonical_name(name), str(version)))
+    else:
+        for line in text.splitlines():
+            if match := _PIN.match(line):
+                pins.add((canonical_name(match[1]), match[2]))
+    return tuple(sorted(pins))
+
+
+def candidate_lock_files(directory: str, lock_file: str) -> tuple[str, ...]:
+    """Return where a project in `directory` may find `lock_file`, nearest first.
+
+    A project's own lock file wins; otherwise it shares one in an enclosing directory,
+    as members of a uv workspace share the workspace root's `uv.lock`.
+    """
+    parts = [p for p in directory.split("/") if p]
+    return tuple("/".join([*parts[:i], lock_file]) for i in range(len(parts), -1, -1))
@@ -0,0 +1,131 @@
+"""Bounded summaries of tool output.
+
+A noisy type check or test run can print tens of megabytes. Rules keep the full
+output as a digest in the store and retain only an `OutputSummary`: the first and
+last lines and the total line count. Tools print their totals last, so those survive
+in the tail. The process itself cuts the head, tail and line count out of each log
+with `summary_script`, so rules only ever read those parts, and what they load is
+bounded by the summary, not by the output.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(content: bytes, size: int = CHUNK_SIZE) -> Iterator[memoryview]:
+    """Yield `content` in chunks of `size` bytes without copying it."""
+    view = memoryview(content)
+    for offset in range(0, len(view), size):
+        yield view[offset : offset + size]
+
+
+def iter_lines(chunks: Iterable[bytes | memoryview]) -> Iterator[bytes]:
+    """Yield the lines of chunked output, without line endings, as they complete."""
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + bytes(chunk)).split(b"\n")
+        pending = lines.pop()
+        yield from (line.rstrip(b"\r") for line in lines)
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+@dataclass(frozen=True)
+class OutputSummary:
+    """The first and last lines of some output, and how many lines it had."""
+
+    head: tuple[str, ...] = ()
+    tail: tuple[str, ...] = ()
+    line_count: int = 0
+
+    @property
+    def omitted(self) -> int:
+        """The number of lines in neither the head nor the tail."""
+        return self.line_count - len(self.head) - len(self.tail)
+
+    def render(self, full_output: str | None = None) -> str:
+        """Render the kept lines, noting any omitted ones and where to find them."""
+        if not self.omitted:
+            return "\n".join((*self.head, *self.tail))
+        note = f"... {self.omitted} more line(s)"
+        if full_output:
+            note += f"; full output in {full_output}"
+        return "\n".join((*self.head, f"{note} ...", *self.tail))
+
+
+def summarize(chunks: Iterable[bytes | memoryview], *, max_lines: int) -> OutputSummary:
+    """Summarize chunked output, keeping at most `max_lines` lines split over head and tail.
+
+    A `max_lines` of 0 or less keeps every line.
+    """
+    head_size = max_lines - max_lines // 2 if max_lines > 0 else None
+    tail_size = max_lines // 2 if max_lines > 0 else 0
+
+    head: list[str] = []
+    tail: deque[bytes] = deque(maxlen=tail_size)
+    line_count = 0
+    for line in iter_lines(chunks):
+        line_count += 1
+        if head_size is None or len(head) < head_size:
+            head.append(line.decode(errors="replace"))
+        elif tail_size:
+            tail.append(line)
+
+    return OutputSummary(
+        head=tuple(head),
+        tail=tuple(line.decode(errors="replace") for line in tail),
+        line_count=line_count,
+    )
+
+
+def summarize_bytes(content: bytes, *, max_lines: int) -> OutputSummary:
+    """Summarize `content`, scanning it chunk by chunk."""
+    return summarize(iter_chunks(content), max_lines=max_lines)
+
+
+def summary_parts(log: str) -> tuple[str, str, str]:
+    """Return the files `summary_script` writes the head, tail and line count of `log` to."""
+    return f"{log}.head", f"{log}.tail", f"{log}.count"
+
+
+def summary_script(log: str, *, max_lines: int) -> str:
+    """Return a shell command writing the parts of `log` a summary of `max_lines` keeps.
+
+    Nothing is written for a `max_lines` of 0 or less, where the summary is the whole log.
+    """
+    if max_lines <= 0:
+        return "true"
+    head, tail, count = summary_parts(log)
+    return (
+        f"head -n {max_lines - max_lines // 2} {log} > {head}; "
+        f"tail -n {max_lines // 2} {log} > {tail}; "
+        f"awk 'END {{ print NR }}' {log} > {count}"
+    )
+
+
+def summarize_log(files: Mapping[str, bytes], log: str, *, max_lines: int) -> OutputSummary:
+    """Summarize `log` from the parts `summary_script` wrote, or from the whole log.
+
+    `files` holds the parts for a positive `max_lines` and the log itself otherwise.
+    A log that was never written has an empty summary.
+    """
+    if max_lines <= 0:
+        return summarize_bytes(files[log], max_lines=max_lines) if log in files else OutputSummary()
+    head, tail, count = (files.get(part) for part in summary_parts(log))
+    if head is None or tail is None or count is None:
+        return OutputSummary()
+    line_count = int(count.strip() or 0)
+    head_lines = list(iter_lines([head]))
+    tail_lines = list(iter_lines([tail]))
+    # The tail overlaps the head when the log is shorter than `max_lines`
+    keep = max(min(len(tail_lines), line_count - len(head_lines)), 0)
+    return OutputSummary(
+        head=tuple(line.decode(errors="replace") for line in head_lines),
+        tail=tuple(line.decode(errors="replace") for line in tail_lines[len(tail_lines) - keep :]),
+        line_count=line_count,
+    )
@@ -0,0 +1,137 @@
+"""Stable sharding of tool inputs into parallel, independently cached partitions."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import statistics
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Mapping, TypeVar
+
+_T = TypeVar("_T", bound=Hashable)
+
+# A shard should hold enough work to amortize process startup and sandbox setup.
+MIN_FILES_PER_SHARD = 50
+MIN_BYTES_PER_SHARD = 512 * 1024
+
+
+@dataclass(frozen=True)
+class ShardMetadata:
+    """Partition metadata identifying one shard of a tool run."""
+
+    index: int
+    count: int
+
+    @property
+    def description(self) -> str | None:
+        """Describe the shard for Pants' per-partition output."""
+        if self.count <= 1:
+            return None
+        return f"shard {self.index + 1}/{self.count}"
+
+
+def _stable_key(path: str) -> int:
+    """Return a 64-bit key for a path that is stable across runs and machines."""
+    return int.from_bytes(hashlib.sha256(path.encode()).digest()[:8], "big")
+
+
+def _jump_hash(key: int, buckets: int) -> int:
+    """Map a key onto one of `buckets` with Lamping & Veach's jump consistent hash.
+
+    Growing the bucket count from N to N+1 moves only ~1/(N+1) of the keys, so a
+    repo crossing a sizing threshold does not reshuffle (and invalidate) every shard.
+    """
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def compute_shard_count(
+    *,
+    file_count: int,
+    total_bytes: int,
+    parallelism: int,
+    min_files: int = MIN_FILES_PER_SHARD,
+    min_bytes: int = MIN_BYTES_PER_SHARD,
+) -> int:
+    """Return how many shards to split a run into.
+
+    A run is split when either its file count or its total size justifies more than
+    one process, but never into more shards than there are cores to run them on or
+    files to put in them.
+    """
+    wanted = max(file_count // max(min_files, 1), total_bytes // max(min_bytes, 1))
+    return max(1, min(wanted, parallelism, file_count))
+
+
+def shard_paths(paths: Iterable[str], shard_count: int) -> tuple[tuple[str, ...], ...]:
+    """Split paths into at most `shard_count` stable, sorted, non-empty shards.
+
+    Each path is assigned by a hash of the path itself, so editing a file only
+    invalidates the shard that contains it and adding a file only touches one shard.
+    """
+    shard_count = max(shard_count, 1)
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    for path in sorted(set(paths)):
+        shards[_jump_hash(_stable_key(path), shard_count)].append(path)
+    return tuple(tuple(shard) for shard in shards if shard)
+
+
+def _quantize(seconds: float) -> float:
+    """Round a duration to the nearest power of two so run-to-run noise keeps shards stable."""
+    return 2.0 ** round(math.log2(max(seconds, 0.01)))
+
+
+def balance_by_duration(
+    paths: Iterable[str],
+    durations: Mapping[str, float],
+    shard_count: int,
+) -> tuple[tuple[str, ...], ...]:
+    """Split paths into at most `shard_count` shards with roughly equal total duration.
+
+    Uses longest-processing-time-first assignment over previously recorded durations.
+    Paths without a recorded duration are assumed to take the median known duration.
+    """
+    unique = sorted(set(paths))
+    known = [durations[p] for p in unique if p in durations]
+    fallback = statistics.median(known) if known else 1.0
+    weights = {p: _quantize(durations.get(p, fallback)) for p in unique}
+
+    shard_count = max(1, min(shard_count, len(unique)))
+    shards: list[list[str]] = [[] for _ in range(shard_count)]
+    loads = [(0.0, i) for i in range(shard_count)]
+    for path in sorted(unique, key=lambda p: (-weights[p], p)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(path)
+        heapq.heappush(loads, (load + weights[path], index))
+    return tuple(tuple(sorted(shard)) for shard in shards if shard)
+
+
+def connected_components(edges: Mapping[_T, Iterable[_T]]) -> tuple[tuple[_T, ...], ...]:
+    """Group nodes into connected components of an undirected view of `edges`.
+
+    Every key of `edges` is a node; neighbours that are not keys are ignored, so a
+    dependency outside the checked set never merges two partitions. Components keep
+    the insertion order of their nodes.
+    """
+    parent: dict[_T, _T] = {node: node for node in edges}
+
+    def find(node: _T) -> _T:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for node, neighbours in edges.items():
+        for neighbour in neighbours:
+            if neighbour in parent:
+                parent[find(neighbour)] = find(node)
+
+    components: dict[_T, list[_T]] = {}
+    for node in edges:
+        components.setdefault(find(node), []).append(node)
+    return tuple(tuple(members) for members in components.values())
@@ -0,0 +1,42 @@
+"""The shell script behind the combined Ruff fix, format and lint pass.
+
+`ruff check` runs first, on the files as given, and its diagnostics and exit code
+are what lint reports. The fixes and formatting run after it. Their exit code is
+written to a file in the sandbox, so that fmt can fail on a broken format step
+without confusing that with lint findings.
+"""
+
+from __future__ import annotations
+
+import shlex
+from typing import Sequence
+
+# Where the script records the exit code of the fix and format steps
+FMT_EXIT_CODE_PATH = ".baseline/ruff-fmt-exit-code"
+
+
+def ruff_all_script(
+    check_argv: Sequence[str], fix_argv: Sequence[str] | None, format_argv: Sequence[str]
+) -> str:
+    """Return a bash script running check, then the optional fixes, then format.
+
+    Diagnostics from `check` go to stdout; the fix and format summaries go to stderr.
+    The script exits with check's status. Formatting is skipped if the fixes fail.
+    """
+    fmt = f"{shlex.join(format_argv)} 1>&2"
+    if fix_argv is not None:
+        fmt = f"{shlex.join(fix_argv)} 1>&2 && {fmt}"
+    return (
+        f"{shlex.join(check_argv)}; status=$?; "
+        f"{fmt}; fmt_status=$?; "
+        f'mkdir -p "$(dirname {FMT_EXIT_CODE_PATH})"; echo $fmt_status > {FMT_EXIT_CODE_PATH}; '
+        "exit $status"
+    )
+
+
+def parse_fmt_exit_code(content: bytes) -> int:
+    """Return the recorded fix and format exit code, treating a missing one as failed."""
+    try:
+        return int(content.strip())
+    except ValueError:
+        return 1
@@ -0,0 +1,65 @@
+"""Per-test outcomes from JUnit XML, and how often each test was flaky across runs.
+
+When a `baseline-test` shard fails, only its failing tests are rerun. A test that
+fails and then passes on a retry is flaky. Each test's runs, failures and flaky
+passes are counted in a store kept between runs, so that flaky tests can be found
+and fixed.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+from xml.etree import ElementTree
+
+_COUNTS = ("runs", "failures", "flaky")
+
+
+def _node_id(case: ElementTree.Element) -> str | None:
+    path = case.get("file")
+    if not path or not path.endswith(".py"):
+        return None
+    # A file that failed to collect has no class, and is named after its module
+    classname = case.get("classname") or ""
+    if not classname:
+        return path
+    module = path[: -len(".py")].replace("/", ".")
+    classes = classname[len(module) + 1 :].split(".") if classname != module else []
+    return "::".join((path, *classes, case.get("name", "")))
+
+
+def parse_junit_results(xml: bytes) -> dict[str, bool]:
+    """Return whether each test in a JUnit XML report passed, by pytest node ID.
+
+    Expects pytest's `xunit1` family, which records the test file on each testcase.
+    Skipped tests count as passed. A file that failed to collect is reported under
+    its path, which is also the node ID that reruns it.
+    """
+    results: dict[str, bool] = {}
+    for case in ElementTree.fromstring(xml).iter("testcase"):
+        node = _node_id(case)
+        if node is None:
+            continue
+        # A test erroring in teardown gets a second testcase with the same name
+        passed = case.find("failure") is None and case.find("error") is None
+        results[node] = results.get(node, True) and passed
+    return results
+
+
+def record_attempts(
+    store: dict[str, dict[str, int]], attempts: Mapping[str, Sequence[bool]]
+) -> None:
+    """Count one run of each test, given whether each of its attempts passed."""
+    for node, passes in attempts.items():
+        entry = store.setdefault(node, dict.fromkeys(_COUNTS, 0))
+        entry["runs"] += 1
+        if passes and not passes[0]:
+            entry["failures"] += 1
+            if passes[-1]:
+                entry["flaky"] += 1
+
+
+def flakiness_entry(value: Any) -> dict[str, int] | None:
+    """Return a test's stored counts, or None if they are malformed."""
+    if isinstance(value, dict) and all(isinstance(value.get(count), int) for count in _COUNTS):
+        return {count: value[count] for count in _COUNTS}
+    return None
@@ -0,0 +1,124 @@
+"""Test file outcomes recorded by the `baseline_outcomes` pytest plugin, kept between runs.
+
+A test file that passed is stored with the files it needed (what it imported at
+run time, plus the `conftest.py`, `__init__.py` and pytest configuration files above
+them) and a key hashing their content. While the key is unchanged the file would run
+against identical first-party code, so it is reported as a cached pass instead of run.
+Failures are never cached.
+
+The files above a test are looked up again on every check, so one added since the
+pass was recorded changes the key as surely as an edited one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import posixpath
+from typing import Any, Iterable, Mapping
+
+from pants_baseline.util_rules.import_graph import PYTEST_CONFIG_FILES
+
+# Bump when the key or store layout changes so old entries are not trusted
+OUTCOMES_SCHEMA = 2
+
+# Where the plugin writes its report; the plugin cannot import this module, so it
+# repeats the name
+OUTCOMES_ENV = "BASELINE_OUTCOMES_FILE"
+
+
+def config_globs(project_dirs: Iterable[str]) -> tuple[str, ...]:
+    """Return globs for the pytest configuration files in or above the projects."""
+    globs = set()
+    for project_dir in project_dirs:
+        directory = posixpath.normpath(project_dir) if project_dir else ""
+        globs.update(posixpath.join(directory, "**", name) for name in PYTEST_CONFIG_FILES)
+        while directory:
+            directory = posixpath.dirname(directory)
+            globs.update(posixpath.join(directory, name) for name in PYTEST_CONFIG_FILES)
+    return tuple(sorted(globs))
+
+
+def _needed_files(files: Iterable[str], available: Mapping[str, str]) -> list[str]:
+    """Return `files` with the conftest, package and pytest config files above them."""
+    needed = set(files)
+    for path in list(needed):
+        directory = posixpath.dirname(path)
+        while True:
+            for name in ("conftest.py", "__init__.py", *PYTEST_CONFIG_FILES):
+                candidate = posixpath.join(directory, name)
+                if candidate in available:
+                    needed.add(candidate)
+            if not directory:
+                break
+            directory = posixpath.dirname(directory)
+    return sorted(needed)
+
+
+def outcome_key(files: Iterable[str], fingerprints: Mapping[str, str], salt: str) -> str | None:
+    """Hash the content of `files` with `salt`, or None if any of them no longer exists."""
+    digest = hashlib.sha256(f"{OUTCOMES_SCHEMA}\0{salt}".encode())
+    for path in sorted(set(files)):
+        fingerprint = fingerprints.get(path)
+        if fingerprint is None:
+            return None
+        digest.update(f"\0{path}\0{fingerprint}".encode())
+    return digest.hexdigest()
+
+
+def parse_outcomes(report: bytes) -> dict[str, tuple[bool, tuple[str, ...]]]:
+    """Return each test file's (passed, imported files) from a plugin report."""
+    data = json.loads(report)
+    return {
+        str(path): (bool(entry.get("passed")), tuple(str(p) for p in entry.get("imports", ())))
+        for path, entry in data.items()
+    }
+
+
+def cached_passes(
+    store: Mapping[str, Mapping[str, Any]],
+    fingerprints: Mapping[str, str],
+    salt: str,
+    candidates: Iterable[str],
+) -> tuple[str, ...]:
+    """Return the `candidates` that passed last time with the same inputs."""
+    cached = []
+    for path in candidates:
+        entry = store.get(path)
+        if not entry:
+            continue
+        needed = _needed_files(entry["files"], fingerprints)
+        if outcome_key(needed, fingerprints, salt) == entry["key"]:
+            cached.append(path)
+    return tuple(cached)
+
+
+def record_outcomes(
+    store: dict[str, dict[str, Any]],
+    outcomes: Mapping[str, tuple[bool, Iterable[str]]],
+    fingerprints: Mapping[str, str],
+    salt: str,
+) -> None:
+    """Store the passes in `outcomes` under their current key and forget the failures.
+
+    `fingerprints` must cover every file that could sit above a test, including the
+    pytest configuration files matched by `config_globs`.
+    """
+    for path, (passed, files) in outcomes.items():
+        needed = _needed_files({path, *files}, fingerprints)
+        key = outcome_key(needed, fingerprints, salt) if passed else None
+        if key is None:
+            store.pop(path, None)
+        else:
+            store[path] = {"key": key, "files": needed}
+
+
+def outcome_entry(value: Any) -> dict[str, Any] | None:
+    """Return a stored pass, or None if it is malformed."""
+    if (
+        isinstance(value, dict)
+        and isinstance(value.get("key"), str)
+        and isinstance(value.get("files"), list)
+    ):
+        return value
+    return None
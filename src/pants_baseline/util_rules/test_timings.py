@@ -0,0 +1,27 @@
+"""Per-file test durations recorded from JUnit XML and kept in a JSON store between runs."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any
+from xml.etree import ElementTree
+
+
+def parse_junit_durations(xml: bytes) -> dict[str, float]:
+    """Return the total duration of each test file in a JUnit XML report.
+
+    Expects pytest's `xunit1` family, which records the test file on each testcase.
+    """
+    durations: dict[str, float] = defaultdict(float)
+    for case in ElementTree.fromstring(xml).iter("testcase"):
+        path = case.get("file")
+        if path:
+            durations[path] += float(case.get("time") or 0.0)
+    return dict(durations)
+
+
+def timing_entry(value: Any) -> float | None:
+    """Return a stored duration, or None if it is malformed."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
@@ -0,0 +1,133 @@
+"""Render canonical Ruff and ty configuration files from the plugin's options.
+
+Several options only exist as configuration file settings, so the rules write one
+small TOML file per configuration into each sandbox instead of passing flags. The
+rendering is canonical: keys are sorted and unordered settings such as rule
+selections are sorted and de-duplicated, so equivalent options always produce the
+same bytes, the same digest and therefore the same process cache key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Iterable, Mapping
+
+RUFF_CONFIG_PATH = ".baseline/ruff.toml"
+
+# ty reads `ty.toml` from the project root, which is the sandbox root
+TY_CONFIG_PATH = "ty.toml"
+
+
+def _unordered(values: Iterable[str]) -> list[str]:
+    return sorted({v.strip() for v in values if v.strip()})
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, str):
+        # JSON string escapes are valid TOML basic strings
+        return json.dumps(value)
+    if isinstance(value, (list, tuple)):
+        return f"[{', '.join(_toml_value(v) for v in value)}]"
+    raise TypeError(f"Cannot render {value!r} as TOML")
+
+
+def render_toml(data: Mapping[str, Any]) -> str:
+    """Render nested mappings of strings, ints, bools and lists as TOML, keys sorted."""
+    lines: list[str] = []
+
+    def table(path: tuple[str, ...], values: Mapping[str, Any]) -> None:
+        scalars = {k: v for k, v in values.items() if not isinstance(v, Mapping)}
+        tables = {k: v for k, v in values.items() if isinstance(v, Mapping)}
+        if path and scalars:
+            lines.append(f"[{'.'.join(_toml_key(p) for p in path)}]")
+        lines.extend(f"{_toml_key(k)} = {_toml_value(scalars[k])}" for k in sorted(scalars))
+        if scalars:
+            lines.append("")
+        for key in sorted(tables):
+            table((*path, key), tables[key])
+
+    table((), data)
+    return "\n".join(lines).rstrip("\n") + "\n"
+
+
+def _toml_key(key: str) -> str:
+    if key and all(c.isalnum() or c in "-_" for c in key):
+        return key
+    return json.dumps(key)
+
+
+def ruff_config(
+    *,
+    python_version: str,
+    line_length: int,
+    select: Iterable[str],
+    ignore: Iterable[str],
+    quote_style: str,
+    indent_style: str,
+    test_roots: Iterable[str],
+    skip_tests_rules: Iterable[str],
+    skip_init_rules: Iterable[str],
+    exclude: Iterable[str],
+) -> str:
+    """Return the canonical `ruff.toml` for one set of options.
+
+    Ruff's default excludes are replaced by `exclude`, which is enforced even for
+    files passed on the command line. Test and `__init__.py` rule exemptions become
+    per-file ignores that match at any depth, since one batch may span projects.
+    """
+    per_file_ignores: dict[str, list[str]] = {}
+    tests_rules = _unordered(skip_tests_rules)
+    if tests_rules:
+        for root in _unordered(r.strip("/") for r in test_roots):
+            per_file_ignores[f"**/{root}/**"] = tests_rules
+    init_rules = _unordered(skip_init_rules)
+    if init_rules:
+        per_file_ignores["**/__init__.py"] = init_rules
+
+    return render_toml(
+        {
+            "target-version": f"py{python_version.replace('.', '')}",
+            "line-length": line_length,
+            "exclude": [],
+            "extend-exclude": _unordered(exclude),
+            "force-exclude": True,
+            "lint": {
+                "select": _unordered(select),
+                "ignore": _unordered(ignore),
+                "per-file-ignores": per_file_ignores,
+            },
+            "format": {
+                "quote-style": quote_style,
+                "indent-style": indent_style,
+            },
+        }
+    )
+
+
+def ty_config(
+    *,
+    python_version: str,
+    extra_paths: Iterable[str],
+    report_missing_imports: bool,
+) -> str:
+    """Return the canonical `ty.toml` for one set of options."""
+    environment: dict[str, Any] = {"python-version": python_version}
+    paths = _unordered(extra_paths)
+    if paths:
+        environment["extra-paths"] = paths
+    return render_toml(
+        {
+            "environment": environment,
+            "rules": {"unresolved-import": "error" if report_missing_imports else "ignore"},
+        }
+    )
+
+
+def fingerprint(content: str) -> str:
+    """Return a short, stable key for a configuration file's content."""
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
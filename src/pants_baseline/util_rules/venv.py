@@ -0,0 +1,81 @@
+"""Build the requirements, cache key and bootstrap script of the cached pytest venv.
+
+Tests run in a virtualenv that uv builds once per distinct set of requirements and
+keeps in a Pants named cache. Each test process only checks that the venv exists,
+so after the first run a shard costs a directory lookup instead of an install.
+Venvs are built under a temporary name and renamed into place, so concurrent
+shards racing to build the same venv never see a half-installed one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import shlex
+from typing import Iterable
+
+from packaging.requirements import InvalidRequirement, Requirement
+
+from pants_baseline.util_rules.lockfile import canonical_name
+
+# Bump when the venv layout or bootstrap changes so stale venvs are rebuilt
+VENV_SCHEMA = 1
+
+VENV_CACHE_NAME = "baseline_pytest"
+VENV_CACHE_PATH = ".cache/baseline_pytest"
+REQUIREMENTS_PATH = ".baseline/pytest-requirements.txt"
+
+
+def venv_requirements(tool_requirements: Iterable[str], pins: Iterable[tuple[str, str]]) -> str:
+    """Return a canonical requirements file of the lock file pins plus the tool requirements.
+
+    Pinned versions win: a tool requirement for a package the lock file pins is
+    dropped, so tests run against the versions the project locked.
+    """
+    pinned = {canonical_name(name): version for name, version in pins}
+    lines = {f"{name}=={version}" for name, version in pinned.items()}
+    for requirement in tool_requirements:
+        requirement = requirement.strip()
+        if not requirement:
+            continue
+        try:
+            name = canonical_name(Requirement(requirement).name)
+        except InvalidRequirement as e:
+            raise ValueError(f"Invalid pytest requirement {requirement!r}: {e}") from None
+        if name not in pinned:
+            lines.add(requirement)
+    return "".join(f"{line}\n" for line in sorted(lines))
+
+
+def venv_key(requirements: str, python_version: str, uv_version: str) -> str:
+    """Return the name of the venv for these requirements, interpreter and uv version."""
+    content = f"{VENV_SCHEMA}\n{python_version}\n{uv_version}\n{requirements}"
+    return f"py{python_version}-{hashlib.sha256(content.encode()).hexdigest()[:16]}"
+
+
+def bootstrap_script(uv_exe: str, key: str, python_version: str) -> str:
+    """Return a shell script that builds the venv if missing and runs `python -m "$@"` in it.
+
+    The interpreter is uv-managed rather than taken from the host, and paths are
+    resolved through the cache's symlink, since a venv's interpreter link must
+    outlive the sandbox it was created in.
+    """
+    uv = shlex.quote(uv_exe)
+    return "\n".join(
+        [
+            "set -eu",
+            f'uv="$(pwd -P)/"{uv}',
+            f'cache="$(cd {VENV_CACHE_PATH} && pwd -P)"',
+            f'venv="$cache/venvs/{key}"',
+            'if [ ! -x "$venv/bin/python" ]; then',
+            '  export UV_NO_CONFIG=1 UV_CACHE_DIR="$cache/uv"',
+            '  export UV_PYTHON_INSTALL_DIR="$cache/python"',
+            f'  tmp="$cache/venvs/.{key}.$$"',
+            '  rm -rf "$tmp" && mkdir -p "$cache/venvs"',
+            f'  "$uv" venv --quiet --python {shlex.quote(python_version)} '
+            '--python-preference only-managed "$tmp"',
+            f'  "$uv" pip install --quiet --python "$tmp/bin/python" -r {REQUIREMENTS_PATH}',
+            '  if [ -d "$venv" ]; then rm -rf "$tmp"; else mv "$tmp" "$venv"; fi',
+            "fi",
+            'exec "$venv/bin/python" -m "$@"',
+        ]
+    )
@@ -0,0 +1,117 @@
+"""Integration tests for auditing lock files against an advisory snapshot."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from pants.engine.internals.scheduler import ExecutionError
+from pants.engine.rules import QueryRule
+from pants.testutil.rule_runner import RuleRunner
+
+from pants_baseline.register import rules, target_types
+from pants_baseline.rules.audit_rules import (
+    AdvisorySnapshot,
+    AdvisorySnapshotRequest,
+    AuditResult,
+    UvAuditRequest,
+)
+
+RECORD = {
+    "id": "GHSA-j8r2-6x86-q33q",
+    "aliases": ["CVE-2023-32681"],
+    "database_specific": {"severity": "moderate"},
+    "affected": [
+        {
+            "package": {"ecosystem": "PyPI", "name": "requests"},
+            "ranges": [
+                {"type": "ECOSYSTEM", "events": [{"introduced": "2.3.0"}, {"fixed": "2.31.0"}]}
+            ],
+        }
+    ],
+}
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    """Create a RuleRunner that can request the audit of one lock file."""
+    rule_runner = RuleRunner(
+        rules=[
+            *rules(),
+            QueryRule(AdvisorySnapshot, [AdvisorySnapshotRequest]),
+            QueryRule(AuditResult, [UvAuditRequest]),
+        ],
+        target_types=target_types(),
+    )
+    rule_runner.set_options([], env_inherit={"PATH", "HOME"})
+    return rule_runner
+
+
+@pytest.fixture
+def snapshot(rule_runner: RuleRunner) -> AdvisorySnapshot:
+    """Fetch a one-advisory OSV directory from the repository."""
+    rule_runner.write_files({f"3rdparty/osv/{RECORD['id']}.json": json.dumps(RECORD)})
+    return rule_runner.request(
+        AdvisorySnapshot, [AdvisorySnapshotRequest(url="3rdparty/osv", day="2024-05-01")]
+    )
+
+
+def audit(rule_runner: RuleRunner, snapshot: AdvisorySnapshot) -> AuditResult:
+    """Audit the root `uv.lock`."""
+    request = UvAuditRequest(
+        lock_file="uv.lock", ignore_vulns=(), min_severity="unknown", snapshot=snapshot
+    )
+    return rule_runner.request(AuditResult, [request])
+
+
+def test_vulnerable_pin_fails(rule_runner: RuleRunner, snapshot: AdvisorySnapshot) -> None:
+    """Test that a vulnerable pin is reported and fails the audit."""
+    rule_runner.write_files(
+        {
+            "uv.lock": (
+                '[[package]]\nname = "requests"\nversion = "2.30.0"\n\n'
+                '[[package]]\nname = "six"\nversion = "1.16.0"\n'
+            )
+        }
+    )
+    result = audit(rule_runner, snapshot)
+    assert result.exit_code == 1
+    assert result.packages_audited == 2
+    assert [(v.package, v.advisory_id, v.fix_version) for v in result.vulnerabilities] == [
+        ("requests", "GHSA-j8r2-6x86-q33q", "2.31.0")
+    ]
+
+
+def test_unparseable_lock_file_fails(rule_runner: RuleRunner, snapshot: AdvisorySnapshot) -> None:
+    """Test that a broken lock file fails the audit with the parse error."""
+    rule_runner.write_files({"uv.lock": "[[package]\n"})
+    result = audit(rule_runner, snapshot)
+    assert result.exit_code == 1
+    assert result.vulnerabilities == ()
+    assert "Failed to parse uv.lock" in result.stderr
+
+
+def test_download_falls_back_to_an_earlier_day(rule_runner: RuleRunner, tmp_path: Path) -> None:
+    """Test that a failed download uses an earlier day's cached download."""
+    source = tmp_path / "osv.json"
+    source.write_text(json.dumps(RECORD))
+    first = rule_runner.request(
+        AdvisorySnapshot, [AdvisorySnapshotRequest(url=source.as_uri(), day="2024-05-01")]
+    )
+    assert first.fetched == "2024-05-01"
+
+    source.unlink()
+    second = rule_runner.request(
+        AdvisorySnapshot, [AdvisorySnapshotRequest(url=source.as_uri(), day="2024-05-02")]
+    )
+    assert second == first
+
+
+def test_failed_download_without_fallback_raises(rule_runner: RuleRunner, tmp_path: Path) -> None:
+    """Test that a download failing on every day raises."""
+    missing = tmp_path / "missing.zip"
+    with pytest.raises(ExecutionError, match="Failed to fetch advisories"):
+        rule_runner.request(
+            AdvisorySnapshot, [AdvisorySnapshotRequest(url=str(missing), day="2024-05-01")]
+        )
@@ -0,0 +1,65 @@
+"""Integration tests for the combined Ruff pass, running the real Ruff binary."""
+
+from __future__ import annotations
+
+import pytest
+from pants.core.goals.fmt import FmtResult
+from pants.engine.fs import Digest, DigestContents
+from pants.engine.internals.scheduler import ExecutionError
+from pants.engine.rules import QueryRule
+from pants.testutil.rule_runner import RuleRunner
+
+from pants_baseline.register import rules, target_types
+from pants_baseline.rules.fmt_rules import RuffFmtRequest
+from pants_baseline.rules.ruff_rules import (
+    RuffAllRequest,
+    RuffAllResult,
+    RuffBatchMetadata,
+    RuffSettings,
+)
+from pants_baseline.util_rules.partitions import ShardMetadata
+
+SETTINGS = RuffSettings(python_version="3.11", line_length=100)
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    """Create a RuleRunner that can request the combined Ruff pass directly."""
+    rule_runner = RuleRunner(
+        rules=[
+            *rules(),
+            QueryRule(RuffAllResult, [RuffAllRequest]),
+            QueryRule(FmtResult, [RuffFmtRequest.Batch]),
+            QueryRule(DigestContents, [Digest]),
+        ],
+        target_types=target_types(),
+    )
+    rule_runner.set_options(["--baseline-ruff-combined"], env_inherit={"PATH", "HOME"})
+    return rule_runner
+
+
+def test_reports_unfixed_diagnostics_and_formats(rule_runner: RuleRunner) -> None:
+    """Test that lint sees the files as given while the output is fixed and formatted."""
+    snapshot = rule_runner.make_snapshot({"src/app.py": "import os\nx=1\n"})
+    result = rule_runner.request(RuffAllResult, [RuffAllRequest(snapshot, SETTINGS)])
+    assert result.exit_code == 1
+    assert "F401" in result.stdout
+    assert result.fmt_exit_code == 0
+    contents = rule_runner.request(DigestContents, [result.output.digest])
+    assert {fc.path: fc.content for fc in contents} == {"src/app.py": b"x = 1\n"}
+
+
+def test_failing_format_fails_fmt(rule_runner: RuleRunner) -> None:
+    """Test that a format step that fails is an error for fmt, not an unchanged file."""
+    snapshot = rule_runner.make_snapshot({"src/bad.py": "def f(:\n"})
+    result = rule_runner.request(RuffAllResult, [RuffAllRequest(snapshot, SETTINGS)])
+    assert result.fmt_exit_code != 0
+
+    batch = RuffFmtRequest.Batch(
+        RuffFmtRequest.tool_name,
+        snapshot.files,
+        RuffBatchMetadata(SETTINGS, ShardMetadata(index=0, count=1)),
+        snapshot,
+    )
+    with pytest.raises(ExecutionError, match="Ruff fix and format failed"):
+        rule_runner.request(FmtResult, [batch])
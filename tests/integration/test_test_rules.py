@@ -0,0 +1,130 @@
+"""Integration tests for pytest shards and their coverage merge, in the baseline venv."""
+
+from __future__ import annotations
+
+import pytest
+from pants.engine.fs import Snapshot
+from pants.engine.rules import QueryRule
+from pants.testutil.rule_runner import RuleRunner
+from pants.util.frozendict import FrozenDict
+
+from pants_baseline.register import rules, target_types
+from pants_baseline.rules.test_rules import (
+    CoverageMergeRequest,
+    CoverageReport,
+    PytestShardRequest,
+    PytestShardResult,
+)
+from pants_baseline.rules.venv_rules import PytestVenv, PytestVenvRequest
+
+# The marker is only declared in the project's configuration, which --strict-markers
+# enforces, the tests import from the project's source root, and test_sub fails
+PROJECT = {
+    "proj/pyproject.toml": '[tool.pytest.ini_options]\nmarkers = ["slow: slow tests"]\n',
+    "proj/src/calc.py": "def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n",
+    "proj/tests/test_add.py": (
+        "import pytest\nfrom calc import add\n\n\n"
+        "@pytest.mark.slow\ndef test_add():\n    assert add(1, 2) == 3\n"
+    ),
+    "proj/tests/test_sub.py": (
+        "from calc import sub\n\n\ndef test_sub():\n    assert sub(3, 2) == 2\n"
+    ),
+}
+
+
+@pytest.fixture
+def rule_runner() -> RuleRunner:
+    """Create a RuleRunner that can request pytest shards directly."""
+    rule_runner = RuleRunner(
+        rules=[
+            *rules(),
+            QueryRule(PytestVenv, [PytestVenvRequest]),
+            QueryRule(PytestShardResult, [PytestShardRequest]),
+            QueryRule(CoverageReport, [CoverageMergeRequest]),
+        ],
+        target_types=target_types(),
+    )
+    rule_runner.set_options([], env_inherit={"PATH", "HOME"})
+    rule_runner.write_files(PROJECT)
+    return rule_runner
+
+
+@pytest.fixture
+def sources(rule_runner: RuleRunner) -> Snapshot:
+    """Snapshot the project's sources and tests, without its configuration."""
+    return rule_runner.make_snapshot(
+        {path: content for path, content in PROJECT.items() if path.endswith(".py")}
+    )
+
+
+@pytest.fixture
+def venv(rule_runner: RuleRunner) -> PytestVenv:
+    """Resolve the project's pytest venv."""
+    return rule_runner.request(
+        PytestVenv, [PytestVenvRequest(project_dirs=("proj",), python_version="3.11")]
+    )
+
+
+def run_shard(
+    rule_runner: RuleRunner,
+    sources: Snapshot,
+    venv: PytestVenv,
+    test_files: tuple[str, ...],
+    index: int = 0,
+    count: int = 1,
+) -> PytestShardResult:
+    """Run one shard holding all of the project's files."""
+    request = PytestShardRequest(
+        test_files=test_files,
+        index=index,
+        count=count,
+        input_files=sources.files,
+        digest=sources.digest,
+        venv=venv,
+        project_dirs=("proj",),
+    )
+    return rule_runner.request(PytestShardResult, [request])
+
+
+def test_shard_runs_with_project_roots_and_config(
+    rule_runner: RuleRunner, sources: Snapshot, venv: PytestVenv
+) -> None:
+    """Test that a shard imports from the source root and applies the project's config."""
+    result = run_shard(rule_runner, sources, venv, ("proj/tests/test_add.py",))
+    assert result.exit_code == 0, result.output.stdout.render()
+    assert dict(result.tests) == {"proj/tests/test_add.py::test_add": True}
+    assert set(result.durations) == {"proj/tests/test_add.py"}
+
+
+def test_failing_test_is_reported(
+    rule_runner: RuleRunner, sources: Snapshot, venv: PytestVenv
+) -> None:
+    """Test that a failing test fails the shard and is named for a retry."""
+    result = run_shard(rule_runner, sources, venv, ("proj/tests/test_sub.py",))
+    assert result.exit_code == 1
+    assert result.failed_tests == ("proj/tests/test_sub.py::test_sub",)
+
+
+def test_merge_combines_shards_per_project(
+    rule_runner: RuleRunner, sources: Snapshot, venv: PytestVenv
+) -> None:
+    """Test that two shards' data merges, and a project without data fails its threshold."""
+    shards = [
+        run_shard(rule_runner, sources, venv, (test_file,), index=i, count=2)
+        for i, test_file in enumerate(("proj/tests/test_add.py", "proj/tests/test_sub.py"))
+    ]
+    request = CoverageMergeRequest(
+        coverage_data=tuple(shard.coverage_data for shard in shards),
+        sources=rule_runner.make_snapshot({"proj/src/calc.py": PROJECT["proj/src/calc.py"]}).digest,
+        venv=venv,
+        project_dirs=("proj",),
+        owners=FrozenDict({"proj/src/calc.py": "proj:proj"}),
+        thresholds=FrozenDict({"proj:proj": 100, "empty:empty": 50}),
+    )
+    report = rule_runner.request(CoverageReport, [request])
+    assert "proj/src/calc.py" in report.report
+    assert [(p.project, p.percent, p.passed) for p in report.projects] == [
+        ("empty:empty", None, False),
+        ("proj:proj", 100.0, True),
+    ]
+    assert report.exit_code == 2
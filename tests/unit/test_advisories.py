@@ -0,0 +1,197 @@
+"""Unit tests for the advisory snapshot and matcher."""
+
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+
+import pytest
+
+from pants_baseline.util_rules.advisories import (
+    AdvisoryDatabase,
+    AdvisoryDatabaseError,
+    Vulnerability,
+    cvss3_base_score,
+    download_url,
+    earlier_days,
+    filter_vulnerabilities,
+    parse_osv_record,
+    severity_label,
+)
+
+RECORDS = [
+    {
+        "id": "PYSEC-2023-74",
+        "aliases": ["CVE-2023-32681", "GHSA-j8r2-6x86-q33q"],
+        "summary": "Requests leaks Proxy-Authorization headers",
+        "affected": [
+            {
+                "package": {"ecosystem": "PyPI", "name": "requests"},
+                "ranges": [
+                    {"type": "ECOSYSTEM", "events": [{"introduced": "2.3.0"}, {"fixed": "2.31.0"}]}
+                ],
+                "versions": ["2.30.0"],
+            }
+        ],
+    },
+    {
+        "id": "GHSA-xxxx-yyyy-zzzz",
+        "database_specific": {"severity": "high"},
+        "affected": [
+            {
+                "package": {"ecosystem": "PyPI", "name": "Jinja2"},
+                "ranges": [
+                    {
+                        "type": "ECOSYSTEM",
+                        "events": [{"introduced": "0"}, {"last_affected": "3.1.2"}],
+                    },
+                    {"type": "GIT", "events": [{"introduced": "abc"}]},
+                ],
+            },
+            {"package": {"ecosystem": "npm", "name": "jinja2"}},
+        ],
+    },
+    {"id": "PYSEC-0000-1", "withdrawn": "2024-01-01T00:00:00Z", "affected": []},
+    {
+        "id": "GHSA-j8r2-6x86-q33q",
+        "aliases": ["CVE-2023-32681"],
+        "summary": "Unintended leak of Proxy-Authorization header in requests",
+        "severity": [{"type": "CVSS_V3", "score": "CVSS:3.1/AV:N/AC:H/PR:N/UI:R/S:C/C:H/I:N/A:N"}],
+        "affected": [
+            {
+                "package": {"ecosystem": "PyPI", "name": "requests"},
+                "ranges": [
+                    {"type": "ECOSYSTEM", "events": [{"introduced": "2.3.0"}, {"fixed": "2.31.0"}]}
+                ],
+            }
+        ],
+    },
+]
+
+
+@pytest.fixture
+def database() -> AdvisoryDatabase:
+    """Index an OSV-style zip export."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for record in RECORDS:
+            archive.writestr(f"{record['id']}.json", json.dumps(record))
+    return AdvisoryDatabase.from_osv([("all.zip", buffer.getvalue())])
+
+
+class TestParseOsvRecord:
+    """Tests for parse_osv_record."""
+
+    def test_ranges_and_fixed_versions(self) -> None:
+        """Test that ECOSYSTEM ranges are kept and fixed versions collected."""
+        [(name, advisory)] = parse_osv_record(RECORDS[0])
+        assert name == "requests"
+        assert advisory.ranges == (("2.3.0", "2.31.0", None),)
+        assert advisory.fixed == ("2.31.0",)
+        assert advisory.affects("2.30.0")
+        assert advisory.affects("2.4.1")
+        assert not advisory.affects("2.31.0")
+        assert not advisory.affects("2.2.0")
+
+    def test_last_affected_and_other_ecosystems(self) -> None:
+        """Test last_affected bounds and that non-PyPI packages and GIT ranges are ignored."""
+        [(name, advisory)] = parse_osv_record(RECORDS[1])
+        assert name == "jinja2"
+        assert advisory.severity == "high"
+        assert advisory.affects("3.1.2")
+        assert not advisory.affects("3.1.3")
+
+    def test_withdrawn(self) -> None:
+        """Test that withdrawn advisories are dropped."""
+        assert list(parse_osv_record(RECORDS[2])) == []
+
+
+class TestAdvisoryDatabase:
+    """Tests for reading OSV exports into an AdvisoryDatabase."""
+
+    def test_match_from_zip(self, database: AdvisoryDatabase) -> None:
+        """Test matching against a zip export."""
+        assert [a.id for a in database.advisories_for("Requests", "2.30.0")] == [
+            "PYSEC-2023-74",
+            "GHSA-j8r2-6x86-q33q",
+        ]
+        assert database.advisories_for("jinja2", "3.2.0") == ()
+        assert database.advisories_for("six", "1.0") == ()
+
+    def test_ignore_by_alias(self, database: AdvisoryDatabase) -> None:
+        """Test that advisories can be ignored by any of their aliases."""
+        vulnerabilities = database.package_vulnerabilities("requests", "2.30.0")
+        assert filter_vulnerabilities(vulnerabilities, ignore=["CVE-2023-32681"]) == ()
+
+    def test_json_records_and_lists(self) -> None:
+        """Test that single records and lists of records read like a zip export."""
+        database = AdvisoryDatabase.from_osv(
+            [
+                ("osv/a.json", json.dumps(RECORDS[0]).encode()),
+                ("osv/b.json", json.dumps(RECORDS[1:]).encode()),
+            ]
+        )
+        assert len(database) == 3
+
+    def test_unreadable_export_raises(self) -> None:
+        """Test that an export that is neither a zip nor JSON raises."""
+        with pytest.raises(AdvisoryDatabaseError, match="osv-export"):
+            AdvisoryDatabase.from_osv([("osv-export", b"<html>Not Found</html>")])
+
+    def test_download_url(self) -> None:
+        """Test that only paths in the repository are read without a download."""
+        assert download_url("https://example.com/all.zip") == "https://example.com/all.zip"
+        assert download_url("file:///data/all.zip") == "file:///data/all.zip"
+        assert download_url("/data/all.zip") == "file:///data/all.zip"
+        assert download_url("3rdparty/osv") is None
+
+    def test_earlier_days(self) -> None:
+        """Test that fallback days count back across month ends."""
+        assert earlier_days("2024-03-02", 3) == ("2024-03-01", "2024-02-29", "2024-02-28")
+
+
+class TestVulnerabilities:
+    """Tests for severities, merged vulnerabilities and their filtering."""
+
+    def test_cvss3_base_score(self) -> None:
+        """Test base scores against published CVSS v3.1 examples."""
+        assert cvss3_base_score("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H") == 9.8
+        assert cvss3_base_score("CVSS:3.1/AV:N/AC:H/PR:N/UI:R/S:C/C:H/I:N/A:N") == 6.1
+        assert cvss3_base_score("CVSS:3.0/AV:L/AC:L/PR:L/UI:N/S:U/C:N/I:N/A:N") == 0.0
+        assert cvss3_base_score("CVSS:4.0/AV:N/AC:L") is None
+
+    def test_severity_label(self) -> None:
+        """Test that labels and vectors normalize to the same scale."""
+        assert severity_label("MODERATE") == "medium"
+        assert severity_label("Critical") == "critical"
+        assert severity_label("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H") == "critical"
+        assert severity_label("bogus") == "unknown"
+
+    def test_aliases_are_reported_once(self, database: AdvisoryDatabase) -> None:
+        """Test that mirrored advisories merge into one vulnerability with the best ID."""
+        assert database.package_vulnerabilities("requests", "2.30.0") == (
+            Vulnerability(
+                package="requests",
+                version="2.30.0",
+                advisory_id="GHSA-j8r2-6x86-q33q",
+                severity="medium",
+                fix_version="2.31.0",
+                aliases=("CVE-2023-32681", "PYSEC-2023-74"),
+                summary="Requests leaks Proxy-Authorization headers",
+            ),
+        )
+
+    def test_min_severity(self, database: AdvisoryDatabase) -> None:
+        """Test that vulnerabilities below the minimum severity are dropped."""
+        vulnerabilities = [
+            *database.package_vulnerabilities("requests", "2.30.0"),
+            *database.package_vulnerabilities("jinja2", "3.0.0"),
+        ]
+        assert [v.package for v in filter_vulnerabilities(vulnerabilities)] == [
+            "jinja2",
+            "requests",
+        ]
+        assert [
+            v.package for v in filter_vulnerabilities(vulnerabilities, min_severity="high")
+        ] == ["jinja2"]
@@ -0,0 +1,105 @@
+"""Unit tests for per-project coverage totals."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pants_baseline.util_rules.coverage import (
+    COVERAGERC_PATH,
+    CoverageTotals,
+    coverage_by_owner,
+    coveragerc,
+)
+
+MODULE = "app/src/pkg/mod.py"
+MODULE_SOURCE = "def first():\n    return 1\n\n\ndef second():\n    return 2\n"
+
+
+def _report(**files: tuple[int, int, int, int]) -> bytes:
+    """Build a `coverage json` report from (lines, covered, branches, covered) per file."""
+    return json.dumps(
+        {
+            "files": {
+                path.replace("__", "/"): {
+                    "summary": {
+                        "num_statements": lines,
+                        "covered_lines": covered_lines,
+                        "num_branches": branches,
+                        "covered_branches": covered_branches,
+                    }
+                }
+                for path, (lines, covered_lines, branches, covered_branches) in files.items()
+            }
+        }
+    ).encode()
+
+
+class TestCoverageByOwner:
+    """Tests for coverage_by_owner."""
+
+    def test_sums_lines_and_branches_per_owner(self) -> None:
+        """Test that files are summed per project, counting branches like coverage.py."""
+        report = _report(
+            app__a_py=(10, 8, 4, 2),
+            app__b_py=(6, 6, 0, 0),
+            lib__c_py=(10, 5, 0, 0),
+        )
+        owners = {"app/a_py": "app:app", "app/b_py": "app:app", "lib/c_py": "lib:lib"}
+        totals = coverage_by_owner(report, owners)
+        assert totals == {
+            "app:app": CoverageTotals(covered=16, total=20),
+            "lib:lib": CoverageTotals(covered=5, total=10),
+        }
+        assert totals["app:app"].percent == 80.0
+
+    def test_unowned_files_are_skipped(self) -> None:
+        """Test that files outside every project do not count."""
+        assert coverage_by_owner(_report(other__x_py=(4, 0, 0, 0)), {}) == {}
+
+    def test_nothing_to_cover(self) -> None:
+        """Test that a project without coverable lines has no percentage."""
+        assert CoverageTotals().percent is None
+
+
+def _sandbox(directory: Path) -> Path:
+    """Write the module and the generated configuration into a fresh sandbox."""
+    (directory / MODULE).parent.mkdir(parents=True)
+    (directory / MODULE).write_text(MODULE_SOURCE)
+    (directory / COVERAGERC_PATH).parent.mkdir(parents=True)
+    (directory / COVERAGERC_PATH).write_bytes(coveragerc(["app/src"]))
+    return directory
+
+
+def _coverage(sandbox: Path, *args: str, data_file: str = ".coverage") -> None:
+    subprocess.run(
+        [sys.executable, "-m", "coverage", *args],
+        cwd=sandbox,
+        env={"COVERAGE_FILE": data_file, "PYTHONPATH": "app/src"},
+        check=True,
+        capture_output=True,
+    )
+
+
+class TestCoveragerc:
+    """Tests for the configuration shared by the shards and the merge."""
+
+    def test_shard_data_merges_in_another_sandbox(self, tmp_path: Path) -> None:
+        """Test that data from two shard sandboxes combines and reports in a third."""
+        pytest.importorskip("coverage")
+        merge = _sandbox(tmp_path / "merge")
+        for index, function in enumerate(("first", "second")):
+            shard = _sandbox(tmp_path / f"shard-{index}")
+            (shard / "test.py").write_text(f"from pkg.mod import {function}\n{function}()\n")
+            data_file = f".coverage.shard-{index}"
+            _coverage(shard, "run", f"--rcfile={COVERAGERC_PATH}", "test.py", data_file=data_file)
+            (merge / data_file).write_bytes((shard / data_file).read_bytes())
+
+        _coverage(merge, "combine", f"--rcfile={COVERAGERC_PATH}")
+        _coverage(merge, "json", f"--rcfile={COVERAGERC_PATH}", "-o", "coverage.json")
+        totals = coverage_by_owner((merge / "coverage.json").read_bytes(), {MODULE: "app:app"})
+        assert totals["app:app"].percent == 100.0
@@ -0,0 +1,43 @@
+"""Unit tests for file argument passing."""
+
+from __future__ import annotations
+
+from pants_baseline.util_rules.file_args import MAX_FILE_ARGS_BYTES, covering_roots, file_args
+
+
+class TestFileArgs:
+    """Tests for file_args."""
+
+    def test_small_batches_pass_files(self) -> None:
+        """Test that batches that fit are passed file by file."""
+        files = ("src/a.py", "src/b.py", "tests/test_a.py")
+        result = file_args(files)
+        assert result.args == files
+        assert result.by_directory is False
+
+    def test_large_batches_pass_roots(self) -> None:
+        """Test that oversized batches fall back to directory roots."""
+        files = [f"src/pkg/module_{i}.py" for i in range(10)]
+        result = file_args(files, max_bytes=50)
+        assert result.args == ("src",)
+        assert result.by_directory is True
+
+    def test_covering_roots_keeps_top_level_files(self) -> None:
+        """Test that files at the sandbox root are passed as themselves."""
+        assert covering_roots(["setup.py", "src/a.py", "src/b/c.py"]) == ("setup.py", "src")
+
+    def test_stress_50k_deep_paths(self) -> None:
+        """Test that 50k deep paths stay far below ARG_MAX and are all covered."""
+        files = [
+            f"src/company/product_{i % 40}/subsystem_{i % 97}/component_{i % 13}/"
+            f"generated_module_with_a_long_name_{i}.py"
+            for i in range(50_000)
+        ]
+        files += [f"tests/unit/product_{i % 40}/test_module_{i}.py" for i in range(5_000)]
+        assert sum(len(f) + 1 for f in files) > MAX_FILE_ARGS_BYTES
+
+        result = file_args(files)
+
+        assert result.by_directory is True
+        assert sum(len(a) + 1 for a in result.args) <= MAX_FILE_ARGS_BYTES
+        assert all(any(f == r or f.startswith(f"{r}/") for r in result.args) for f in files)
@@ -0,0 +1,37 @@
+"""Unit tests for translating exclude patterns into ignore globs."""
+
+from __future__ import annotations
+
+from pants_baseline.util_rules.globs import ignore_globs, unanchored_patterns
+
+
+class TestIgnoreGlobs:
+    """Tests for ignore_globs."""
+
+    def test_bare_names_match_at_any_depth(self) -> None:
+        """Test that bare directory names and wildcards are left unanchored."""
+        assert ignore_globs([".venv", "*.pyc"], "projects/app") == ("!.venv", "!*.pyc")
+
+    def test_paths_are_anchored_to_the_project(self) -> None:
+        """Test that patterns containing a slash are relative to the project directory."""
+        assert ignore_globs(["src/generated", "/build/lib"], "projects/app") == (
+            "!projects/app/src/generated",
+            "!projects/app/build/lib",
+        )
+
+    def test_root_project(self) -> None:
+        """Test that a project at the build root keeps its patterns as given."""
+        assert ignore_globs(["src/generated"]) == ("!src/generated",)
+
+    def test_normalizes_and_deduplicates(self) -> None:
+        """Test that trailing slashes, `!` prefixes, blanks and repeats are dropped."""
+        assert ignore_globs(["dist/", "!dist", " ", "dist"]) == ("!dist",)
+
+
+class TestUnanchoredPatterns:
+    """Tests for unanchored_patterns."""
+
+    def test_keeps_only_names(self) -> None:
+        """Test that anchored patterns are dropped and names are normalized."""
+        patterns = [".venv", "build/", "src/generated", "!dist", "*.pyc", ".venv"]
+        assert unanchored_patterns(patterns) == (".venv", "build", "dist", "*.pyc")
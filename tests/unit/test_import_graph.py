@@ -0,0 +1,232 @@
+"""Unit tests for test impact analysis over the import graph."""
+
+from __future__ import annotations
+
+from pants_baseline.util_rules.import_graph import (
+    affected_files,
+    build_import_graph,
+    imported_modules,
+    module_name,
+    project_roots,
+    required_files,
+    untraced_changes,
+)
+
+ROOTS = ("src", "tests")
+
+SOURCES = {
+    "src/app/__init__.py": b"",
+    "src/app/core.py": b"import json\n",
+    "src/app/api.py": b"from app.core import handler\n",
+    "src/app/cli.py": b"from . import api\n",
+    "src/app/util.py": b"",
+    "tests/conftest.py": b"",
+    "tests/unit/conftest.py": b"",
+    "tests/unit/test_api.py": b"from app import api\n",
+    "tests/unit/test_cli.py": b"import app.cli\n",
+    "tests/unit/test_util.py": b"from app.util import *\n",
+    "tests/integration/test_e2e.py": b"import requests\n",
+}
+TESTS = tuple(p for p in SOURCES if p.rsplit("/", 1)[-1].startswith("test_"))
+
+# The Python files of a project below the build root
+SOURCES_A = ("projA/src/app.py", "projA/tests/test_app.py")
+
+
+class TestModuleName:
+    """Tests for module_name."""
+
+    def test_strips_root_and_suffix(self) -> None:
+        """Test that the source root and .py suffix are removed."""
+        assert module_name("src/app/core.py", ROOTS) == "app.core"
+
+    def test_package_init(self) -> None:
+        """Test that a package's __init__.py names the package."""
+        assert module_name("src/app/__init__.py", ROOTS) == "app"
+
+    def test_longest_root_wins(self) -> None:
+        """Test that nested roots take precedence over their parents."""
+        assert module_name("src/py/app/core.py", ("src", "src/py")) == "app.core"
+
+
+class TestImportedModules:
+    """Tests for imported_modules."""
+
+    def test_parent_packages_are_loaded(self) -> None:
+        """Test that importing a submodule also loads its parents."""
+        assert imported_modules(b"import a.b.c\n", "x", False) == {"a", "a.b", "a.b.c"}
+
+    def test_from_import_includes_candidate_submodules(self) -> None:
+        """Test that `from a import b` may refer to the submodule a.b."""
+        assert imported_modules(b"from a import b\n", "x", False) == {"a", "a.b"}
+
+    def test_relative_import(self) -> None:
+        """Test that relative imports resolve against the importing module."""
+        assert imported_modules(b"from ..c import d\n", "a.b.m", False) == {
+            "a",
+            "a.c",
+            "a.c.d",
+        }
+
+    def test_relative_import_from_package(self) -> None:
+        """Test that a package's relative imports resolve against the package itself."""
+        assert imported_modules(b"from . import m\n", "a", True) == {"a", "a.m"}
+
+    def test_syntax_error(self) -> None:
+        """Test that unparsable files import nothing."""
+        assert imported_modules(b"def (:\n", "x", False) == set()
+
+    def test_pytest_plugins(self) -> None:
+        """Test that modules listed in pytest_plugins are loaded."""
+        source = b'pytest_plugins = ["fixtures.db", "fixtures.web"]\n'
+        assert imported_modules(source, "conftest", False) == {
+            "fixtures",
+            "fixtures.db",
+            "fixtures.web",
+        }
+        assert imported_modules(b'pytest_plugins = "fixtures"\n', "conftest", False) == {"fixtures"}
+
+
+class TestAffectedFiles:
+    """Tests for build_import_graph and affected_files."""
+
+    def test_graph_keeps_first_party_edges_only(self) -> None:
+        """Test that third-party imports are dropped from the graph."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert graph["src/app/core.py"] == ()
+        assert graph["src/app/api.py"] == ("src/app/__init__.py", "src/app/core.py")
+        assert graph["tests/integration/test_e2e.py"] == ()
+
+    def test_transitive_importers_are_affected(self) -> None:
+        """Test that a change reaches tests through intermediate modules."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert affected_files(graph, ["src/app/core.py"], TESTS) == (
+            "tests/unit/test_api.py",
+            "tests/unit/test_cli.py",
+        )
+
+    def test_package_init_affects_all_importers(self) -> None:
+        """Test that changing a package __init__ affects everything importing from it."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert affected_files(graph, ["src/app/__init__.py"], TESTS) == (
+            "tests/unit/test_api.py",
+            "tests/unit/test_cli.py",
+            "tests/unit/test_util.py",
+        )
+
+    def test_changed_test_is_affected(self) -> None:
+        """Test that an edited test file is selected."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        changed = ["tests/integration/test_e2e.py"]
+        assert affected_files(graph, changed, TESTS) == ("tests/integration/test_e2e.py",)
+
+    def test_conftest_affects_tests_below_it(self) -> None:
+        """Test that a changed conftest.py selects every test in and below its directory."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert affected_files(graph, ["tests/unit/conftest.py"], TESTS) == (
+            "tests/unit/test_api.py",
+            "tests/unit/test_cli.py",
+            "tests/unit/test_util.py",
+        )
+        assert affected_files(graph, ["tests/conftest.py"], TESTS) == TESTS
+
+    def test_unrelated_change(self) -> None:
+        """Test that changes outside the graph select nothing."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert affected_files(graph, ["README.md"], TESTS) == ()
+
+
+class TestNestedProjects:
+    """Tests for projects below the build root."""
+
+    def test_project_roots(self) -> None:
+        """Test that roots are resolved under each project directory."""
+        assert project_roots(["", "projA"], ["src", "tests/"]) == (
+            "projA/src",
+            "projA/tests",
+            "src",
+            "tests",
+        )
+
+    def test_graph_resolves_nested_imports(self) -> None:
+        """Test that a nested project's tests select and require its sources."""
+        sources = {
+            "projA/src/pkg/__init__.py": b"",
+            "projA/src/pkg/mod.py": b"",
+            "projA/tests/test_mod.py": b"from pkg import mod\n",
+            "projB/src/other/lib.py": b"",
+            "projB/tests/test_lib.py": b"import other.lib\n",
+        }
+        graph = build_import_graph(sources, project_roots(["projA", "projB"], ROOTS))
+        tests = ("projA/tests/test_mod.py", "projB/tests/test_lib.py")
+        assert affected_files(graph, ["projA/src/pkg/mod.py"], tests) == (
+            "projA/tests/test_mod.py",
+        )
+        assert required_files(graph, ["projA/tests/test_mod.py"], sources) == (
+            "projA/src/pkg/__init__.py",
+            "projA/src/pkg/mod.py",
+            "projA/tests/test_mod.py",
+        )
+
+    def test_module_in_two_projects(self) -> None:
+        """Test that a module name defined by two projects resolves to both files."""
+        sources = {
+            "projA/src/util.py": b"",
+            "projB/src/util.py": b"",
+            "projB/tests/test_util.py": b"import util\n",
+        }
+        graph = build_import_graph(sources, project_roots(["projA", "projB"], ROOTS))
+        assert graph["projB/tests/test_util.py"] == ("projA/src/util.py", "projB/src/util.py")
+
+
+class TestUntracedChanges:
+    """Tests for untraced_changes."""
+
+    def test_python_files_in_the_graph_are_traced(self) -> None:
+        """Test that changes to known modules and files outside projects are not reported."""
+        assert untraced_changes(["projA/src/app.py", "docs/index.md"], SOURCES_A, ["projA"]) == ()
+
+    def test_deleted_modules_and_data_files(self) -> None:
+        """Test that deleted modules and non-Python files in a project are reported."""
+        changed = ["projA/src/gone.py", "projA/tests/data.json", "projA/pyproject.toml"]
+        assert untraced_changes(changed, SOURCES_A, ["projA"]) == tuple(changed)
+
+    def test_configuration_above_a_project(self) -> None:
+        """Test that pytest configuration and conftests above a project are reported."""
+        changed = ["pytest.ini", "conftest.py", "projB/pytest.ini", "setup.py"]
+        assert untraced_changes(changed, SOURCES_A, ["projA"]) == ("pytest.ini", "conftest.py")
+
+
+class TestRequiredFiles:
+    """Tests for required_files."""
+
+    def test_imports_conftests_and_packages(self) -> None:
+        """Test that a test needs its imports, the conftests above it and their packages."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert required_files(graph, ["tests/unit/test_api.py"], SOURCES) == (
+            "src/app/__init__.py",
+            "src/app/api.py",
+            "src/app/core.py",
+            "tests/conftest.py",
+            "tests/unit/conftest.py",
+            "tests/unit/test_api.py",
+        )
+
+    def test_unrelated_sources_are_left_out(self) -> None:
+        """Test that a test importing nothing first-party only needs its conftests."""
+        graph = build_import_graph(SOURCES, ROOTS)
+        assert required_files(graph, ["tests/integration/test_e2e.py"], SOURCES) == (
+            "tests/conftest.py",
+            "tests/integration/test_e2e.py",
+        )
+
+    def test_conftest_imports_are_followed(self) -> None:
+        """Test that what a conftest.py imports, or loads as a plugin, is included."""
+        sources = {
+            **SOURCES,
+            "tests/conftest.py": b'pytest_plugins = ["app.util"]\n',
+        }
+        graph = build_import_graph(sources, ROOTS)
+        assert "src/app/util.py" in required_files(
+            graph, ["tests/integration/test_e2e.py"], sources
+        )
@@ -0,0 +1,40 @@
+"""Unit tests for the JSON stores kept between runs."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from pants_baseline.util_rules.json_store import load_json_store, save_json_store
+
+
+def positive(value: Any) -> int | None:
+    """Accept positive integers."""
+    return value if isinstance(value, int) and value > 0 else None
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """Test that a saved store loads back, keeping only valid entries."""
+    path = tmp_path / "baseline" / "store.json"
+    save_json_store(path, {"b": 2, "a": 1, "bad": -1})
+    assert load_json_store(path, positive) == {"a": 1, "b": 2}
+    assert path.read_text().index('"a"') < path.read_text().index('"b"')
+
+
+def test_write_leaves_no_temporary_files(tmp_path: Path) -> None:
+    """Test that a write replaces the store in one step."""
+    path = tmp_path / "store.json"
+    save_json_store(path, {"a": 1})
+    save_json_store(path, {"a": 2})
+    assert [p.name for p in tmp_path.iterdir()] == ["store.json"]
+    assert load_json_store(path, positive) == {"a": 2}
+
+
+def test_unusable_stores_are_empty(tmp_path: Path) -> None:
+    """Test that a missing, corrupt or non-object store loads as empty."""
+    path = tmp_path / "store.json"
+    assert load_json_store(path, positive) == {}
+    path.write_text("{not json")
+    assert load_json_store(path, positive) == {}
+    path.write_text("[1]")
+    assert load_json_store(path, positive) == {}
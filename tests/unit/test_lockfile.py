@@ -0,0 +1,83 @@
+"""Unit tests for lock file parsing."""
+
+from __future__ import annotations
+
+import pytest
+
+from pants_baseline.util_rules.lockfile import (
+    LockfileError,
+    candidate_lock_files,
+    canonical_name,
+    locked_packages,
+)
+
+UV_LOCK = b"""
+version = 1
+requires-python = ">=3.11"
+
+[[package]]
+name = "my-project"
+version = "0.1.0"
+source = { editable = "." }
+
+[[package]]
+name = "Requests"
+version = "2.31.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "charset_normalizer"
+version = "3.3.2"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+
+class TestLockedPackages:
+    """Tests for locked_packages."""
+
+    def test_uv_lock(self) -> None:
+        """Test that registry packages are read and workspace members skipped."""
+        assert locked_packages("uv.lock", UV_LOCK) == (
+            ("charset-normalizer", "3.3.2"),
+            ("requests", "2.31.0"),
+        )
+
+    def test_requirements(self) -> None:
+        """Test that only exact pins are read from a requirements file."""
+        content = b"""
+# comment
+Django==4.2.1 \\
+    --hash=sha256:abc
+urllib3[socks]==2.0.7 ; python_version >= "3.8"
+flask>=2
+-e ./local
+"""
+        assert locked_packages("requirements.txt", content) == (
+            ("django", "4.2.1"),
+            ("urllib3", "2.0.7"),
+        )
+
+    def test_invalid_toml(self) -> None:
+        """Test that a corrupt lock file raises LockfileError."""
+        with pytest.raises(LockfileError):
+            locked_packages("uv.lock", b"[[package]\n")
+
+    def test_canonical_name(self) -> None:
+        """Test PEP 503 name normalization."""
+        assert canonical_name("Zope.Interface__x") == "zope-interface-x"
+
+
+class TestCandidateLockFiles:
+    """Tests for candidate_lock_files."""
+
+    def test_nearest_first(self) -> None:
+        """Test that the project's own directory comes before its parents."""
+        assert candidate_lock_files("services/api", "uv.lock") == (
+            "services/api/uv.lock",
+            "services/uv.lock",
+            "uv.lock",
+        )
+
+    def test_root_project(self) -> None:
+        """Test a project at the build root."""
+        assert candidate_lock_files("", "uv.lock") == ("uv.lock",)
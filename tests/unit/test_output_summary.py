@@ -0,0 +1,108 @@
+"""Unit tests for bounded output summaries."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pants_baseline.util_rules.output_summary import (
+    OutputSummary,
+    iter_chunks,
+    iter_lines,
+    summarize_bytes,
+    summarize_log,
+    summary_parts,
+    summary_script,
+)
+
+
+def _output(count: int) -> bytes:
+    return "".join(f"line {i}\n" for i in range(count)).encode()
+
+
+class TestIterLines:
+    """Tests for iter_lines."""
+
+    def test_lines_split_across_chunks(self) -> None:
+        """Test that lines spanning chunk boundaries are joined back together."""
+        content = b"first\r\nsecond line\nthird"
+        assert list(iter_lines(iter_chunks(content, size=4))) == [
+            b"first",
+            b"second line",
+            b"third",
+        ]
+
+    def test_empty(self) -> None:
+        """Test that empty output has no lines."""
+        assert list(iter_lines(iter_chunks(b""))) == []
+
+
+class TestSummarize:
+    """Tests for summarize_bytes."""
+
+    def test_short_output_is_kept_whole(self) -> None:
+        """Test that output within the limit renders unchanged."""
+        summary = summarize_bytes(_output(3), max_lines=10)
+        assert summary.omitted == 0
+        assert summary.render() == "line 0\nline 1\nline 2"
+
+    def test_long_output_keeps_head_and_tail(self) -> None:
+        """Test that only the first and last lines are kept, with a count of the rest."""
+        summary = summarize_bytes(_output(100_000), max_lines=5)
+        assert summary.head == ("line 0", "line 1", "line 2")
+        assert summary.tail == ("line 99998", "line 99999")
+        assert summary.line_count == 100_000
+        assert summary.render("dist/log") == (
+            "line 0\nline 1\nline 2\n"
+            "... 99995 more line(s); full output in dist/log ...\n"
+            "line 99998\nline 99999"
+        )
+
+    def test_unlimited(self) -> None:
+        """Test that a limit of zero keeps every line."""
+        summary = summarize_bytes(_output(50), max_lines=0)
+        assert len(summary.head) == 50
+        assert summary.omitted == 0
+
+    def test_invalid_utf8_is_replaced(self) -> None:
+        """Test that undecodable bytes do not fail the summary."""
+        assert summarize_bytes(b"bad \xff byte\n", max_lines=10).head == ("bad � byte",)
+
+
+class TestSummarizeLog:
+    """Tests for summarizing from the parts summary_script cuts out of a log."""
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            b"",
+            _output(1),
+            _output(3),
+            _output(5),
+            _output(6),
+            _output(1000),
+            b"a\r\nb\nunterminated",
+        ],
+    )
+    @pytest.mark.parametrize("max_lines", [1, 5, 0])
+    def test_parts_summarize_like_the_whole_log(
+        self, tmp_path: Path, content: bytes, max_lines: int
+    ) -> None:
+        """Test that the parts give the same summary as scanning the whole log."""
+        (tmp_path / "out.log").write_bytes(content)
+        script = summary_script("out.log", max_lines=max_lines)
+        subprocess.run(["bash", "-c", script], cwd=tmp_path, check=True)
+
+        # Only the parts are read, unless every line is kept
+        paths = summary_parts("out.log") if max_lines > 0 else ("out.log",)
+        files = {path: (tmp_path / path).read_bytes() for path in paths}
+        assert summarize_log(files, "out.log", max_lines=max_lines) == summarize_bytes(
+            content, max_lines=max_lines
+        )
+
+    def test_missing_log(self) -> None:
+        """Test that a log that was never written has an empty summary."""
+        assert summarize_log({}, "out.log", max_lines=5) == OutputSummary()
+        assert summarize_log({}, "out.log", max_lines=0) == OutputSummary()
@@ -0,0 +1,101 @@
+"""Unit tests for shard partitioning helpers."""
+
+from __future__ import annotations
+
+from pants_baseline.util_rules.partitions import (
+    ShardMetadata,
+    compute_shard_count,
+    connected_components,
+    shard_paths,
+)
+
+
+def _paths(count: int) -> list[str]:
+    return [f"src/pkg{i % 17}/module_{i}.py" for i in range(count)]
+
+
+class TestComputeShardCount:
+    """Tests for compute_shard_count."""
+
+    def test_small_run_uses_single_shard(self) -> None:
+        """Test that a handful of small files is not split."""
+        assert compute_shard_count(file_count=10, total_bytes=10_000, parallelism=16) == 1
+
+    def test_capped_by_parallelism(self) -> None:
+        """Test that shard count never exceeds available parallelism."""
+        assert compute_shard_count(file_count=14_000, total_bytes=0, parallelism=8) == 8
+
+    def test_large_files_justify_split(self) -> None:
+        """Test that total size alone can justify more shards."""
+        count = compute_shard_count(file_count=4, total_bytes=10 * 1024 * 1024, parallelism=16)
+        assert count == 4
+
+    def test_empty_run(self) -> None:
+        """Test that an empty run still yields one shard."""
+        assert compute_shard_count(file_count=0, total_bytes=0, parallelism=8) == 1
+
+
+class TestShardPaths:
+    """Tests for shard_paths."""
+
+    def test_covers_every_path_once(self) -> None:
+        """Test that every path lands in exactly one shard."""
+        paths = _paths(1_000)
+        shards = shard_paths(paths, 6)
+        flattened = [p for shard in shards for p in shard]
+        assert sorted(flattened) == sorted(paths)
+        assert len(shards) == 6
+
+    def test_assignment_is_stable(self) -> None:
+        """Test that input order does not affect shard assignment."""
+        paths = _paths(500)
+        assert shard_paths(paths, 4) == shard_paths(reversed(paths), 4)
+
+    def test_adding_a_file_touches_one_shard(self) -> None:
+        """Test that adding a file only changes the shard it is assigned to."""
+        paths = _paths(500)
+        before = set(shard_paths(paths, 4))
+        after = set(shard_paths([*paths, "src/pkg0/new_module.py"], 4))
+        assert len(before - after) == 1
+
+    def test_growing_shard_count_moves_few_files(self) -> None:
+        """Test that adding a shard keeps most files where they were."""
+        paths = _paths(4_000)
+        before = {p: i for i, shard in enumerate(shard_paths(paths, 8)) for p in shard}
+        after = {p: i for i, shard in enumerate(shard_paths(paths, 9)) for p in shard}
+        moved = sum(1 for p in paths if before[p] != after[p])
+        assert moved < len(paths) // 4
+
+    def test_single_shard(self) -> None:
+        """Test that one shard holds every path, sorted."""
+        paths = _paths(20)
+        assert shard_paths(paths, 1) == (tuple(sorted(paths)),)
+
+
+class TestShardMetadata:
+    """Tests for ShardMetadata."""
+
+    def test_single_shard_has_no_description(self) -> None:
+        """Test that unsplit runs keep Pants' default output."""
+        assert ShardMetadata(index=0, count=1).description is None
+
+    def test_description(self) -> None:
+        """Test the shard description is one-based."""
+        assert ShardMetadata(index=2, count=4).description == "shard 3/4"
+
+
+class TestConnectedComponents:
+    """Tests for connected_components."""
+
+    def test_independent_nodes(self) -> None:
+        """Test that unrelated nodes form their own components."""
+        assert connected_components({"a": [], "b": [], "c": []}) == (("a",), ("b",), ("c",))
+
+    def test_dependency_chain_merges(self) -> None:
+        """Test that transitively connected nodes share a component."""
+        edges = {"a": ["b"], "b": [], "c": ["d"], "d": ["b"], "e": []}
+        assert connected_components(edges) == (("a", "b", "c", "d"), ("e",))
+
+    def test_outside_neighbours_ignored(self) -> None:
+        """Test that dependencies outside the node set do not merge components."""
+        assert connected_components({"a": ["lib"], "b": ["lib"]}) == (("a",), ("b",))
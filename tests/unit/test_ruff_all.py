@@ -0,0 +1,51 @@
+"""Unit tests for the combined Ruff pass script."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pants_baseline.util_rules.ruff_all import (
+    FMT_EXIT_CODE_PATH,
+    parse_fmt_exit_code,
+    ruff_all_script,
+)
+
+
+def run(tmp_path: Path, check: str, fix: str | None, fmt: str) -> tuple[int, str, int]:
+    """Run the script with shell commands standing in for the Ruff steps."""
+    script = ruff_all_script(
+        ["sh", "-c", check], None if fix is None else ["sh", "-c", fix], ["sh", "-c", fmt]
+    )
+    result = subprocess.run(
+        ["bash", "-c", script], cwd=tmp_path, capture_output=True, text=True, check=False
+    )
+    status = parse_fmt_exit_code((tmp_path / FMT_EXIT_CODE_PATH).read_bytes())
+    return result.returncode, result.stdout, status
+
+
+def test_check_status_is_kept_when_formatting_succeeds(tmp_path: Path) -> None:
+    """Test that lint findings set the exit code while the fmt status stays clean."""
+    assert run(tmp_path, "echo a.py:1:1: F401; exit 1", "true", "true") == (
+        1,
+        "a.py:1:1: F401\n",
+        0,
+    )
+
+
+def test_failing_format_is_recorded(tmp_path: Path) -> None:
+    """Test that a failed format step is recorded without changing check's status."""
+    assert run(tmp_path, "true", None, "echo 'error: Failed to parse' >&2; exit 2") == (0, "", 2)
+
+
+def test_failing_fix_skips_format(tmp_path: Path) -> None:
+    """Test that a failed fix step is recorded and formatting does not run."""
+    returncode, _, status = run(tmp_path, "true", "exit 2", "touch formatted")
+    assert (returncode, status) == (0, 2)
+    assert not (tmp_path / "formatted").exists()
+
+
+def test_missing_status_counts_as_failed() -> None:
+    """Test that an unreadable status is treated as a failure."""
+    assert parse_fmt_exit_code(b"") == 1
+    assert parse_fmt_exit_code(b"0\n") == 0
@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import pytest
+from pants.option.ranked_value import Rank, RankedValue
+from pants.testutil.option_util import create_subsystem
 
 from pants_baseline.subsystems.baseline import BaselineSubsystem
+from pants_baseline.subsystems.pytest import BaselinePytestSubsystem
 from pants_baseline.subsystems.ruff import RuffSubsystem
-from pants_baseline.subsystems.ty import TySubsystem
+from pants_baseline.subsystems.ty import TyPartitionMode, TySubsystem
 from pants_baseline.subsystems.uv import UvSubsystem
 
 
@@ -70,6 +73,18 @@ class TestRuffSubsystem:
         assert RuffSubsystem.fix.default is True
         assert RuffSubsystem.unsafe_fixes.default is False
 
+    def test_default_shards(self) -> None:
+        """Test shards are sized automatically by default."""
+        assert RuffSubsystem.shards.default == 0
+
+    def test_combined_pass_disabled_by_default(self) -> None:
+        """Test the combined fix/format/lint pass is opt-in."""
+        assert RuffSubsystem.combined.default is False
+
+    def test_named_cache_disabled_by_default(self) -> None:
+        """Test Ruff's cross-sandbox named cache is opt-in."""
+        assert RuffSubsystem.named_cache.default is False
+
 
 class TestTySubsystem:
     """Tests for TySubsystem."""
@@ -82,6 +97,10 @@ class TestTySubsystem:
         """Test default strict mode."""
         assert TySubsystem.strict.default is True
 
+    def test_default_partition(self) -> None:
+        """Test type checking is partitioned per target by default."""
+        assert TySubsystem.partition.default is TyPartitionMode.target
+
     def test_default_reporting_options(self) -> None:
         """Test default reporting options."""
         assert TySubsystem.report_missing_imports.default is True
@@ -98,6 +117,20 @@ class TestTySubsystem:
         """Test default output format."""
         assert TySubsystem.output_format.default == "text"
 
+    def test_deprecated_options_warn_only_when_set(self) -> None:
+        """Test that explicitly set deprecated options are warned about."""
+        ty = create_subsystem(
+            TySubsystem,
+            report_unused_imports=True,
+            report_unused_variables=RankedValue(Rank.CONFIG, False),
+            include=["src", "tests"],
+            exclude=RankedValue(Rank.FLAG, ["build"]),
+        )
+        assert [w.split(" is ")[0] for w in ty.deprecation_warnings] == [
+            "[baseline-ty].report_unused_variables",
+            "[baseline-ty].exclude",
+        ]
+
 
 class TestUvSubsystem:
     """Tests for UvSubsystem."""
@@ -125,3 +158,18 @@ class TestUvSubsystem:
     def test_default_ignore_vulns_empty(self) -> None:
         """Test no vulnerabilities ignored by default."""
         assert UvSubsystem.audit_ignore_vulns.default == []
+
+
+class TestBaselinePytestSubsystem:
+    """Tests for BaselinePytestSubsystem."""
+
+    def test_options_scope(self) -> None:
+        """Test the scope does not clash with Pants' own pytest subsystem."""
+        assert BaselinePytestSubsystem.options_scope == "baseline-pytest"
+
+    def test_default_requirements(self) -> None:
+        """Test that the test venv installs pytest and pytest-cov by default."""
+        requirements = BaselinePytestSubsystem.requirements.default
+        assert any(r.startswith("pytest>=") for r in requirements)
+        assert any(r.startswith("pytest-cov") for r in requirements)
+        assert BaselinePytestSubsystem.install_locked.default is True
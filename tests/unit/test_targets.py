@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import pytest
+from pants.engine.addresses import Address
 
 from pants_baseline.targets import (
     BaselinePythonProject,
@@ -17,6 +18,7 @@ from pants_baseline.targets import (
     SkipTestField,
     SkipTypecheckField,
     StrictModeField,
+    project_value,
 )
 
 
@@ -67,9 +69,9 @@ class TestPythonVersionField:
         """Test field alias."""
         assert PythonVersionField.alias == "python_version"
 
-    def test_default_version(self) -> None:
-        """Test default Python version."""
-        assert PythonVersionField.default == "3.11"
+    def test_unset_by_default(self) -> None:
+        """Test that the Python version defaults to the global option."""
+        assert PythonVersionField.default is None
 
 
 class TestLineLengthField:
@@ -79,9 +81,9 @@ class TestLineLengthField:
         """Test field alias."""
         assert LineLengthField.alias == "line_length"
 
-    def test_default_length(self) -> None:
-        """Test default line length."""
-        assert LineLengthField.default == 120
+    def test_unset_by_default(self) -> None:
+        """Test that the line length defaults to the global option."""
+        assert LineLengthField.default is None
 
 
 class TestStrictModeField:
@@ -91,9 +93,9 @@ class TestStrictModeField:
         """Test field alias."""
         assert StrictModeField.alias == "strict"
 
-    def test_default_enabled(self) -> None:
-        """Test strict mode enabled by default."""
-        assert StrictModeField.default is True
+    def test_unset_by_default(self) -> None:
+        """Test that strict mode defaults to the global option."""
+        assert StrictModeField.default is None
 
 
 class TestCoverageThresholdField:
@@ -103,9 +105,9 @@ class TestCoverageThresholdField:
         """Test field alias."""
         assert CoverageThresholdField.alias == "coverage_threshold"
 
-    def test_default_threshold(self) -> None:
-        """Test default coverage threshold."""
-        assert CoverageThresholdField.default == 80
+    def test_unset_by_default(self) -> None:
+        """Test that the coverage threshold defaults to the global option."""
+        assert CoverageThresholdField.default is None
 
 
 class TestSkipFields:
@@ -130,3 +132,22 @@ class TestSkipFields:
     def test_skip_audit_default(self) -> None:
         """Test skip_audit default is False."""
         assert SkipAuditField.default is False
+
+
+class TestProjectValue:
+    """Tests for project_value."""
+
+    def test_unset_follows_global_option(self) -> None:
+        """Test that a field the project does not set inherits the global option."""
+        field = LineLengthField(None, Address("app"))
+        assert project_value(field, 100) == 100
+
+    def test_set_value_wins(self) -> None:
+        """Test that a project's own value overrides the global option."""
+        field = PythonVersionField("3.13", Address("app"))
+        assert project_value(field, "3.12") == "3.13"
+
+    def test_value_equal_to_old_default_wins(self) -> None:
+        """Test that an explicit value is kept even if it equals a common default."""
+        assert project_value(LineLengthField(120, Address("app")), 100) == 120
+        assert project_value(StrictModeField(False, Address("app")), True) is False
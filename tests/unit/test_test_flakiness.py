@@ -0,0 +1,65 @@
+"""Unit tests for per-test JUnit results and flakiness statistics."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from pants_baseline.util_rules.json_store import load_json_store, save_json_store
+from pants_baseline.util_rules.test_flakiness import (
+    flakiness_entry,
+    parse_junit_results,
+    record_attempts,
+)
+
+JUNIT = b"""<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+<testcase classname="tests.sub.test_a.TestX.TestInner" name="test_in"
+    file="tests/sub/test_a.py" time="0.1"><failure message="assert 0"/></testcase>
+<testcase classname="tests.sub.test_a.TestX" name="test_m" file="tests/sub/test_a.py" time="0.1"/>
+<testcase classname="tests.sub.test_a" name="test_p[x::y]" file="tests/sub/test_a.py" time="0.1"/>
+<testcase classname="tests.sub.test_a" name="test_skip" file="tests/sub/test_a.py" time="0.0">
+    <skipped message="unconditional skip"/></testcase>
+<testcase classname="tests.sub.test_a" name="test_td" file="tests/sub/test_a.py" time="0.1"/>
+<testcase classname="tests.sub.test_a" name="test_td" file="tests/sub/test_a.py" time="0.0">
+    <error message="failed on teardown"/></testcase>
+<testcase classname="" name="tests.test_bad" file="tests/test_bad.py" time="0.0">
+    <error message="collection failure"/></testcase>
+</testsuite></testsuites>
+"""
+
+
+def test_parse_junit_results() -> None:
+    """Test that testcases are keyed by node ID, with skips passing and errors failing."""
+    assert parse_junit_results(JUNIT) == {
+        "tests/sub/test_a.py::TestX::TestInner::test_in": False,
+        "tests/sub/test_a.py::TestX::test_m": True,
+        "tests/sub/test_a.py::test_p[x::y]": True,
+        "tests/sub/test_a.py::test_skip": True,
+        "tests/sub/test_a.py::test_td": False,
+        "tests/test_bad.py": False,
+    }
+
+
+class TestRecordAttempts:
+    """Tests for record_attempts."""
+
+    def test_counts(self) -> None:
+        """Test that runs, failures and passes on retry are counted per test."""
+        store: dict = {}
+        record_attempts(store, {"t::ok": [True], "t::flaky": [False, True], "t::bad": [False]})
+        record_attempts(store, {"t::ok": [True], "t::flaky": [True], "t::bad": [False, False]})
+        assert store == {
+            "t::ok": {"runs": 2, "failures": 0, "flaky": 0},
+            "t::flaky": {"runs": 2, "failures": 1, "flaky": 1},
+            "t::bad": {"runs": 2, "failures": 2, "flaky": 0},
+        }
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that saved statistics load back, dropping malformed entries."""
+        store: dict = {}
+        record_attempts(store, {"t::flaky": [False, False, True]})
+        path = tmp_path / "flakiness.json"
+        save_json_store(path, {**store, "t::bad": {"runs": "1"}})
+        assert load_json_store(path, flakiness_entry) == {
+            "t::flaky": {"runs": 1, "failures": 1, "flaky": 1}
+        }
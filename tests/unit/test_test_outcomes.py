@@ -0,0 +1,138 @@
+"""Unit tests for cached test file outcomes and the plugin that records them."""
+
+from __future__ import annotations
+
+import json
+import types
+from pathlib import Path
+
+from pants_baseline.pytest_plugins.baseline_outcomes import closure, first_party_files
+from pants_baseline.util_rules.json_store import load_json_store, save_json_store
+from pants_baseline.util_rules.test_outcomes import (
+    cached_passes,
+    config_globs,
+    outcome_entry,
+    outcome_key,
+    parse_outcomes,
+    record_outcomes,
+)
+
+FINGERPRINTS = {"tests/test_a.py": "1", "src/a.py": "2", "src/b.py": "3"}
+
+
+class TestOutcomeKey:
+    """Tests for outcome_key."""
+
+    def test_order_does_not_matter(self) -> None:
+        """Test that the key is the same for the files in any order."""
+        assert outcome_key(["src/a.py", "src/b.py"], FINGERPRINTS, "venv") == outcome_key(
+            ["src/b.py", "src/a.py", "src/a.py"], FINGERPRINTS, "venv"
+        )
+
+    def test_changes_with_content_and_salt(self) -> None:
+        """Test that a changed file or salt changes the key."""
+        key = outcome_key(["src/a.py"], FINGERPRINTS, "venv")
+        assert key != outcome_key(["src/a.py"], {**FINGERPRINTS, "src/a.py": "9"}, "venv")
+        assert key != outcome_key(["src/a.py"], FINGERPRINTS, "other-venv")
+
+    def test_missing_file(self) -> None:
+        """Test that a deleted file gives no key."""
+        assert outcome_key(["src/gone.py"], FINGERPRINTS, "venv") is None
+
+
+class TestRecordAndReuse:
+    """Tests for record_outcomes and cached_passes."""
+
+    def test_pass_is_reused_until_an_import_changes(self) -> None:
+        """Test that a pass is cached until a file it needed changes."""
+        store: dict = {}
+        record_outcomes(store, {"tests/test_a.py": (True, ["src/a.py"])}, FINGERPRINTS, "venv")
+        assert store["tests/test_a.py"]["files"] == ["src/a.py", "tests/test_a.py"]
+        assert cached_passes(store, FINGERPRINTS, "venv", ["tests/test_a.py"]) == (
+            "tests/test_a.py",
+        )
+        # An unrelated file changing does not matter
+        changed = {**FINGERPRINTS, "src/b.py": "9"}
+        assert cached_passes(store, changed, "venv", ["tests/test_a.py"]) == ("tests/test_a.py",)
+        changed = {**FINGERPRINTS, "src/a.py": "9"}
+        assert cached_passes(store, changed, "venv", ["tests/test_a.py"]) == ()
+        assert cached_passes(store, FINGERPRINTS, "new-venv", ["tests/test_a.py"]) == ()
+
+    def test_files_above_the_test_are_part_of_the_key(self) -> None:
+        """Test that an added or edited conftest, package or pytest config file is noticed."""
+        store: dict = {}
+        fingerprints = {**FINGERPRINTS, "tests/conftest.py": "4"}
+        record_outcomes(store, {"tests/test_a.py": (True, ["src/a.py"])}, fingerprints, "venv")
+        assert "tests/conftest.py" in store["tests/test_a.py"]["files"]
+        for added in ("tests/__init__.py", "conftest.py", "pytest.ini", "src/pyproject.toml"):
+            changed = {**fingerprints, added: "5"}
+            assert cached_passes(store, changed, "venv", ["tests/test_a.py"]) == (), added
+        changed = {**fingerprints, "tests/conftest.py": "9"}
+        assert cached_passes(store, changed, "venv", ["tests/test_a.py"]) == ()
+        # Files beside, not above, do not matter
+        changed = {**fingerprints, "docs/pytest.ini": "5", "tests/sub/conftest.py": "5"}
+        assert cached_passes(store, changed, "venv", ["tests/test_a.py"]) == ("tests/test_a.py",)
+
+    def test_failure_forgets_pass(self) -> None:
+        """Test that a failure removes the cached pass."""
+        store: dict = {}
+        record_outcomes(store, {"tests/test_a.py": (True, [])}, FINGERPRINTS, "venv")
+        record_outcomes(store, {"tests/test_a.py": (False, [])}, FINGERPRINTS, "venv")
+        assert store == {}
+
+    def test_unknown_files_are_not_cached(self) -> None:
+        """Test that a test needing a file outside the fingerprints is not cached."""
+        store: dict = {}
+        record_outcomes(store, {"tests/test_a.py": (True, ["gen.py"])}, FINGERPRINTS, "venv")
+        assert store == {}
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that saved outcomes load back, dropping malformed entries."""
+        store: dict = {}
+        record_outcomes(store, {"tests/test_a.py": (True, ["src/a.py"])}, FINGERPRINTS, "venv")
+        path = tmp_path / "outcomes.json"
+        save_json_store(path, {**store, "tests/test_bad.py": {"key": 1}})
+        assert load_json_store(path, outcome_entry) == store
+
+
+def test_config_globs() -> None:
+    """Test that config files are globbed within each project and in every directory above."""
+    globs = config_globs(["libs/core", "libs/core/", ""])
+    assert "libs/core/**/pytest.ini" in globs
+    assert "libs/pyproject.toml" in globs
+    assert "setup.cfg" in globs
+    assert "**/tox.ini" in globs
+    assert len(globs) == len(set(globs))
+
+
+def test_parse_outcomes() -> None:
+    """Test that a plugin report is read as (passed, imports) per test file."""
+    report = json.dumps(
+        {
+            "tests/test_a.py": {"passed": True, "imports": ["src/a.py"]},
+            "tests/test_b.py": {"passed": False, "imports": []},
+        }
+    ).encode()
+    assert parse_outcomes(report) == {
+        "tests/test_a.py": (True, ("src/a.py",)),
+        "tests/test_b.py": (False, ()),
+    }
+
+
+def test_closure() -> None:
+    """Test that modules imported indirectly, even through cycles, are reached."""
+    edges = {"test_a": {"app.api"}, "app.api": {"app.db", "json"}, "app.db": {"app.api"}}
+    assert closure(edges, ["test_a"]) == {"test_a", "app.api", "app.db", "json"}
+    assert closure(edges, ["app.db"]) == {"app.api", "app.db", "json"}
+
+
+def test_first_party_files(tmp_path: Path) -> None:
+    """Test that only modules with files under the root are reported."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").touch()
+    loaded = {
+        "app": types.SimpleNamespace(__file__=str(tmp_path / "src" / "app.py")),
+        "json": types.SimpleNamespace(__file__="/usr/lib/python3/json/__init__.py"),
+        "sys": types.SimpleNamespace(),
+    }
+    assert first_party_files(["app", "json", "sys", "missing"], loaded, tmp_path) == ["src/app.py"]
@@ -0,0 +1,64 @@
+"""Unit tests for recorded test timings."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from pants_baseline.util_rules.json_store import load_json_store, save_json_store
+from pants_baseline.util_rules.partitions import balance_by_duration
+from pants_baseline.util_rules.test_timings import parse_junit_durations, timing_entry
+
+JUNIT_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="3">
+    <testcase classname="tests.test_a" file="tests/test_a.py" name="test_one" time="1.5"/>
+    <testcase classname="tests.test_a" file="tests/test_a.py" name="test_two" time="0.5"/>
+    <testcase classname="tests.test_b" file="tests/test_b.py" name="test_three" time="0.25">
+      <failure message="boom">boom</failure>
+    </testcase>
+  </testsuite>
+</testsuites>
+"""
+
+
+class TestParseJunitDurations:
+    """Tests for parse_junit_durations."""
+
+    def test_sums_per_file(self) -> None:
+        """Test durations are summed per test file."""
+        assert parse_junit_durations(JUNIT_XML) == {"tests/test_a.py": 2.0, "tests/test_b.py": 0.25}
+
+
+def test_timings_store(tmp_path: Path) -> None:
+    """Test that saved timings load back, dropping malformed durations."""
+    path = tmp_path / "baseline" / "test_timings.json"
+    save_json_store(path, {"tests/test_a.py": 2.0, "tests/test_b.py": "1", "tests/test_c.py": True})
+    assert load_json_store(path, timing_entry) == {"tests/test_a.py": 2.0}
+
+
+class TestBalanceByDuration:
+    """Tests for balance_by_duration."""
+
+    def test_slow_file_gets_its_own_shard(self) -> None:
+        """Test a dominant file is isolated from the rest."""
+        durations = {"slow.py": 60.0, "a.py": 1.0, "b.py": 1.0, "c.py": 1.0}
+        shards = balance_by_duration(durations, durations, 2)
+        assert ("slow.py",) in shards
+        assert ("a.py", "b.py", "c.py") in shards
+
+    def test_unknown_files_use_median(self) -> None:
+        """Test files without history are spread like typical files."""
+        paths = [f"test_{i}.py" for i in range(8)]
+        shards = balance_by_duration(paths, {}, 4)
+        assert sorted(len(s) for s in shards) == [2, 2, 2, 2]
+
+    def test_noise_does_not_reshuffle(self) -> None:
+        """Test small timing changes keep the same shards."""
+        paths = [f"test_{i}.py" for i in range(20)]
+        before = {p: (1.0, 2.0, 8.0)[i % 3] for i, p in enumerate(paths)}
+        after = {p: d * 1.05 for p, d in before.items()}
+        assert balance_by_duration(paths, before, 3) == balance_by_duration(paths, after, 3)
+
+    def test_never_more_shards_than_files(self) -> None:
+        """Test shard count is capped at the number of files."""
+        assert len(balance_by_duration(["a.py", "b.py"], {}, 8)) == 2
@@ -0,0 +1,104 @@
+"""Unit tests for generated Ruff and ty configuration files."""
+
+from __future__ import annotations
+
+import tomllib
+
+import pytest
+
+from pants_baseline.util_rules.tool_config import (
+    fingerprint,
+    render_toml,
+    ruff_config,
+    ty_config,
+)
+
+RUFF_OPTIONS = {
+    "python_version": "3.12",
+    "line_length": 100,
+    "select": ["E", "F", "I"],
+    "ignore": ["E501", "W292"],
+    "quote_style": "double",
+    "indent_style": "space",
+    "test_roots": ["tests"],
+    "skip_tests_rules": ["F401", "S101"],
+    "skip_init_rules": ["F401", "F403"],
+    "exclude": [".venv", "build"],
+}
+
+
+class TestRenderToml:
+    """Tests for render_toml."""
+
+    def test_round_trips(self) -> None:
+        """Test that the rendered TOML parses back to the same data."""
+        data = {"a": 1, "b": {"c": ["x", "y"], "d": {"e/f": True}}, "g": 'quo"te'}
+        assert tomllib.loads(render_toml(data)) == data
+
+    def test_key_order_does_not_matter(self) -> None:
+        """Test that keys are rendered sorted."""
+        assert render_toml({"b": 1, "a": {"y": 2, "x": 3}}) == render_toml(
+            {"a": {"x": 3, "y": 2}, "b": 1}
+        )
+
+    def test_rejects_unknown_types(self) -> None:
+        """Test that values TOML cannot represent are rejected."""
+        with pytest.raises(TypeError):
+            render_toml({"a": 1.5})
+
+
+class TestRuffConfig:
+    """Tests for ruff_config."""
+
+    def test_config_file_only_options_are_rendered(self) -> None:
+        """Test that per-file ignores and format styles reach the config file."""
+        config = tomllib.loads(ruff_config(**RUFF_OPTIONS))
+        assert config["target-version"] == "py312"
+        assert config["line-length"] == 100
+        assert config["exclude"] == []
+        assert config["extend-exclude"] == [".venv", "build"]
+        assert config["force-exclude"] is True
+        assert config["format"] == {"indent-style": "space", "quote-style": "double"}
+        assert config["lint"]["per-file-ignores"] == {
+            "**/__init__.py": ["F401", "F403"],
+            "**/tests/**": ["F401", "S101"],
+        }
+
+    def test_option_order_keeps_the_cache_key(self) -> None:
+        """Test that reordered or repeated options render byte-identical files."""
+        reordered = {
+            **RUFF_OPTIONS,
+            "select": ["I", "F", "E", "F"],
+            "ignore": ["W292", "E501"],
+            "test_roots": ["tests/", "tests"],
+            "skip_tests_rules": ["S101", "F401"],
+            "skip_init_rules": ["F403", "F401"],
+            "exclude": ["build", ".venv"],
+        }
+        original = ruff_config(**RUFF_OPTIONS)
+        assert ruff_config(**reordered) == original
+        assert fingerprint(ruff_config(**reordered)) == fingerprint(original)
+
+    def test_setting_changes_change_the_cache_key(self) -> None:
+        """Test that a real change produces a different file."""
+        changed = {**RUFF_OPTIONS, "quote_style": "single"}
+        assert fingerprint(ruff_config(**changed)) != fingerprint(ruff_config(**RUFF_OPTIONS))
+
+    def test_empty_exemptions_are_omitted(self) -> None:
+        """Test that no per-file ignores are written when nothing is exempted."""
+        options = {**RUFF_OPTIONS, "skip_tests_rules": [], "skip_init_rules": []}
+        assert "per-file-ignores" not in tomllib.loads(ruff_config(**options))["lint"]
+
+
+class TestTyConfig:
+    """Tests for ty_config."""
+
+    def test_renders_environment_and_rules(self) -> None:
+        """Test that the Python version, stub path and import reporting are rendered."""
+        config = tomllib.loads(
+            ty_config(python_version="3.13", extra_paths=["stubs"], report_missing_imports=False)
+        )
+        assert config == {
+            "environment": {"python-version": "3.13", "extra-paths": ["stubs"]},
+            "rules": {"unresolved-import": "ignore"},
+        }
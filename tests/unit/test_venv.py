@@ -0,0 +1,56 @@
+"""Unit tests for the cached pytest venv's requirements and key."""
+
+from __future__ import annotations
+
+import pytest
+
+from pants_baseline.util_rules.venv import bootstrap_script, venv_key, venv_requirements
+
+
+class TestVenvRequirements:
+    """Tests for venv_requirements."""
+
+    def test_pins_and_tool_requirements(self) -> None:
+        """Test that lock file pins and tool requirements are merged and sorted."""
+        assert venv_requirements(["pytest>=8.0"], [("requests", "2.32.0")]) == (
+            "pytest>=8.0\nrequests==2.32.0\n"
+        )
+
+    def test_pinned_versions_win(self) -> None:
+        """Test that a tool requirement for a pinned package is dropped."""
+        requirements = venv_requirements(["Pytest>=8.0", "pytest-cov"], [("pytest", "7.4.0")])
+        assert requirements == "pytest-cov\npytest==7.4.0\n"
+
+    def test_order_does_not_matter(self) -> None:
+        """Test that the same inputs in any order produce the same file."""
+        pins = [("b", "1.0"), ("a", "2.0")]
+        assert venv_requirements(["y", "x"], pins) == venv_requirements(["x", "y"], pins[::-1])
+
+    def test_invalid_requirement(self) -> None:
+        """Test that an unparseable requirement is reported."""
+        with pytest.raises(ValueError, match="Invalid pytest requirement"):
+            venv_requirements(["pytest >= >= 8"], [])
+
+
+class TestVenvKey:
+    """Tests for venv_key."""
+
+    def test_stable(self) -> None:
+        """Test that the key only depends on its inputs."""
+        assert venv_key("pytest\n", "3.11", "0.5.21") == venv_key("pytest\n", "3.11", "0.5.21")
+
+    def test_changes_with_inputs(self) -> None:
+        """Test that requirements, interpreter and uv version all change the key."""
+        key = venv_key("pytest\n", "3.11", "0.5.21")
+        assert key.startswith("py3.11-")
+        assert key != venv_key("pytest==8.0\n", "3.11", "0.5.21")
+        assert key != venv_key("pytest\n", "3.12", "0.5.21")
+        assert key != venv_key("pytest\n", "3.11", "0.6.0")
+
+
+def test_bootstrap_script_runs_module_in_venv() -> None:
+    """Test that the script builds the keyed venv only if missing, then runs in it."""
+    script = bootstrap_script("uv", "py3.11-abc", "3.11")
+    assert 'venv="$cache/venvs/py3.11-abc"' in script
+    assert 'if [ ! -x "$venv/bin/python" ]; then' in script
+    assert script.endswith('exec "$venv/bin/python" -m "$@"')